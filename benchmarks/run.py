@@ -0,0 +1,422 @@
+"""Benchmarks for the hot paths of the lirc package.
+
+Every benchmark runs against a ``lirc.testing.FakeLircd`` on a local
+socket, or on data in memory, so no lircd or IR hardware is needed.
+The results are written to a JSON file so that runs can be compared:
+
+    $ python -m benchmarks.run --output before.json
+    $ python -m benchmarks.run --output after.json --compare before.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+import lirc
+from lirc import ClientPool, LircdConnection
+from lirc.button_event_parser import ButtonEventParser
+from lirc.reply_packet_parser import ReplyPacketParser
+from lirc.testing import FakeLircd
+
+REMOTE = "tv"
+KEYS = ["KEY_POWER", "KEY_UP", "KEY_DOWN", "KEY_VOLUMEUP", "KEY_VOLUMEDOWN"]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Find the sample at a fraction of the way through the sorted samples.
+
+    Args:
+        samples: The samples, in any order.
+        fraction: How far through the samples to look, from 0 to 1.
+
+    Returns:
+        The sample at that point, rounding to the nearest sample.
+    """
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def latency_summary(samples: List[float], elapsed: float) -> Dict[str, float]:
+    """Summarize the latency of a number of operations.
+
+    Args:
+        samples: How long each operation took, in seconds.
+        elapsed: How long all of them took together, in seconds.
+
+    Returns:
+        The operations per second and the p50, p99 and mean latency
+        in microseconds.
+    """
+    return {
+        "operations": len(samples),
+        "ops_per_sec": len(samples) / elapsed,
+        "p50_us": percentile(samples, 0.50) * 1e6,
+        "p99_us": percentile(samples, 0.99) * 1e6,
+        "mean_us": statistics.fmean(samples) * 1e6,
+    }
+
+
+def time_each(operation: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    """Time an operation a number of times after warming it up.
+
+    Args:
+        operation: The operation to time.
+        iterations: How many times to time it.
+
+    Returns:
+        The latency summary of the operation.
+    """
+    for _ in range(min(iterations, 100)):
+        operation()
+
+    clock = time.perf_counter
+    samples = []
+    start = clock()
+    for _ in range(iterations):
+        before = clock()
+        operation()
+        samples.append(clock() - before)
+
+    return latency_summary(samples, clock() - start)
+
+
+def bench_send_once(iterations: int) -> Dict[str, Any]:
+    """Time ``send_once`` round trips over TCP and a unix socket."""
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for transport, address in (
+            ("tcp", ("127.0.0.1", 0)),
+            ("unix", os.path.join(directory, "lircd")),
+        ):
+            with FakeLircd({REMOTE: KEYS}, address=address) as lircd:
+                client = lircd.client()
+                results[transport] = time_each(
+                    lambda: client.send_once(REMOTE, "KEY_POWER"), iterations
+                )
+                prepared = client.prepare(REMOTE, "KEY_POWER")
+                results[f"{transport}_prepared"] = time_each(prepared, iterations)
+                client.close()
+
+    return results
+
+
+def bench_large_list(keys: int, iterations: int) -> Dict[str, Any]:
+    """Time reading a LIST reply with many keys, end to end and
+    through each of the parsers on their own.
+    """
+    names = [f"KEY_{index}" for index in range(keys)]
+    reply_lines = (
+        ["BEGIN", f"LIST {REMOTE}", "SUCCESS", "DATA", str(keys)]
+        + [f"{code:016x} {name}" for code, name in enumerate(names, 1)]
+        + ["END"]
+    )
+    reply = ("\n".join(reply_lines) + "\n").encode("utf-8")
+
+    with FakeLircd({REMOTE: names}) as lircd:
+        client = lircd.client()
+        end_to_end = time_each(lambda: client.list_remote_keys(REMOTE), iterations)
+        client.close()
+
+    def feed_lines():
+        parser = ReplyPacketParser()
+        for line in reply_lines:
+            parser.feed(line)
+
+    def feed_bytes():
+        packets, _ = ReplyPacketParser.feed_bytes(reply)
+        assert len(packets[0].data) == keys
+
+    results = {
+        "keys": keys,
+        "reply_bytes": len(reply),
+        "client": end_to_end,
+        "feed": time_each(feed_lines, iterations),
+        "feed_bytes": time_each(feed_bytes, iterations),
+    }
+    for name in ("client", "feed", "feed_bytes"):
+        results[name]["mb_per_sec"] = (
+            len(reply) * results[name]["ops_per_sec"] / 1_000_000
+        )
+    return results
+
+
+def bench_readline(lines: int) -> Dict[str, Any]:
+    """Time ``LircdConnection.readline`` over a real socket pair."""
+    line = b"0000000000f40bf0 00 KEY_UP tv\n"
+    ours, theirs = socket.socketpair()
+    connection = LircdConnection(address="socketpair", socket=ours)
+
+    writer = threading.Thread(target=theirs.sendall, args=(line * lines,))
+    writer.start()
+    start = time.perf_counter()
+    for _ in range(lines):
+        connection.readline()
+    elapsed = time.perf_counter() - start
+    writer.join()
+
+    ours.close()
+    theirs.close()
+    return {
+        "lines": lines,
+        "lines_per_sec": lines / elapsed,
+        "mb_per_sec": len(line) * lines / elapsed / 1_000_000,
+    }
+
+
+def bench_events(events: int) -> Dict[str, Any]:
+    """Time parsing a stream of button events, on their own and
+    read off a socket by a client mixed in with a reply.
+    """
+    stream = b"".join(
+        b"%016x %02x %s %s\n" % (code, code % 3, KEYS[code % 5].encode(), b"tv")
+        for code in range(events)
+    )
+
+    start = time.perf_counter()
+    parsed, _ = ButtonEventParser.feed_bytes(stream)
+    feed_bytes_elapsed = time.perf_counter() - start
+    assert len(parsed) == events
+
+    with FakeLircd({REMOTE: KEYS}) as lircd:
+        client = lircd.client()
+        client.version()
+
+        def press():
+            for code in range(events):
+                lircd.press(REMOTE, KEYS[code % 5], code=code)
+
+        presser = threading.Thread(target=press)
+        start = time.perf_counter()
+        presser.start()
+        received = client.events()
+        for _ in range(events):
+            next(received)
+        client_elapsed = time.perf_counter() - start
+        presser.join()
+        client.close()
+
+    return {
+        "events": events,
+        "feed_bytes_events_per_sec": events / feed_bytes_elapsed,
+        "client_events_per_sec": events / client_elapsed,
+    }
+
+
+def bench_allocations(iterations: int) -> Dict[str, Any]:
+    """Measure the memory allocated while sending commands.
+
+    For each command, this records the peak memory allocated while it
+    was sent, which includes the fake lircd's thread, and how many
+    objects it left behind in reference cycles for the garbage
+    collector. The memory allocated in the lirc package and still held
+    after all the commands is recorded too, to catch leaks.
+    """
+    results = {}
+    package = os.path.dirname(os.path.abspath(lirc.__file__))
+    filters = [
+        tracemalloc.Filter(True, os.path.join(package, "*")),
+        tracemalloc.Filter(False, os.path.join(package, "testing.py")),
+    ]
+
+    with FakeLircd({REMOTE: KEYS}) as lircd:
+        client = lircd.client()
+        prepared = client.prepare(REMOTE, "KEY_POWER")
+
+        for name, operation in (
+            ("send_once", lambda: client.send_once(REMOTE, "KEY_POWER")),
+            ("prepared", prepared),
+        ):
+            for _ in range(100):
+                operation()
+
+            gc.collect()
+            gc.disable()
+            tracemalloc.start()
+            try:
+                before = tracemalloc.take_snapshot().filter_traces(filters)
+                peaks = []
+                for _ in range(iterations):
+                    current, _ = tracemalloc.get_traced_memory()
+                    tracemalloc.reset_peak()
+                    operation()
+                    peaks.append(tracemalloc.get_traced_memory()[1] - current)
+
+                cyclic_garbage = gc.collect()
+                after = tracemalloc.take_snapshot().filter_traces(filters)
+            finally:
+                tracemalloc.stop()
+                gc.enable()
+
+            retained = after.compare_to(before, "filename")
+            results[name] = {
+                "peak_bytes_per_command": statistics.fmean(peaks),
+                "cyclic_garbage_per_command": cyclic_garbage / iterations,
+                "retained_bytes": sum(stat.size_diff for stat in retained),
+            }
+
+        client.close()
+
+    return results
+
+
+def bench_concurrency(thread_counts: List[int], iterations: int) -> Dict[str, Any]:
+    """Time ``send_once`` from many threads through a ``ClientPool``,
+    with the fake lircd taking a millisecond per command.
+    """
+    results = {}
+
+    with FakeLircd({REMOTE: KEYS}, latency=0.001) as lircd:
+        for threads in thread_counts:
+            pool = ClientPool(size=threads, connection_factory=lircd.connection)
+            samples = []
+            lock = threading.Lock()
+
+            def worker():
+                own = []
+                for _ in range(iterations):
+                    before = time.perf_counter()
+                    pool.send_once(REMOTE, "KEY_POWER")
+                    own.append(time.perf_counter() - before)
+                with lock:
+                    samples.extend(own)
+
+            workers = [threading.Thread(target=worker) for _ in range(threads)]
+            start = time.perf_counter()
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            results[str(threads)] = latency_summary(samples, elapsed)
+            pool.close()
+
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    """Describe where the benchmarks ran, to tell runs apart."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def run(quick: bool = False) -> Dict[str, Any]:
+    """Run every benchmark.
+
+    Args:
+        quick: Whether to run far fewer iterations, to check that
+            the benchmarks work rather than to measure anything.
+
+    Returns:
+        The environment and the results of every benchmark.
+    """
+    scale = 0.01 if quick else 1.0
+
+    def scaled(count: int) -> int:
+        return max(10, int(count * scale))
+
+    return {
+        "environment": environment(),
+        "quick": quick,
+        "benchmarks": {
+            "send_once": bench_send_once(scaled(5000)),
+            "large_list": bench_large_list(2000, scaled(200)),
+            "readline": bench_readline(scaled(200_000)),
+            "events": bench_events(scaled(20_000)),
+            "allocations": bench_allocations(scaled(2000)),
+            "concurrency": bench_concurrency([1, 2, 4, 8], scaled(500)),
+        },
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Compare every number of two runs.
+
+    Args:
+        current: The results of this run.
+        baseline: The results of the run to compare against.
+
+    Returns:
+        A line for every number in both runs, with the change in percent.
+    """
+    lines = []
+
+    def walk(path, now, then):
+        if isinstance(now, dict) and isinstance(then, dict):
+            for key in now:
+                if key in then:
+                    walk(f"{path}.{key}" if path else key, now[key], then[key])
+        elif (
+            isinstance(now, (int, float))
+            and isinstance(then, (int, float))
+            and not isinstance(now, bool)
+            and then
+        ):
+            change = (now - then) / then * 100
+            lines.append(f"{path}: {then:.6g} -> {now:.6g} ({change:+.1f}%)")
+
+    walk("", current["benchmarks"], baseline["benchmarks"])
+    return lines
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--output",
+        default="benchmark-results.json",
+        help="the file to write the results to (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--compare", metavar="BASELINE", help="a previous results file to compare to"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="run far fewer iterations"
+    )
+    args = parser.parse_args(argv)
+
+    results = run(quick=args.quick)
+
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+        output.write("\n")
+    print(f"Wrote results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            for line in compare(results, json.load(baseline)):
+                print(line)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
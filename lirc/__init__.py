@@ -1,6 +1,17 @@
+from lirc.async_client import AsyncClient
 from lirc.client import Client
+from lirc.client_pool import ClientPool
 from lirc.connection.lircd_connection import LircdConnection
+from lirc.connection.tcp_connection import TcpConnection
+from lirc.pipeline import Pipeline
 
 __version__ = "3.0.0"
 
-__all__ = ["Client", "LircdConnection"]
+__all__ = [
+    "AsyncClient",
+    "Client",
+    "ClientPool",
+    "LircdConnection",
+    "Pipeline",
+    "TcpConnection",
+]
@@ -0,0 +1,377 @@
+import asyncio
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from .connection.default_connection import DefaultConnection
+from .exceptions import (
+    LircdConnectionError,
+    LircdSocketError,
+    LircdTimeoutError,
+)
+from .key_table import KeyTable
+from .protocol import LircdProtocol, Reply
+
+
+class AsyncClient:
+    """Communicate with the lircd daemon from asyncio code.
+
+    This mirrors ``lirc.Client`` but every command is a coroutine.
+    A single stream to lircd is shared by all coroutines using the
+    client; commands are serialized over it with a lock so that the
+    replies can never be interleaved. What is read from the stream
+    goes through an ``LircdProtocol``, so button presses and SIGHUP
+    packets lircd broadcasts while a command waits on its reply are
+    skipped over rather than being taken for part of the reply.
+    """
+
+    def __init__(
+        self, address: Union[str, Tuple[str, int]] = None, timeout: float = 5.0
+    ) -> None:
+        """Initialize the client. This does not connect to lircd;
+        that happens on ``connect()``, when the client is used as
+        an async context manager, or lazily on the first command.
+
+        Args:
+            address: The address to the lircd socket. A str path is
+                treated as a unix domain socket and a ``(host, port)``
+                tuple as a TCP address. Defaults to the operating system
+                specific address that ``LircdConnection`` uses.
+            timeout: The amount of time to wait for the whole reply
+                to each command from lircd before we timeout.
+        """
+        if address is None:
+            address = DefaultConnection().address
+
+        # Used for start_repeat and stop_repeat
+        self._last_send_start_remote = None
+        self._last_send_start_key = None
+
+        self._address = address
+        self._timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._protocol = LircdProtocol()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self) -> "AsyncClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    @property
+    def address(self) -> Union[str, Tuple[str, int]]:
+        """Retrieve the address of the lircd socket.
+
+        Returns:
+            The current address being used.
+        """
+        return self._address
+
+    async def connect(self) -> None:
+        """Open the stream to the lircd socket.
+
+        Raises:
+            LircdConnectionError: If the address is invalid or lircd
+                is not running.
+        """
+        if self._lock is None:
+            # The lock is created here rather than in __init__ so
+            # that it belongs to the running event loop.
+            self._lock = asyncio.Lock()
+
+        try:
+            if isinstance(self._address, str):
+                self._reader, self._writer = await asyncio.open_unix_connection(
+                    self._address
+                )
+            else:
+                host, port = self._address
+                self._reader, self._writer = await asyncio.open_connection(
+                    host, port
+                )
+        except FileNotFoundError:
+            raise LircdConnectionError(
+                f"Could not connect to lircd at {self._address}. "
+                "Did you start the `lircd` daemon?"
+            )
+        except Exception as error:
+            raise LircdConnectionError(error)
+
+        self._protocol = LircdProtocol()
+
+    async def close(self) -> None:
+        """Close the stream to the socket."""
+        writer, self._reader, self._writer = self._writer, None, None
+
+        if writer is None:
+            return
+
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    async def _receive(self, command: str, deadline: float) -> List[Reply]:
+        """Read what lircd sent next and parse it.
+
+        Args:
+            command: The command waiting on its reply.
+            deadline: The event loop time to have read the whole reply by.
+
+        Raises:
+            LircdTimeoutError: If nothing arrived before the deadline.
+            LircdSocketError: If lircd closed the connection or
+                some other error happened when reading from it.
+
+        Returns:
+            The replies completed by what was read. Broadcasts are
+            left out.
+        """
+        remaining = deadline - asyncio.get_running_loop().time()
+        try:
+            data = await asyncio.wait_for(self._reader.read(65536), remaining)
+        except asyncio.TimeoutError:
+            raise LircdTimeoutError(
+                f"The `{command}` command sent to lircd timed out after "
+                f"{self._timeout} seconds, with {self._protocol.buffered} "
+                "bytes of its reply read."
+            )
+        except OSError as error:
+            raise LircdSocketError(
+                f"An error occurred while reading from the lircd socket: {error}"
+            )
+
+        if not data:
+            raise LircdSocketError("lircd closed the connection.")
+
+        return [
+            event
+            for event in self._protocol.receive_data(data)
+            if isinstance(event, Reply)
+        ]
+
+    async def _send_command(self, command: str) -> Union[str, List[str]]:
+        """Send a command to lircd.
+
+        If the reply cannot be read in full, the stream is closed
+        so that the leftovers of it are not mistaken for the reply
+        to the next command. The next command reconnects.
+
+        Args:
+            command: A command from the lircd socket command interface.
+
+        Raises:
+            LircdCommandFailureError: If the command failed.
+            LircdInvalidReplyPacketError: If the reply was invalid.
+
+        Returns:
+            The data from the lirc response packet.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        command = " ".join(command.split())
+
+        async with self._lock:
+            if self._writer is None:
+                await self.connect()
+
+            deadline = asyncio.get_running_loop().time() + self._timeout
+            try:
+                self._writer.write(self._protocol.send_command(command))
+                await self._writer.drain()
+
+                replies = []
+                while not replies:
+                    replies = await self._receive(command, deadline)
+            except BaseException:
+                await self.close()
+                raise
+
+        # The lock is held until the reply is read, so it is the
+        # only reply there can be.
+        (reply,) = replies
+        return reply.result()
+
+    async def send_once(self, remote: str, key: str, repeat_count: int = 0) -> None:
+        """Send an lircd SEND_ONCE command.
+
+        Args:
+            key: The name of the key to send.
+            remote: The remote to use keys from.
+            repeat_count: The number of times to repeat this key.
+                If this is set to 1, that means this key will be
+                sent twice (repeated once).
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        await self._send_command(f"SEND_ONCE {remote} {key} {repeat_count}")
+
+    async def send_start(self, remote: str, key: str) -> None:
+        """Send an lircd SEND_START command.
+
+        This will repeat the given key until
+        send_stop is called.
+
+        Args:
+            remote: The remote to use keys from.
+            key: The name of the key to start sending.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        self._last_send_start_remote = remote
+        self._last_send_start_key = key
+        await self._send_command(f"SEND_START {remote} {key}")
+
+    async def send_stop(self, remote: str = "", key: str = "") -> None:
+        """Send an lircd SEND_STOP command.
+
+        The remote and key default to the remote and key
+        last used with ``send_start`` if they are not specified.
+
+        Args:
+            remote: The remote to stop.
+            key: The key to stop sending.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        if not remote and self._last_send_start_remote:
+            remote = self._last_send_start_remote
+
+        if not key and self._last_send_start_key:
+            key = self._last_send_start_key
+
+        await self._send_command(f"SEND_STOP {remote} {key}")
+
+    async def list_remotes(self) -> List[str]:
+        """List all the remotes that lirc has in
+        its ``/etc/lirc/lircd.conf.d`` folder.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+
+        Returns:
+            The list of all remotes.
+        """
+        return await self._send_command("LIST")
+
+    async def list_remote_keys(self, remote: str) -> List[str]:
+        """List all the keys for a specific remote.
+
+        Args:
+            remote: The remote to list the keys of.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+
+        Returns:
+            The list of keys from the remote.
+        """
+        return await self._send_command(f"LIST {remote}")
+
+    async def key_table(self, remote: str) -> KeyTable:
+        """List all the keys for a specific remote, parsed into a table
+        of their names and codes.
+
+        Args:
+            remote: The remote to list the keys of.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+            LircdInvalidReplyPacketError: If a key is not listed as
+                a code and a name.
+
+        Returns:
+            The keys of the remote.
+        """
+        return KeyTable.from_reply(remote, await self._send_command(f"LIST {remote}"))
+
+    async def start_logging(self, path: Union[str, Path]) -> None:
+        """Send a lircd SET_INPUTLOG command which sets
+        the path to log all lircd received data to.
+
+        Args:
+            path: The path to start logging lircd recieved data to.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        await self._send_command(f"SET_INPUTLOG {path}")
+
+    async def stop_logging(self) -> None:
+        """Stop logging to the inputlog path from start_logging.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        await self._send_command("SET_INPUTLOG")
+
+    async def version(self) -> str:
+        """Retrieve the version of LIRC
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+
+        Returns:
+            The version of LIRC being used.
+        """
+        return await self._send_command("VERSION")
+
+    async def driver_option(self, key: str, value: str) -> None:
+        """Set driver-specific option named key to given value.
+
+        Args:
+            key: The key to set for the driver.
+            value: The value for the key to set.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        await self._send_command(f"DRV_OPTION {key} {value}")
+
+    async def simulate(
+        self, remote: str, key: str, repeat_count: int = 0, keycode: int = 0
+    ) -> None:
+        """Simulate an IR event.
+
+        The ``--allow-simulate`` command line option to lircd must be active for this
+        command not to fail.
+
+        Args:
+            remote: The remote to simulate key presses from.
+            key: The key on the remote to simulate.
+            repeat_count: The number of times to repeat the simulated key press.
+            keycode: lircd(8) describes this option as a 16 hexadecimal digit
+                number encoding of the IR signal. However, it says it is depreciated
+                and should be ignored.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        await self._send_command(
+            "SIMULATE %016d %02d %s %s\n" % (keycode, repeat_count, key, remote)
+        )
+
+    async def set_transmitters(self, transmitters: Union[int, List[int]]) -> None:
+        """Set the active transmitters.
+
+        Args:
+            transmitters: The transmitters to set active.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        mask = transmitters
+
+        if isinstance(transmitters, List):
+            mask = 0
+            for transmitter in transmitters:
+                mask |= 1 << (int(transmitter) - 1)
+
+        await self._send_command(f"SET_TRANSMITTERS {mask}")
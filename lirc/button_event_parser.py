@@ -0,0 +1,126 @@
+from typing import List, NamedTuple, Tuple, Union
+
+from .exceptions import LircdInvalidButtonEventError, LircdInvalidReplyPacketError
+from .reply_packet_parser import ReplyPacketParser
+
+
+class ButtonEvent(NamedTuple):
+    """A decoded button press that lircd broadcast to its clients."""
+
+    #: The code of the IR signal that was decoded.
+    code: int
+    #: How many times the button has been repeated since it was
+    #: first pressed. This is 0 for the initial press.
+    repeat: int
+    #: The name of the button in the remote's config.
+    key: str
+    #: The name of the remote the button belongs to.
+    remote: str
+
+
+class ButtonEventParser:
+    """Parses the button events lircd broadcasts to every
+    client connected to its socket.
+
+    Button event format:
+
+        <code> <repeat count> <button name> <remote control name>
+
+    Example:
+
+        0000000000f40bf0 00 KEY_UP ANIMAX
+
+    The code is a 16 digit hexadecimal number and the repeat count
+    a hexadecimal number, which is 0 for the first press of a button.
+    """
+
+    @staticmethod
+    def parse(line: str) -> ButtonEvent:
+        """Parse a single line broadcast by lircd into a button event.
+
+        Args:
+            line: A line read in from an lircd connection.
+
+        Raises:
+            LircdInvalidButtonEventError: If the line is not
+                a button event.
+
+        Returns:
+            The button event.
+        """
+        try:
+            code, repeat, key, remote = line.split()
+            return ButtonEvent(int(code, 16), int(repeat, 16), key, remote)
+        except ValueError:
+            raise LircdInvalidButtonEventError(
+                f"Expected a button event line from lircd, got `{line.strip()}`."
+            )
+
+    @staticmethod
+    def feed_bytes(buffer: Union[bytes, bytearray]) -> Tuple[List[ButtonEvent], int]:
+        """Parse every complete button event in a buffer of raw bytes.
+
+        Any reply or SIGHUP packets in the buffer are skipped over,
+        so this can be used directly on data read from the lircd
+        socket.
+
+        If a line or a packet is invalid, the error raised for it has
+        the events before it on it as ``events``, and the number of
+        bytes those took up as ``consumed``, so they are not lost.
+
+        Args:
+            buffer: Raw bytes read from an lircd connection.
+
+        Raises:
+            LircdInvalidButtonEventError: If there is a line in the
+                buffer that is not a button event or part of a packet.
+            LircdInvalidReplyPacketError: If there is a packet in the
+                buffer that is not in the reply packet format.
+
+        Returns:
+            The complete button events in the buffer and the number of
+            bytes they took up. Bytes after that belong to a line or a
+            packet that has not been fully received.
+        """
+        events = []
+        append = events.append
+        find = buffer.find
+        consumed = 0
+
+        try:
+            while True:
+                end = find(b"\n", consumed)
+                if end == -1:
+                    return events, consumed
+
+                line = buffer[consumed:end]
+
+                if line.strip() == b"BEGIN":
+                    packet_end = ReplyPacketParser.scan_packet(buffer, consumed, [])
+                    if packet_end is None:
+                        return events, consumed
+                    consumed = packet_end
+                    continue
+
+                if line.strip():
+                    try:
+                        code, repeat, key, remote = line.split()
+                        append(
+                            ButtonEvent(
+                                int(code, 16),
+                                int(repeat, 16),
+                                key.decode(),
+                                remote.decode(),
+                            )
+                        )
+                    except ValueError:
+                        raise LircdInvalidButtonEventError(
+                            "Expected a button event line from lircd, "
+                            f"got `{line.strip().decode()}`."
+                        )
+
+                consumed = end + 1
+        except (LircdInvalidButtonEventError, LircdInvalidReplyPacketError) as error:
+            error.events = events
+            error.consumed = consumed
+            raise
@@ -0,0 +1,229 @@
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Union
+
+from .connection.demultiplexer import Broadcast
+from .key_table import KeyTable
+from .reply_packet_parser import ReplyPacket
+
+if TYPE_CHECKING:
+    from .catalog_snapshot import CatalogSnapshot
+
+Reply = Union[str, List[str]]
+
+
+class CatalogCache:
+    """An in memory copy of the remotes lircd knows about and their keys.
+
+    lircd's remotes only change when it re-reads its config, after
+    which it broadcasts a SIGHUP packet. The cache serves ``LIST``
+    lookups from memory until it sees that SIGHUP, and then drops
+    everything so the next lookups go to lircd again.
+
+    The cache can be looked up, seeded and dropped from different
+    threads, such as by a ``PersistentCatalog``. A reply that was
+    fetched while the cache was dropped or seeded is returned, but
+    not kept.
+    """
+
+    def __init__(self, send_command: Callable[[str], Reply]) -> None:
+        """Initialize the cache. Nothing is fetched until it is looked up.
+
+        Args:
+            send_command: Sends a command to lircd and returns
+                the data of the reply.
+        """
+        self._send_command = send_command
+        # Guards everything below. It is not held while lircd is asked.
+        self._lock = threading.Lock()
+        # Bumped whenever the cache is dropped or seeded, so replies
+        # fetched from before then are not kept.
+        self._generation = 0
+        self._remotes: Optional[Reply] = None
+        self._remote_keys: Dict[str, Reply] = {}
+        self._key_tables: Dict[str, KeyTable] = {}
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @property
+    def hits(self) -> int:
+        """Retrieve how many lookups were served from memory.
+
+        Returns:
+            The number of cache hits.
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Retrieve how many lookups had to be sent to lircd.
+
+        Returns:
+            The number of cache misses.
+        """
+        return self._misses
+
+    @property
+    def invalidations(self) -> int:
+        """Retrieve how many times the cache was dropped, either
+        because of a SIGHUP or an explicit call.
+
+        Returns:
+            The number of times the cache was invalidated.
+        """
+        return self._invalidations
+
+    def remotes(self) -> Reply:
+        """Look up all the remotes lircd knows about.
+
+        Raises:
+            LircdCommandFailure: If the LIST command fails.
+
+        Returns:
+            The list of all remotes.
+        """
+        with self._lock:
+            remotes = self._remotes
+            if remotes is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            generation = self._generation
+
+        if remotes is None:
+            remotes = self._send_command("LIST")
+            with self._lock:
+                if generation == self._generation:
+                    self._remotes = remotes
+
+        return list(remotes) if isinstance(remotes, list) else remotes
+
+    def remote_keys(self, remote: str) -> Reply:
+        """Look up all the keys for a specific remote.
+
+        Args:
+            remote: The remote to list the keys of.
+
+        Raises:
+            LircdCommandFailure: If the LIST command fails.
+
+        Returns:
+            The list of keys from the remote.
+        """
+        with self._lock:
+            keys = self._remote_keys.get(remote)
+            table = self._key_tables.get(remote) if keys is None else None
+            if keys is None and table is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            generation = self._generation
+
+        if table is not None:
+            # Seeded from a snapshot, which only has the table.
+            keys = table.to_reply()
+            return keys[0] if len(keys) == 1 else keys
+
+        if keys is None:
+            keys = self._send_command(f"LIST {remote}")
+            with self._lock:
+                if generation == self._generation:
+                    self._remote_keys[remote] = keys
+
+        return list(keys) if isinstance(keys, list) else keys
+
+    def key_table(self, remote: str) -> KeyTable:
+        """Look up all the keys for a specific remote, parsed into a
+        table. The table is parsed once, from the cached keys of the
+        remote if they were looked up already.
+
+        Args:
+            remote: The remote to list the keys of.
+
+        Raises:
+            LircdCommandFailure: If the LIST command fails.
+            LircdInvalidReplyPacketError: If a key is not listed as
+                a code and a name.
+
+        Returns:
+            The keys of the remote.
+        """
+        with self._lock:
+            table = self._key_tables.get(remote)
+            if table is not None:
+                self._hits += 1
+                return table
+
+            keys = self._remote_keys.get(remote)
+            if keys is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            generation = self._generation
+
+        if keys is None:
+            keys = self._send_command(f"LIST {remote}")
+
+        table = KeyTable.from_reply(remote, keys)
+        with self._lock:
+            if generation == self._generation:
+                self._key_tables[remote] = table
+        return table
+
+    def invalidate(self) -> None:
+        """Drop everything in the cache."""
+        with self._lock:
+            self._remotes = None
+            self._remote_keys = {}
+            self._key_tables = {}
+            self._invalidations += 1
+            self._generation += 1
+
+    def refresh(self) -> None:
+        """Drop everything in the cache and then load all the remotes
+        and the keys of each of them from lircd again.
+
+        Raises:
+            LircdCommandFailure: If any of the LIST commands fail.
+        """
+        self.invalidate()
+        with self._lock:
+            generation = self._generation
+
+        remotes = self._send_command("LIST")
+        remote_keys = {
+            remote: self._send_command(f"LIST {remote}")
+            for remote in ([remotes] if isinstance(remotes, str) else remotes)
+        }
+
+        with self._lock:
+            if generation == self._generation:
+                self._remotes = remotes
+                self._remote_keys = remote_keys
+
+    def seed(self, snapshot: "CatalogSnapshot") -> None:
+        """Replace everything in the cache with a snapshot of the
+        catalog, such as one loaded from disk, instead of asking lircd.
+
+        Args:
+            snapshot: The remotes and the keys of each of them.
+        """
+        remotes = snapshot.remotes
+        key_tables = {table.remote: table for table in snapshot.tables}
+
+        with self._lock:
+            # The way the client returns a reply with a single line.
+            self._remotes = remotes[0] if len(remotes) == 1 else remotes
+            self._remote_keys = {}
+            self._key_tables = key_tables
+            self._generation += 1
+
+    def on_broadcast(self, event: Broadcast) -> None:
+        """Drop the cache if a broadcast is a SIGHUP packet. This is
+        meant to be subscribed to the broadcasts of a connection.
+
+        Args:
+            event: A button event or SIGHUP packet from lircd.
+        """
+        if isinstance(event, ReplyPacket) and event.is_sighup:
+            self.invalidate()
@@ -0,0 +1,478 @@
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from .client import Client
+from .connection.demultiplexer import Broadcast
+from .exceptions import LircdInvalidReplyPacketError
+from .key_table import KeyTable
+from .reply_packet_parser import ReplyPacket
+
+# The first bytes of a snapshot file. The last one is the version of
+# the format, to be bumped whenever the layout below changes.
+_MAGIC = b"LIRCCAT\x01"
+
+# After the magic, every number is little endian:
+#
+#   u32 length, then that many bytes of strings, UTF-8 and joined by
+#       newlines: lircd's version, then every remote and key name once
+#   u32 number of remotes, then for each a u32 index of its name in
+#       the strings and a u32 number of keys
+#   u32 index in the strings of the name of every key of every remote
+#   u64 code of every key of every remote
+#   u32 CRC-32 of everything before it
+_COUNT = struct.Struct("<I")
+_REMOTE = struct.Struct("<II")
+
+
+def _to_little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class CatalogSnapshot:
+    """Every remote lircd knows about, the keys of each of them and
+    lircd's version, at one point in time.
+
+    Snapshots can be saved to a compact binary file and loaded back,
+    so a program can start with the catalog it had last time instead
+    of listing every remote again.
+
+    Example:
+        >>> import lirc
+        >>> from lirc.catalog_snapshot import CatalogSnapshot
+        >>> CatalogSnapshot.fetch(lirc.Client()).save("catalog.bin")
+        >>> snapshot = CatalogSnapshot.load("catalog.bin")
+        >>> snapshot.key_table("tv").code_of("KEY_POWER")
+        4335
+    """
+
+    def __init__(self, version: str, tables: Iterable[KeyTable]) -> None:
+        """Initialize the snapshot.
+
+        Args:
+            version: lircd's version.
+            tables: The keys of each remote, in the order lircd
+                lists the remotes.
+
+        Raises:
+            ValueError: If the version is more than one line, which
+                the file format can't store.
+        """
+        if "\n" in version:
+            raise ValueError(f"lircd's version must be one line, got {version!r}")
+
+        self._version = version
+        self._tables: Dict[str, KeyTable] = {table.remote: table for table in tables}
+
+    def __repr__(self) -> str:
+        return (
+            f"CatalogSnapshot(version={self._version!r}, "
+            f"remotes={len(self._tables)})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CatalogSnapshot):
+            return NotImplemented
+        return (
+            self._version == other._version
+            and list(self._tables.items()) == list(other._tables.items())
+        )
+
+    __hash__ = None
+
+    @property
+    def version(self) -> str:
+        """Retrieve lircd's version.
+
+        Returns:
+            The version lircd replied to VERSION with.
+        """
+        return self._version
+
+    @property
+    def remotes(self) -> List[str]:
+        """Retrieve the remotes lircd knows about.
+
+        Returns:
+            The name of every remote.
+        """
+        return list(self._tables)
+
+    @property
+    def tables(self) -> List[KeyTable]:
+        """Retrieve the keys of every remote.
+
+        Returns:
+            The key table of each remote, in the order of the remotes.
+        """
+        return list(self._tables.values())
+
+    def key_table(self, remote: str) -> KeyTable:
+        """Look up the keys of a remote.
+
+        Args:
+            remote: The name of the remote.
+
+        Raises:
+            KeyError: If lircd did not know about the remote.
+
+        Returns:
+            The keys of the remote.
+        """
+        return self._tables[remote]
+
+    @classmethod
+    def fetch(cls, client: Client) -> "CatalogSnapshot":
+        """Ask lircd for its version, its remotes and their keys.
+
+        This takes two round trips however many remotes there are:
+        one for the version and the remotes, and one pipeline of
+        a ``LIST`` for every remote.
+
+        Args:
+            client: The client to ask lircd with.
+
+        Raises:
+            LircdCommandFailureError: If any of the commands failed.
+            LircdInvalidReplyPacketError: If lircd's version is not a
+                single line, or a key is not a code and a name.
+
+        Returns:
+            The snapshot.
+        """
+        with client.pipeline() as pipe:
+            pipe.version()
+            pipe.list_remotes()
+            version, remotes = pipe.execute()
+
+            if not isinstance(version, str):
+                raise LircdInvalidReplyPacketError(
+                    f"Expected lircd's version on one line, got {len(version)} lines."
+                )
+
+            remotes = [remotes] if isinstance(remotes, str) else remotes
+            for remote in remotes:
+                pipe.list_remote_keys(remote)
+            replies = pipe.execute()
+
+        return cls(
+            version,
+            [
+                KeyTable.from_reply(remote, reply)
+                for remote, reply in zip(remotes, replies)
+            ],
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "CatalogSnapshot":
+        """Load a snapshot saved with ``save()``.
+
+        Args:
+            path: The file to load.
+
+        Raises:
+            OSError: If the file could not be read.
+            ValueError: If the file is not a snapshot, is from another
+                version of the format, or is corrupt.
+
+        Returns:
+            The snapshot.
+        """
+        data = Path(path).read_bytes()
+        if not data.startswith(_MAGIC):
+            raise ValueError(f"`{path}` is not a catalog snapshot of this version")
+        if len(data) < len(_MAGIC) + 3 * _COUNT.size or _COUNT.unpack_from(
+            data, len(data) - _COUNT.size
+        )[0] != zlib.crc32(memoryview(data)[: -_COUNT.size]):
+            raise ValueError(f"the catalog snapshot `{path}` is corrupt")
+
+        try:
+            offset = len(_MAGIC)
+            (length,) = _COUNT.unpack_from(data, offset)
+            offset += _COUNT.size
+            strings = data[offset : offset + length].decode("utf-8").split("\n")
+            offset += length
+
+            (count,) = _COUNT.unpack_from(data, offset)
+            offset += _COUNT.size
+            remotes = []
+            for _ in range(count):
+                remotes.append(_REMOTE.unpack_from(data, offset))
+                offset += _REMOTE.size
+
+            total = sum(keys for _, keys in remotes)
+            names = _from_little_endian("I", data[offset : offset + 4 * total])
+            offset += 4 * total
+            codes = _from_little_endian("Q", data[offset : offset + 8 * total])
+
+            tables = []
+            start = 0
+            for name, keys in remotes:
+                end = start + keys
+                tables.append(
+                    KeyTable(
+                        strings[name],
+                        [strings[index] for index in names[start:end]],
+                        codes[start:end],
+                    )
+                )
+                start = end
+        except (struct.error, IndexError, UnicodeDecodeError) as error:
+            raise ValueError(f"the catalog snapshot `{path}` is corrupt: {error}")
+
+        return cls(strings[0], tables)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Save the snapshot to a file. The file is replaced at once,
+        so a program loading it never sees it half written.
+
+        Args:
+            path: The file to save to.
+
+        Raises:
+            OSError: If the file could not be written.
+        """
+        strings: Dict[str, int] = {self._version: 0}
+        remotes = bytearray()
+        names = array("I")
+        codes = array("Q")
+
+        for remote, table in self._tables.items():
+            index = strings.setdefault(remote, len(strings))
+            remotes += _REMOTE.pack(index, len(table))
+            for name in table:
+                names.append(strings.setdefault(name, len(strings)))
+            codes.extend(table.codes)
+
+        blob = "\n".join(strings).encode("utf-8")
+        data = bytearray(_MAGIC)
+        data += _COUNT.pack(len(blob)) + blob
+        data += _COUNT.pack(len(self._tables)) + remotes
+        data += _to_little_endian(names)
+        data += _to_little_endian(codes)
+        data += _COUNT.pack(zlib.crc32(data))
+
+        path = Path(path)
+        temporary = path.with_name(f".{path.name}.tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+
+
+class PersistentCatalog:
+    """Keeps a ``CatalogSnapshot`` of lircd up to date, both in memory
+    and on disk, so a program that restarts is ready in milliseconds
+    rather than after listing every remote again.
+
+    The snapshot saved last time is loaded straight away. A thread of
+    the catalog's own then fetches the whole catalog from lircd again,
+    in two round trips, to check the snapshot is still right. After
+    that it sends ``VERSION`` every poll interval, which reads any
+    broadcasts lircd sent in the meantime, and fetches the catalog
+    again if lircd broadcast a SIGHUP because it re-read its config or
+    reports another version. The file is only written when the catalog
+    changed.
+
+    Example:
+        >>> import lirc
+        >>> from lirc.catalog_snapshot import PersistentCatalog
+        >>> app = lirc.Client(catalog_cache=True)
+        >>> catalog = PersistentCatalog(
+        ...     lirc.Client(), "catalog.bin", on_change=app.catalog_cache.seed
+        ... )
+        >>> catalog.wait_ready(5)
+        True
+        >>> app.list_remotes()  # Served from memory.
+        ['tv', 'receiver']
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        path: Union[str, Path],
+        poll_interval: float = 1.0,
+        on_change: Optional[Callable[[CatalogSnapshot], None]] = None,
+    ) -> None:
+        """Initialize the catalog by loading the saved snapshot, if
+        there is one, and starting the thread that keeps it up to date.
+
+        Args:
+            client: The client to fetch the catalog with. The catalog
+                uses it from its thread, so it should not be used by
+                anything else until the catalog is closed.
+            path: The file the snapshot is saved to.
+            poll_interval: How often in seconds to send ``VERSION`` to
+                check whether lircd broadcast a SIGHUP, and to retry
+                fetching the catalog after it failed.
+            on_change: Called with the snapshot when it is loaded from
+                the file and whenever it changes, such as to seed a
+                client's ``CatalogCache``. It is called from the
+                catalog's thread after the first time.
+        """
+        self._client = client
+        self._path = Path(path)
+        self._poll_interval = poll_interval
+        self._on_change = on_change
+        self._condition = threading.Condition()
+        self._ready = threading.Event()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._saved: Optional[CatalogSnapshot] = None
+        self._error: Optional[Exception] = None
+        self._stale = True
+        self._closed = False
+
+        try:
+            self._saved = CatalogSnapshot.load(self._path)
+        except (OSError, ValueError) as error:
+            self._error = error
+        else:
+            self._set(self._saved)
+
+        self._client.subscribe(self._on_broadcast)
+        self._thread = threading.Thread(
+            target=self._run, name="lirc-catalog-snapshot", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> "PersistentCatalog":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def snapshot(self) -> Optional[CatalogSnapshot]:
+        """Retrieve the latest snapshot of the catalog.
+
+        Returns:
+            The snapshot, or None until one was loaded or fetched.
+        """
+        return self._snapshot
+
+    @property
+    def error(self) -> Optional[Exception]:
+        """Retrieve why loading or fetching the catalog last failed.
+
+        Returns:
+            The error, or None if the latest attempt worked.
+        """
+        return self._error
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait until there is a snapshot of the catalog.
+
+        Args:
+            timeout: The most seconds to wait. Waits forever if this is None.
+
+        Returns:
+            True once there is a snapshot; False if the wait timed out.
+        """
+        return self._ready.wait(timeout)
+
+    def refresh(self) -> None:
+        """Have the catalog fetched from lircd again, without waiting."""
+        with self._condition:
+            self._stale = True
+            self._condition.notify()
+
+    def close(self) -> None:
+        """Stop the thread and close the client."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+
+        self._thread.join()
+        self._client.unsubscribe(self._on_broadcast)
+        self._client.close()
+
+    def _on_broadcast(self, event: Broadcast) -> None:
+        if isinstance(event, ReplyPacket) and event.is_sighup:
+            self._stale = True
+
+    def _set(self, snapshot: CatalogSnapshot) -> None:
+        self._snapshot = snapshot
+        self._ready.set()
+        if self._on_change is not None:
+            self._on_change(snapshot)
+
+    def _update(self) -> bool:
+        """Fetch the catalog from lircd, and save it if it is not
+        what the file has.
+
+        Returns:
+            True if it worked; False if it is to be tried again.
+        """
+        self._stale = False
+        try:
+            snapshot = CatalogSnapshot.fetch(self._client)
+        except Exception as error:
+            self._stale = True
+            self._error = error
+            return False
+
+        # Cleared first, so waiting until ready never sees the
+        # error of loading the file once the fetch worked.
+        self._error = None
+        if snapshot != self._snapshot:
+            self._set(snapshot)
+
+        try:
+            if snapshot != self._saved:
+                snapshot.save(self._path)
+                self._saved = snapshot
+        except OSError as error:
+            self._stale = True
+            self._error = error
+            return False
+
+        return True
+
+    def _run(self) -> None:
+        """Fetch the catalog when it is stale, checking for a SIGHUP
+        every poll interval, until closed.
+        """
+        failed = False
+        while True:
+            with self._condition:
+                if failed or not self._stale:
+                    self._condition.wait(self._poll_interval)
+                if self._closed:
+                    return
+
+            if not self._stale:
+                self._check()
+
+            failed = self._stale and not self._update()
+
+    def _check(self) -> None:
+        """Send VERSION, whose reply is read after any broadcast lircd
+        sent before it, so a SIGHUP reaches ``_on_broadcast``. The
+        catalog is stale if that fails or lircd's version changed.
+        """
+        try:
+            version = self._client.version()
+        except Exception as error:
+            # Fetching goes through the client's reconnecting.
+            self._error = error
+            self._stale = True
+            return
+
+        if self._snapshot is None or version != self._snapshot.version:
+            self._stale = True
@@ -0,0 +1,373 @@
+"""The ``lirc`` command, for sending commands to lircd from the shell.
+
+Single commands can be run like ``irsend``:
+
+    $ lirc send-once tv KEY_POWER
+
+For scripts that send many commands, ``lirc batch`` keeps one connection
+to lircd open and reads commands line by line from stdin or a FIFO. All
+the lines read at once are sent to lircd in a single pipeline, and the
+result of each one is printed as a line of JSON.
+
+    $ printf 'send_once tv KEY_3\\nsend_once tv KEY_7\\n' | lirc batch
+    {"line": 1, "command": "send_once tv KEY_3", "ok": true, "data": []}
+    {"line": 2, "command": "send_once tv KEY_7", "ok": true, "data": []}
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import IO, Iterator, List, Optional, Tuple
+
+from .client import Client
+from .connection.lircd_connection import LircdConnection
+from .connection.tcp_connection import TcpConnection
+from .exceptions import LircError
+from .pipeline import Pipeline
+
+#: The number of arguments each batch command takes, at least and at most.
+BATCH_COMMANDS = {
+    "send_once": (2, 3),
+    "send_start": (2, 2),
+    "send_stop": (0, 2),
+    "list": (0, 1),
+    "simulate": (2, 4),
+    "set_transmitters": (1, 32),
+    "version": (0, 0),
+}
+
+
+def parse_address(address: Optional[str], timeout: float = 5.0) -> LircdConnection:
+    """Create a connection to lircd from an address given on the command line.
+
+    Args:
+        address: A ``host:port`` to connect to over TCP, a path to lircd's
+            unix socket, or None for the default of the operating system.
+        timeout: The amount of time to wait for lircd to reply.
+
+    Returns:
+        The unconnected connection.
+    """
+    if address is None:
+        return LircdConnection(timeout=timeout)
+
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit():
+        return TcpConnection((host, int(port)), timeout)
+
+    return LircdConnection(address, timeout=timeout)
+
+
+def parse_batch_command(line: str) -> Tuple[str, List[str]]:
+    """Parse a line of batch input into a command and its arguments.
+
+    Commands are the names of the ``Client`` methods, e.g. ``send_once``.
+    Dashes can be used instead of underscores and case does not matter.
+
+    Args:
+        line: The line, without its newline.
+
+    Raises:
+        ValueError: If the command is unknown or has the wrong number
+            of arguments.
+
+    Returns:
+        The command and its arguments.
+    """
+    words = line.split()
+    command = words[0].lower().replace("-", "_")
+    args = words[1:]
+
+    if command not in BATCH_COMMANDS:
+        raise ValueError(f"unknown command `{words[0]}`")
+
+    least, most = BATCH_COMMANDS[command]
+    if not least <= len(args) <= most or (command == "send_stop" and len(args) == 1):
+        raise ValueError(f"wrong number of arguments for `{command}`")
+
+    return command, args
+
+
+def queue_batch_command(pipe: Pipeline, command: str, args: List[str]) -> None:
+    """Queue a parsed batch command on a pipeline.
+
+    Args:
+        pipe: The pipeline to queue the command on.
+        command: The command from ``parse_batch_command``.
+        args: The arguments of the command.
+
+    Raises:
+        ValueError: If a numeric argument is not a number.
+    """
+    if command == "send_once":
+        pipe.send_once(args[0], args[1], *map(int, args[2:]))
+    elif command == "simulate":
+        pipe.simulate(args[0], args[1], *map(int, args[2:]))
+    elif command == "set_transmitters":
+        pipe.set_transmitters([int(transmitter) for transmitter in args])
+    elif command == "list":
+        if args:
+            pipe.list_remote_keys(args[0])
+        else:
+            pipe.list_remotes()
+    else:
+        getattr(pipe, command)(*args)
+
+
+def read_batches(stream: IO[bytes]) -> Iterator[List[bytes]]:
+    """Read lines from a stream, grouping together the lines that
+    arrive together.
+
+    Each read takes whatever is waiting on the stream without waiting
+    for more, so a burst of lines written at once is one batch while
+    lines written one at a time are each their own batch.
+
+    Args:
+        stream: A binary stream, such as stdin's buffer or a FIFO.
+
+    Returns:
+        An iterator over the complete lines of each read, undecoded.
+    """
+    fileno = stream.fileno()
+    pending = b""
+
+    while True:
+        data = os.read(fileno, 65536)
+        if not data:
+            if pending.strip():
+                yield [pending]
+            return
+
+        pending += data
+        *lines, pending = pending.split(b"\n")
+        if lines:
+            yield lines
+
+
+def run_batch(client: Client, stream: IO[bytes], output: IO[str]) -> int:
+    """Run the commands read from a stream over one connection,
+    printing the result of each one as a line of JSON.
+
+    Args:
+        client: The client to send the commands with.
+        stream: The binary stream to read commands from.
+        output: Where to print the results.
+
+    Returns:
+        0 if every command succeeded, or 1 if any of them failed.
+    """
+    pipe = client.pipeline()
+    line_number = 0
+    status = 0
+
+    for lines in read_batches(stream):
+        results = []
+        queued = []
+
+        for line in lines:
+            line_number += 1
+            command = line.decode(errors="replace").strip()
+            if not command or command.startswith("#"):
+                continue
+
+            result = {"line": line_number, "command": command}
+            results.append(result)
+            try:
+                # Raises UnicodeDecodeError, a ValueError, if the line
+                # is not UTF-8, so only this line fails.
+                line.decode()
+                queue_batch_command(pipe, *parse_batch_command(command))
+            except ValueError as error:
+                result.update(ok=False, error=str(error))
+            else:
+                queued.append(result)
+
+        try:
+            replies = pipe.execute(raise_on_error=False)
+        except (LircError, OSError) as error:
+            replies = [error] * len(queued)
+
+        for result, reply in zip(queued, replies):
+            if isinstance(reply, Exception):
+                result.update(ok=False, error=str(reply))
+            else:
+                data = reply if isinstance(reply, list) else [reply]
+                result.update(ok=True, data=data)
+
+        for result in results:
+            if not result["ok"]:
+                status = 1
+            output.write(json.dumps(result) + "\n")
+        output.flush()
+
+    return status
+
+
+def open_input(path: Optional[str], follow: bool) -> IO[bytes]:
+    """Open the stream to read batch commands from.
+
+    Args:
+        path: The file or FIFO to read from, or None for stdin.
+        follow: Whether to keep reading a FIFO after each writer closes
+            it. The FIFO is opened for writing as well, so that the end
+            of it is never reached and no writer's lines are lost
+            between one writer closing it and the next opening it.
+
+    Returns:
+        The opened binary stream. Closing it leaves stdin open.
+    """
+    if path is None:
+        return open(sys.stdin.buffer.fileno(), "rb", closefd=False)
+
+    if follow:
+        return os.fdopen(os.open(path, os.O_RDWR), "rb")
+
+    return open(path, "rb")
+
+
+def run_command(client: Client, args: argparse.Namespace) -> List[str]:
+    """Run a single command given on the command line.
+
+    Args:
+        client: The client to send the command with.
+        args: The parsed command line arguments.
+
+    Raises:
+        LircdCommandFailureError: If the command failed.
+
+    Returns:
+        The lines of data lircd replied with.
+    """
+    if args.command == "send-once":
+        reply = client.send_once(args.remote, args.key, args.count)
+    elif args.command == "send-start":
+        reply = client.send_start(args.remote, args.key)
+    elif args.command == "send-stop":
+        reply = client.send_stop(args.remote or "", args.key or "")
+    elif args.command == "list":
+        if args.remote:
+            reply = client.list_remote_keys(args.remote)
+        else:
+            reply = client.list_remotes()
+    elif args.command == "simulate":
+        reply = client.simulate(args.remote, args.key, args.repeat)
+    elif args.command == "set-transmitters":
+        reply = client.set_transmitters(args.transmitters)
+    else:
+        reply = client.version()
+
+    if reply is None:
+        return []
+    return reply if isinstance(reply, list) else [reply]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the parser of the command line arguments.
+
+    Returns:
+        The argument parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="lirc", description="Send commands to the lircd daemon."
+    )
+    parser.add_argument(
+        "-a",
+        "--address",
+        help="the path to lircd's socket, or HOST:PORT to connect over TCP "
+        "(default: lircd's default for the operating system)",
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        default=5.0,
+        help="seconds to wait for lircd to reply (default: %(default)s)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    send_once = commands.add_parser("send-once", help="send a key once")
+    send_once.add_argument("remote")
+    send_once.add_argument("key")
+    send_once.add_argument(
+        "-c", "--count", type=int, default=0, help="times to repeat the key"
+    )
+
+    send_start = commands.add_parser("send-start", help="start repeating a key")
+    send_start.add_argument("remote")
+    send_start.add_argument("key")
+
+    send_stop = commands.add_parser("send-stop", help="stop repeating a key")
+    send_stop.add_argument("remote", nargs="?")
+    send_stop.add_argument("key", nargs="?")
+
+    list_command = commands.add_parser(
+        "list", help="list the remotes, or the keys of a remote"
+    )
+    list_command.add_argument("remote", nargs="?")
+
+    simulate = commands.add_parser("simulate", help="simulate a button press")
+    simulate.add_argument("remote")
+    simulate.add_argument("key")
+    simulate.add_argument(
+        "-r", "--repeat", type=int, default=0, help="the repeat count of the press"
+    )
+
+    set_transmitters = commands.add_parser(
+        "set-transmitters", help="set the active transmitters"
+    )
+    set_transmitters.add_argument("transmitters", type=int, nargs="+")
+
+    commands.add_parser("version", help="print the version of lircd")
+
+    batch = commands.add_parser(
+        "batch",
+        help="run commands read line by line over one connection",
+        description="Run commands read line by line, such as `send_once tv "
+        "KEY_POWER`, over one connection to lircd. Lines that arrive together "
+        "are sent in one pipeline. The result of each is printed as JSON.",
+    )
+    batch.add_argument(
+        "-i", "--input", help="a file or FIFO to read from (default: stdin)"
+    )
+    batch.add_argument(
+        "-f",
+        "--follow",
+        action="store_true",
+        help="keep reading a FIFO after each writer closes it",
+    )
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the ``lirc`` command.
+
+    Args:
+        argv: The command line arguments. Defaults to ``sys.argv``.
+
+    Returns:
+        The exit status: 0 on success, 1 if a command failed or
+        lircd could not be reached.
+    """
+    args = build_parser().parse_args(argv)
+
+    try:
+        client = Client(parse_address(args.address, args.timeout))
+    except LircError as error:
+        print(f"lirc: {error}", file=sys.stderr)
+        return 1
+
+    try:
+        if args.command == "batch":
+            with open_input(args.input, args.follow) as stream:
+                return run_batch(client, stream, sys.stdout)
+
+        for line in run_command(client, args):
+            print(line)
+        return 0
+    except (LircError, OSError) as error:
+        print(f"lirc: {error}", file=sys.stderr)
+        return 1
+    finally:
+        client.close()
@@ -1,21 +1,89 @@
-from pathlib import Path
-from typing import List, Type, Union
-
+import threading
+import time
+from contextlib import contextmanager
+from typing import (
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from .button_event_parser import ButtonEvent
+from .catalog_cache import CatalogCache
+from .commands import CommandMixin
 from .connection.abstract_connection import AbstractConnection
+from .connection.demultiplexer import Broadcast, Demultiplexer
 from .connection.lircd_connection import LircdConnection
-from .exceptions import LircdCommandFailureError
+from .exceptions import (
+    LircdCommandFailureError,
+    LircdSocketError,
+    LircdTimeoutError,
+)
+from .key_table import KeyTable
+from .metrics import Measurement, Metrics
+from .pipeline import Pipeline
+from .prepared_command import PreparedCommand
 from .reply_packet_parser import ReplyPacketParser
 
+T = TypeVar("T")
+
 
-class Client:
+class Client(CommandMixin):
     """Communicate with the lircd daemon."""
 
-    def __init__(self, connection: Type[AbstractConnection] = None) -> None:
+    def __init__(
+        self,
+        connection: Type[AbstractConnection] = None,
+        catalog_cache: bool = False,
+        metrics: Optional[Metrics] = None,
+        command_timeout: Optional[float] = None,
+    ) -> None:
         """Initialize the client by connecting to the lircd socket.
 
         Args:
             connection: The connection to lircd. Created with defaults
             depending on the operating system if one is not provided.
+            catalog_cache: Whether to cache the replies of
+            ``list_remotes`` and ``list_remote_keys`` until lircd
+            broadcasts that it re-read its config.
+            metrics: Where to record the latency and outcome of every
+            command. Nothing is recorded if this is not provided.
+            command_timeout: The most time to wait for the whole reply to
+            each command, however many reads it takes. Defaults to the
+            timeout of the connection.
+
+        Raises:
+            TypeError: If connection is not an instance of AbstractConnection.
+            LircdConnectionError: If the socket cannot connect to the address.
+        """
+        # Used for start_repeat and stop_repeat
+        self._last_send_start_remote = None
+        self._last_send_start_key = None
+
+        # The state lircd keeps for this connection, which is set
+        # again after reconnecting.
+        self._transmitter_mask = None
+        self._repeating = set()
+
+        self._metrics = metrics
+        self._command_timeout = command_timeout
+        self._local = threading.local()
+        self._open(connection)
+
+        self._catalog_cache = None
+        if catalog_cache:
+            self._catalog_cache = CatalogCache(self._send_command)
+            self.subscribe(self._catalog_cache.on_broadcast)
+
+    def _open(self, connection: Optional[AbstractConnection]) -> None:
+        """Connect the connection the client sends its commands on.
+
+        Args:
+            connection: The connection to lircd, or None to create one
+                with the defaults for the operating system.
 
         Raises:
             TypeError: If connection is not an instance of AbstractConnection.
@@ -27,13 +95,12 @@ class Client:
         if not isinstance(connection, AbstractConnection):
             raise TypeError("`connection` must be an instance of `AbstractConnection`")
 
-        # Used for start_repeat and stop_repeat
-        self._last_send_start_remote = None
-        self._last_send_start_key = None
-
         self._connection = connection
         self._connection.connect()
 
+        # Sorts out lircd's broadcasts from the replies to our commands.
+        self._demux = Demultiplexer(self._connection)
+
     def _send_command(self, command: str) -> Union[str, List[str]]:
         """Send a command to lircd.
 
@@ -43,213 +110,585 @@ class Client:
         Returns:
             The data from the lirc response packet.
         """
-        self._connection.send(command)
 
-        parser = ReplyPacketParser()
-        while not parser.is_finished:
-            line = self._connection.readline()
-            parser.feed(line)
+        def send_command() -> Union[str, List[str]]:
+            deadline = self._command_deadline(self._connection)
+            measurement = self._measure(command)
+            self._connection.send(command)
+            return self._read_reply(
+                command, measurement=measurement, deadline=deadline
+            )
 
-        parser_data = parser.data[0] if len(parser.data) == 1 else parser.data
+        return self._reconnecting(send_command)
 
-        if not parser.success:
-            raise LircdCommandFailureError(
-                f"The `{command}` command sent to lircd failed: {parser_data}"
+    def _send_encoded(
+        self, data: bytes, command: str, parser: ReplyPacketParser = None
+    ) -> Union[str, List[str]]:
+        """Send an already encoded command to lircd.
+
+        Args:
+            data: The encoded command, including its newline.
+            command: The command, used for error messages.
+            parser: The parser to reuse for reading the reply.
+
+        Returns:
+            The data from the lirc response packet.
+        """
+
+        def send_encoded() -> Union[str, List[str]]:
+            deadline = self._command_deadline(self._connection)
+            measurement = self._measure(command, len(data))
+            self._connection.send_bytes(data)
+            return self._read_reply(
+                command, parser=parser, measurement=measurement, deadline=deadline
             )
 
-        return parser_data
+        return self._reconnecting(send_encoded)
 
-    def close(self) -> None:
-        """Close the connection to the socket."""
-        self._connection.close()
+    def _reconnecting(self, operation: Callable[[], T]) -> T:
+        """Run an operation on the connection. If the connection was
+        lost and it can reconnect, such as a ``TcpConnection`` after
+        lircd restarted, reconnect and run the operation once more.
 
-    def send_once(self, remote: str, key: str, repeat_count: int = 0) -> None:
-        """Send an lircd SEND_ONCE command.
+        A command whose reply was lost is sent again, so it can run
+        twice if lircd went away after running it.
 
         Args:
-            key: The name of the key to send.
-            remote: The remote to use keys from.
-            repeat_count: The number of times to repeat this key.
-                If this is set to 1, that means this key will be
-                sent twice (repeated once).
+            operation: Sends a command and reads its reply.
+
+        Raises:
+            LircdConnectionError: If reconnecting failed.
+
+        Returns:
+            What the operation returned.
+        """
+        try:
+            return operation()
+        except (LircdSocketError, ConnectionError):
+            if not hasattr(self._connection, "reconnect"):
+                raise
 
-        .. versionchanged:: 2.0.0
-            The repeat_count parameter has been changed to
-            have a default value of 0 instead of 1. This ensures
-            send_once only sends 1 IR signal instead of sending 1
-            and then repeating it (therefore, 2 signals).
+        self._reconnect()
+        return operation()
+
+    def _reconnect(self) -> None:
+        """Connect to lircd again and set the state lircd had for the
+        old connection: the active transmitters and any key that was
+        being repeated with ``send_start``.
 
         Raises:
-            LircdCommandFailure: If the command fails.
+            LircdConnectionError: If reconnecting failed.
+            LircdCommandFailureError: If setting the state failed.
+        """
+        self._connection.reconnect()
+        self._demux.reset()
+
+        commands = []
+        if self._transmitter_mask is not None:
+            commands.append(f"SET_TRANSMITTERS {self._transmitter_mask}")
+        for remote, key in sorted(self._repeating):
+            commands.append(f"SEND_START {remote} {key}")
+
+        for command in commands:
+            deadline = self._command_deadline(self._connection)
+            measurement = self._measure(command)
+            self._connection.send(command)
+            self._read_reply(command, measurement=measurement, deadline=deadline)
+
+    @contextmanager
+    def deadline(self, seconds: float) -> Iterator[None]:
+        """Give all the commands sent in a block one shared time budget.
+
+        Each command still gets no more than the command timeout, but
+        none of them can run past the end of the budget. Deadlines only
+        apply to the thread that set them, and a deadline set inside
+        another one can't extend it.
+
+        Example:
+            >>> import lirc
+            >>> client = lirc.Client()
+            >>> with client.deadline(0.25):
+            ...     client.send_once("tv", "KEY_3")
+            ...     client.send_once("tv", "KEY_7")
+
+        Args:
+            seconds: The time from now that every command in the block
+                has to be done by.
+
+        Yields:
+            Nothing; the deadline is lifted when the block is left.
         """
-        self._send_command(f"SEND_ONCE {remote} {key} {repeat_count}")
+        previous = getattr(self._local, "deadline", None)
+        deadline = time.monotonic() + seconds
+        if previous is not None:
+            deadline = min(deadline, previous)
 
-    def send_start(self, remote: str, key: str) -> None:
-        """Send an lircd SEND_START command.
+        self._local.deadline = deadline
+        try:
+            yield
+        finally:
+            self._local.deadline = previous
 
-        This will repeat the given key until
-        send_stop is called.
+    def _command_deadline(self, connection: AbstractConnection) -> Optional[float]:
+        """Work out when the reply to a command that is about to be sent
+        has to be read by.
 
         Args:
-            remote: The remote to use keys from.
-            key: The name of the key to start sending.
+            connection: The connection the command is sent on. Its timeout
+                is the budget when the client has no command timeout.
 
-        Raises:
-            LircdCommandFailure: If the command fails.
+        Returns:
+            The ``time.monotonic()`` time of the deadline, or None if
+            only the timeout of each read applies.
         """
-        self._last_send_start_remote = remote
-        self._last_send_start_key = key
-        self._send_command(f"SEND_START {remote} {key}")
+        deadline = getattr(self._local, "deadline", None)
+
+        timeout = self._command_timeout
+        if timeout is None:
+            timeout = getattr(connection, "timeout", None)
 
-    def send_stop(self, remote: str = "", key: str = "") -> None:
-        """Send an lircd SEND_STOP command.
+        if timeout is not None:
+            command_deadline = time.monotonic() + timeout
+            if deadline is None or command_deadline < deadline:
+                deadline = command_deadline
 
-        The remote and key default to the remote and key
-        last used with ``send_start`` if they are not specified,
-        since the most likely use case is sending a ``send_start``
-        and then a ``send_stop``.
+        return deadline
+
+    def _measure(
+        self, command: str, bytes_sent: Optional[int] = None
+    ) -> Optional[Measurement]:
+        """Start measuring a command that is about to be sent.
 
         Args:
-            remote: The remote to stop.
-            key: The key to stop sending.
+            command: A command from the lircd socket command interface.
+            bytes_sent: The length of the encoded command, if known.
 
-        Raises:
-            LircdCommandFailure: If the command fails.
+        Returns:
+            The measurement to pass to ``_read_reply``, or None if
+            the client is not recording metrics.
         """
-        if not remote and self._last_send_start_remote:
-            remote = self._last_send_start_remote
+        if self._metrics is None:
+            return None
 
-        if not key and self._last_send_start_key:
-            key = self._last_send_start_key
+        return self._metrics.measure(command, bytes_sent)
 
-        self._send_command(f"SEND_STOP {remote} {key}")
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        """Retrieve where the latency and outcome of every command
+        is recorded.
 
-    def list_remotes(self) -> List[str]:
-        """List all the remotes that lirc has in
-        its ``/etc/lirc/lircd.conf.d`` folder.
+        Returns:
+            The metrics, or None if they are not being recorded.
+        """
+        return self._metrics
+
+    def _read_reply(
+        self,
+        command: str,
+        demux: Demultiplexer = None,
+        parser: ReplyPacketParser = None,
+        measurement: Optional[Measurement] = None,
+        deadline: Optional[float] = None,
+    ) -> Union[str, List[str]]:
+        """Read the reply packet to a command that was sent to lircd.
+
+        Args:
+            command: The command the reply packet belongs to.
+            demux: The demultiplexer of the connection the command
+                was sent on. Defaults to the client's own.
+            parser: The parser to reuse for reading the reply.
+                A new one is created if this is not given.
+            measurement: Records the reply lines and the outcome
+                of the command, if metrics are being recorded.
+            deadline: The ``time.monotonic()`` time to have read the
+                whole reply by. Without one, only the timeout of each
+                read from the connection applies.
 
         Raises:
-            LircdCommandFailure: If the command fails.
+            LircdCommandFailureError: If the reply packet says the
+                command failed.
+            LircdTimeoutError: If the reply was not read in time.
 
         Returns:
-            The list of all remotes.
+            The data from the lirc response packet.
         """
-        return self._send_command("LIST")
+        demux = demux or self._demux
+
+        try:
+            parser = demux.read_reply(
+                command,
+                parser,
+                deadline,
+                measurement.line if measurement is not None else None,
+            )
+        except BaseException as error:
+            if measurement is not None:
+                measurement.finish(
+                    "timeout" if isinstance(error, TimeoutError) else "error"
+                )
+            raise
 
-    def list_remote_keys(self, remote: str) -> List[str]:
-        """List all the keys for a specific remote.
+        if measurement is not None:
+            measurement.finish("success" if parser.success else "failure")
+
+        parser_data = parser.data[0] if len(parser.data) == 1 else parser.data
+
+        if not parser.success:
+            raise LircdCommandFailureError(
+                f"The `{command.strip()}` command sent to lircd failed: {parser_data}"
+            )
+
+        return parser_data
+
+    def _execute_pipeline(
+        self,
+        commands: List[str],
+        raise_on_error: bool = True,
+        demux: Demultiplexer = None,
+    ) -> List[Union[str, List[str], LircdCommandFailureError]]:
+        """Send many commands to lircd in a single write and read
+        their reply packets back in order.
+
+        lircd answers the commands it receives in the order it
+        received them, so the nth reply packet belongs to the
+        nth command.
 
         Args:
-            remote: The remote to list the keys of.
+            commands: Commands from the lircd socket command interface.
+            raise_on_error: Whether to raise the first command failure
+                once all the replies are read instead of returning it.
+            demux: The demultiplexer of the connection to send the
+                commands on. Defaults to the client's own.
 
         Raises:
-            LircdCommandFailure: If the command fails.
+            LircdCommandFailureError: If raise_on_error is set and
+                any of the commands fail.
+            LircdTimeoutError: If a reply was not read within the
+                time budget of a command after the reply before it.
 
         Returns:
-            The list of keys from the remote.
+            The data from each reply packet, or the
+            LircdCommandFailureError for each command that failed.
         """
-        return self._send_command(f"LIST {remote}")
+        if not commands:
+            return []
+
+        if demux is None:
+            return self._reconnecting(
+                lambda: self._execute_pipeline(commands, raise_on_error, self._demux)
+            )
+
+        # Whether lircd ends up with the transmitters set by the last
+        # SET_TRANSMITTERS in the pipeline is only known once its reply
+        # is read.
+        sets_transmitters = [
+            index
+            for index, command in enumerate(commands)
+            if command.split(" ", 1)[0].upper() == "SET_TRANSMITTERS"
+        ]
+        if sets_transmitters:
+            self._transmitter_mask = None
+
+        measurements = [self._measure(command) for command in commands]
+        demux.connection.send("".join(f"{command.strip()}\n" for command in commands))
+
+        results = self._read_pipeline_replies(commands, measurements, demux)
 
-    def start_logging(self, path: Union[str, Path]) -> None:
-        """Send a lircd SET_INPUTLOG command which sets
-        the path to log all lircd received data to.
+        if sets_transmitters:
+            index = sets_transmitters[-1]
+            if not isinstance(results[index], LircdCommandFailureError):
+                self._transmitter_mask = int(commands[index].split()[1])
+
+        self._track_repeating(commands, results)
+
+        if raise_on_error:
+            for result in results:
+                if isinstance(result, LircdCommandFailureError):
+                    raise result
+
+        return results
+
+    def _track_repeating(
+        self,
+        commands: List[str],
+        results: List[Union[str, List[str], LircdCommandFailureError]],
+    ) -> None:
+        """Keep track of the keys a pipeline started or stopped repeating,
+        the same way ``send_start`` and ``send_stop`` do, so they are
+        started again after reconnecting.
 
         Args:
-            path: The path to start logging lircd recieved data to.
+            commands: The commands the pipeline sent.
+            results: The result of each command.
+        """
+        for command, result in zip(commands, results):
+            if isinstance(result, LircdCommandFailureError):
+                continue
+
+            try:
+                directive, remote, key = command.split()
+            except ValueError:
+                continue
+
+            if directive.upper() == "SEND_START":
+                self._repeating.add((remote, key))
+            elif directive.upper() == "SEND_STOP":
+                self._repeating.discard((remote, key))
+
+    def _read_pipeline_replies(
+        self,
+        commands: List[str],
+        measurements: List[Optional[Measurement]],
+        demux: Demultiplexer,
+    ) -> List[Union[str, List[str], LircdCommandFailureError]]:
+        """Read the replies to a pipeline of commands that was sent.
+
+        Args:
+            commands: The commands that were sent, in order.
+            measurements: The measurement of each command, if any.
+            demux: The demultiplexer of the connection they were sent on.
 
         Raises:
-            LircdCommandFailure: If the command fails.
+            LircdTimeoutError: If a reply was not read within the
+                time budget of a command after the reply before it.
+
+        Returns:
+            The data from each reply packet, or the
+            LircdCommandFailureError for each command that failed.
         """
-        self._send_command(f"SET_INPUTLOG {path}")
+        started = time.monotonic()
+        results = []
+        for index, (command, measurement) in enumerate(zip(commands, measurements)):
+            # lircd runs the commands one after another, so each reply
+            # gets the time budget of a command once the one before it
+            # is read, rather than all of them sharing a single one.
+            deadline = self._command_deadline(demux.connection)
+            try:
+                results.append(
+                    self._read_reply(
+                        command, demux, measurement=measurement, deadline=deadline
+                    )
+                )
+            except LircdCommandFailureError as error:
+                results.append(error)
+            except BaseException as error:
+                # The replies to the commands after this one are
+                # still to come, and are thrown away when they do.
+                for abandoned in commands[index + 1 :]:
+                    demux.abandon(abandoned)
+
+                if isinstance(error, LircdTimeoutError):
+                    raise LircdTimeoutError(
+                        f"A pipeline of {len(commands)} commands sent to lircd "
+                        f"timed out after {time.monotonic() - started:.3f} "
+                        f"seconds, having read {index} of their replies: {error}"
+                    ) from error
+                raise
+
+        return results
+
+    def pipeline(self) -> Pipeline:
+        """Create a pipeline that queues up commands instead of
+        sending them, and then sends all of them to lircd at once
+        when it is executed.
 
-    def stop_logging(self) -> None:
-        """Stop logging to the inputlog path from start_logging.
+        Example:
+            >>> import lirc
+            >>> client = lirc.Client()
+            >>> with client.pipeline() as pipe:
+            ...     pipe.send_once("tv", "KEY_3")
+            ...     pipe.send_once("tv", "KEY_7")
+            ...     pipe.execute()
+            [[], []]
 
-        Raises:
-            LircdCommandFailure: If the command fails.
+        Returns:
+            A new pipeline using this client's connection.
         """
-        # When calling SET_INPUTLOG without the path argument,
-        # it will stop logging and close the logfile.
-        self._send_command("SET_INPUTLOG")
+        return Pipeline(self._execute_pipeline)
 
-    def version(self) -> str:
-        """Retrieve the version of LIRC
+    def _poll_broadcasts(self) -> None:
+        """Read any broadcasts that arrived while the client was idle."""
+        self._demux.poll()
 
-        Raises:
-            LircdCommandFailure: If the command fails.
+    @property
+    def catalog_cache(self) -> Optional[CatalogCache]:
+        """Retrieve the cache of remotes and their keys, which has the
+        hit and miss counters and can be refreshed explicitly.
 
         Returns:
-            The version of LIRC being used.
+            The catalog cache, or None if it is not enabled.
         """
-        return self._send_command("VERSION")
+        return self._catalog_cache
 
-    def driver_option(self, key: str, value: str) -> None:
-        """Set driver-specific option named key to given value.
+    def close(self) -> None:
+        """Close the connection to the socket."""
+        self._connection.close()
 
-        Args:
-            key: The key to set for the driver.
-            value: The value for the key to set.
+    def events(self) -> Iterator[ButtonEvent]:
+        """Iterate over the button presses lircd broadcasts.
+
+        lircd sends every button press it decodes to all the clients
+        connected to its socket. This blocks until the next one arrives,
+        waiting through socket timeouts. Button presses that arrived
+        while a command was waiting on its reply are yielded first.
+        Any SIGHUP packets lircd sends in between are skipped over, and
+        so are lines that are neither a button press nor part of a
+        packet.
+
+        Example:
+            >>> import lirc
+            >>> client = lirc.Client()
+            >>> for event in client.events():
+            ...     print(event.remote, event.key, event.repeat)
 
         Raises:
-            LircdCommandFailure: If the command fails.
+            LircdInvalidReplyPacketError: If lircd sent a SIGHUP packet
+                in an invalid format.
+            LircdSocketError: If lircd closed the connection or some
+                other error happened when reading from the socket.
+
+        Yields:
+            Each button event as it is received.
         """
-        self._send_command(f"DRV_OPTION {key} {value}")
+        return self._button_events(self._demux)
 
-    def simulate(
-        self, remote: str, key: str, repeat_count: int = 0, keycode: int = 0
-    ) -> None:
-        """Simulate an IR event.
+    @staticmethod
+    def _button_events(demux: Demultiplexer) -> Iterator[ButtonEvent]:
+        """Yield the button presses read by a demultiplexer, waiting
+        through socket timeouts and skipping over SIGHUP packets.
+
+        Args:
+            demux: The demultiplexer of the connection to read from.
+
+        Yields:
+            Each button event as it is received.
+        """
+        read_event = demux.read_event
+
+        while True:
+            try:
+                event = read_event()
+            except TimeoutError:
+                continue
+
+            if isinstance(event, ButtonEvent):
+                yield event
+
+    def subscribe(self, callback: Callable[[Broadcast], None]) -> None:
+        """Call a function with every broadcast from lircd this client reads.
+
+        Broadcasts are read whenever the client reads from the socket,
+        such as while waiting on the reply to a command. Button presses
+        are passed as ``ButtonEvent``\\ s and SIGHUP packets as a
+        ``ReplyPacket`` with a SIGHUP command.
 
-        The ``--allow-simulate`` command line option to lircd must be active for this
-        command not to fail.
+        Args:
+            callback: The function to call with each broadcast. Exceptions
+                it raises are logged and do not fail the read it came in on.
+        """
+        self._demux.subscribe(callback)
+
+    def unsubscribe(self, callback: Callable[[Broadcast], None]) -> None:
+        """Stop calling a function that was subscribed to broadcasts.
+
+        Args:
+            callback: The function to stop calling.
+
+        Raises:
+            ValueError: If the function is not subscribed.
+        """
+        self._demux.unsubscribe(callback)
+
+    def prepare(self, remote: str, key: str, repeat_count: int = 0) -> PreparedCommand:
+        """Prepare an lircd SEND_ONCE command to be sent many times.
 
-        Lircd Format:
-            <code> <repeat count> <button name> <remote control name>
+        The command is formatted and encoded once, and the returned
+        handle reuses the same reply parser every time it is called,
+        so sending a key often does no per-call formatting.
 
         Example:
-            0000000000f40bf0 00 KEY_UP ANIMAX
+            >>> import lirc
+            >>> client = lirc.Client()
+            >>> volume_up = client.prepare("tv", "KEY_VOLUMEUP")
+            >>> for _ in range(10):
+            ...     volume_up()
 
         Args:
-            remote: The remote to simulate key presses from.
-            key: The key on the remote to simulate.
-            repeat_count: The number of times to repeat the simulated key press.
-            keycode: lircd(8) describes this option as a 16 hexadecimal digit
-                number encoding of the IR signal. However, it says it is depreciated
-                and should be ignored.
+            remote: The remote to use keys from.
+            key: The name of the key to send.
+            repeat_count: The number of times to repeat this key.
 
-        .. versionchanged:: 3.0.0
-            The repeat_count parameter has been changed to
-            have a default value of 0 instead of 1. The previous
-            value was incorrect since it leads to the command
-            being sent twice (1 and then repeated once).
+        Returns:
+            A handle that sends the command when called.
+        """
+        return PreparedCommand(self, f"SEND_ONCE {remote} {key} {repeat_count}")
+
+    def list_remotes(self) -> List[str]:
+        """List all the remotes that lirc has in
+        its ``/etc/lirc/lircd.conf.d`` folder.
+
+        If the catalog cache is enabled, this is served
+        from memory after the first call.
 
         Raises:
             LircdCommandFailure: If the command fails.
+
+        Returns:
+            The list of all remotes.
+        """
+        if self._catalog_cache is not None:
+            self._poll_broadcasts()
+            return self._catalog_cache.remotes()
+
+        return super().list_remotes()
+
+    def list_remote_keys(self, remote: str) -> List[str]:
+        """List all the keys for a specific remote.
+
+        If the catalog cache is enabled, this is served
+        from memory after the first call for the remote.
+
+        Args:
+            remote: The remote to list the keys of.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+
+        Returns:
+            The list of keys from the remote.
         """
-        self._send_command(
-            "SIMULATE %016d %02d %s %s\n" % (keycode, repeat_count, key, remote)
-        )
+        if self._catalog_cache is not None:
+            self._poll_broadcasts()
+            return self._catalog_cache.remote_keys(remote)
+
+        return super().list_remote_keys(remote)
 
-    def set_transmitters(self, transmitters: Union[int, List[int]]) -> None:
-        """Set the active transmitters.
+    def key_table(self, remote: str) -> KeyTable:
+        """List all the keys for a specific remote, parsed into a table
+        of their names and codes.
+
+        If the catalog cache is enabled, the table is parsed once and
+        served from memory after that.
 
         Example:
             >>> import lirc
             >>> client = lirc.Client()
-            >>> client.set_transmitters(1)
-            >>> client.set_transmitters([1,3,5])
+            >>> client.key_table("tv").code_of("KEY_POWER")
+            4335
 
         Args:
-            transmitters: The transmitters to set active.
+            remote: The remote to list the keys of.
 
         Raises:
             LircdCommandFailure: If the command fails.
-        """
-        mask = transmitters
+            LircdInvalidReplyPacketError: If a key is not listed as
+                a code and a name.
 
-        if isinstance(transmitters, List):
-            mask = 0
-            for transmitter in transmitters:
-                mask |= 1 << (int(transmitter) - 1)
+        Returns:
+            The keys of the remote.
+        """
+        if self._catalog_cache is not None:
+            self._poll_broadcasts()
+            return self._catalog_cache.key_table(remote)
 
-        self._send_command(f"SET_TRANSMITTERS {mask}")
+        return KeyTable.from_reply(remote, self._send_command(f"LIST {remote}"))
@@ -0,0 +1,438 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Iterator, List, Optional, TypeVar, Union
+
+from .button_event_parser import ButtonEvent
+from .client import Client
+from .connection.abstract_connection import AbstractConnection
+from .connection.demultiplexer import Broadcast, Demultiplexer
+from .connection.lircd_connection import LircdConnection
+from .exceptions import (
+    LircdCommandFailureError,
+    LircdInvalidReplyPacketError,
+    LircdTimeoutError,
+    LircError,
+)
+from .reply_packet_parser import ReplyPacketParser
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# How often broadcasts are read off the idle connections while the
+# pool is being used, so they don't pile up on connections that the
+# last in, first out order of the pool leaves unused.
+_DRAIN_INTERVAL = 1.0
+
+
+class ClientPool(Client):
+    """Communicate with the lircd daemon from many threads at once.
+
+    A ``Client`` owns a single connection, so using one from several
+    threads at the same time mixes up the commands and replies on its
+    socket. A pool has all the same command methods, but every command
+    checks out a connection of its own for the duration of the command
+    and returns it afterwards, so that connections are reused instead
+    of connecting again for every thread.
+
+    lircd broadcasts to every connection, so the broadcasts that arrive
+    on idle connections are read off them every so often while the
+    pool is used, and passed to subscribers. ``events()`` reads button
+    presses on a connection of its own instead.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        connection_factory: Callable[[], AbstractConnection] = LircdConnection,
+        checkout_timeout: Optional[float] = None,
+        **client_options,
+    ) -> None:
+        """Initialize the pool. Connections are only made as they are
+        first needed.
+
+        Args:
+            size: The most connections to lircd the pool will have open.
+            connection_factory: Creates a new, unconnected connection to
+                lircd. Defaults to ``LircdConnection`` with the defaults
+                for the operating system.
+            checkout_timeout: The amount of time to wait for a connection
+                once all of them are in use. Waits forever if this is None.
+            **client_options: The ``catalog_cache``, ``metrics`` and
+                ``command_timeout`` options of ``Client``, which apply to
+                every connection in the pool.
+
+        Raises:
+            ValueError: If size is less than 1.
+        """
+        if size < 1:
+            raise ValueError("`size` must be at least 1")
+
+        # Guards the state for start_repeat, stop_repeat and reconnecting,
+        # which every thread shares.
+        self._state_lock = threading.Lock()
+        self._connection_factory = connection_factory
+        self._checkout_timeout = checkout_timeout
+        self._size = size
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._subscribers = []
+        self._closed = False
+        self._drained = time.monotonic()
+
+        super().__init__(**client_options)
+
+    def _open(self, connection: Optional[AbstractConnection]) -> None:
+        """Leave connecting to lircd until a connection is first
+        checked out of the pool.
+
+        Args:
+            connection: Unused, since every connection in the pool is
+                created by the connection factory.
+        """
+
+    def __enter__(self) -> "ClientPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def size(self) -> int:
+        """Retrieve the most connections the pool will have open.
+
+        Returns:
+            The size of the pool.
+        """
+        return self._size
+
+    @property
+    def idle_connections(self) -> int:
+        """Retrieve how many open connections are waiting to be used.
+
+        Returns:
+            The number of idle connections.
+        """
+        return self._idle.qsize()
+
+    def _checkout(self) -> Demultiplexer:
+        """Take a healthy connection out of the pool, connecting a new
+        one if there are no idle ones left.
+
+        Raises:
+            TimeoutError: If all the connections stayed in use for
+                longer than the checkout timeout.
+            LircdConnectionError: If a new connection cannot connect.
+
+        Returns:
+            The demultiplexer of the checked out connection.
+        """
+        if self._closed:
+            raise ValueError("the client pool is closed")
+
+        if not self._slots.acquire(timeout=self._checkout_timeout):
+            raise TimeoutError(
+                f"all {self._size} connections to lircd stayed in use for "
+                f"{self._checkout_timeout} seconds."
+            )
+
+        try:
+            while True:
+                try:
+                    demux = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+
+                is_alive = getattr(demux.connection, "is_alive", None)
+                if is_alive is None or is_alive():
+                    return demux
+
+                demux.connection.close()
+
+            connection = self._connection_factory()
+            connection.connect()
+            # Broadcasts only go to the subscribers of the pool, since
+            # nothing reads the events of a pooled connection.
+            demux = Demultiplexer(connection, max_events=0)
+            demux.subscribe(self._broadcast)
+            return demux
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, demux: Demultiplexer, healthy: bool) -> None:
+        """Return a checked out connection to the pool.
+
+        Args:
+            demux: The demultiplexer of the checked out connection.
+            healthy: Whether the connection can be reused. Connections
+                whose socket failed part way through a reply are closed.
+        """
+        if healthy and not self._closed:
+            self._idle.put(demux)
+        else:
+            demux.connection.close()
+
+        self._slots.release()
+
+        if time.monotonic() - self._drained >= _DRAIN_INTERVAL:
+            self._poll_broadcasts()
+
+    def _using_connection(self, operation: Callable[[Demultiplexer], T]) -> T:
+        """Run an operation with a connection checked out of the pool.
+
+        Args:
+            operation: Called with the demultiplexer of the checked out
+                connection.
+
+        Returns:
+            What the operation returned.
+        """
+        demux = self._checkout()
+        healthy = False
+        try:
+            result = operation(demux)
+            healthy = True
+            return result
+        except LircdCommandFailureError:
+            # lircd replied in full, so the connection is still usable.
+            healthy = True
+            raise
+        except (LircdTimeoutError, LircdInvalidReplyPacketError):
+            # The rest of the reply is skipped when the connection is
+            # next used, which is cheaper than connecting again.
+            healthy = True
+            raise
+        finally:
+            self._checkin(demux, healthy)
+
+    def _send_command(self, command: str) -> Union[str, List[str]]:
+        """Send a command to lircd on a connection from the pool.
+
+        Args:
+            command: A command from the lircd socket command interface.
+
+        Returns:
+            The data from the lirc response packet.
+        """
+
+        def send_command(demux: Demultiplexer) -> Union[str, List[str]]:
+            deadline = self._command_deadline(demux.connection)
+            measurement = self._measure(command)
+            demux.connection.send(command)
+            return self._read_reply(
+                command, demux, measurement=measurement, deadline=deadline
+            )
+
+        return self._using_connection(send_command)
+
+    def _send_encoded(
+        self, data: bytes, command: str, parser: ReplyPacketParser = None
+    ) -> Union[str, List[str]]:
+        """Send an already encoded command to lircd on a connection
+        from the pool.
+
+        Args:
+            data: The encoded command, including its newline.
+            command: The command, used for error messages.
+            parser: Ignored, since a prepared command can be called
+                from many threads at once through a pool.
+
+        Returns:
+            The data from the lirc response packet.
+        """
+
+        def send_encoded(demux: Demultiplexer) -> Union[str, List[str]]:
+            deadline = self._command_deadline(demux.connection)
+            measurement = self._measure(command, len(data))
+            demux.connection.send_bytes(data)
+            return self._read_reply(
+                command, demux, measurement=measurement, deadline=deadline
+            )
+
+        return self._using_connection(send_encoded)
+
+    def _execute_pipeline(
+        self,
+        commands: List[str],
+        raise_on_error: bool = True,
+        demux: Demultiplexer = None,
+    ) -> List[Union[str, List[str], LircdCommandFailureError]]:
+        """Send many commands to lircd in a single write on a
+        connection from the pool and read their replies in order.
+
+        Args:
+            commands: Commands from the lircd socket command interface.
+            raise_on_error: Whether to raise the first command failure
+                once all the replies are read instead of returning it.
+            demux: Ignored, a connection is always checked out.
+
+        Returns:
+            The data from each reply packet, or the
+            LircdCommandFailureError for each command that failed.
+        """
+        execute_pipeline = super()._execute_pipeline
+        return self._using_connection(
+            lambda demux: execute_pipeline(commands, raise_on_error, demux)
+        )
+
+    def _poll_broadcasts(self) -> None:
+        """Read the broadcasts that arrived on the idle connections.
+        No connection is made to do this, and connections that are in
+        use are left to the commands using them. A connection that
+        fails while it is read is closed.
+        """
+        self._drained = time.monotonic()
+
+        # Idle connections are only taken out of the pool with a slot,
+        # so a thread checking one out meanwhile can't go over the size
+        # of the pool by connecting a new one. They are all taken out
+        # before any is returned, since the last one returned is the
+        # first one taken, and returned in the order they were in.
+        demuxes = []
+        while self._slots.acquire(blocking=False):
+            try:
+                demuxes.append(self._idle.get_nowait())
+            except queue.Empty:
+                self._slots.release()
+                break
+
+        for demux in reversed(demuxes):
+            try:
+                demux.poll()
+                healthy = True
+            except (LircError, OSError):
+                healthy = False
+            self._checkin_idle(demux, healthy)
+
+    def _checkin_idle(self, demux: Demultiplexer, healthy: bool) -> None:
+        """Return a connection that was taken out to be polled,
+        without polling the idle connections again.
+
+        Args:
+            demux: The demultiplexer of the connection.
+            healthy: Whether the connection can be reused.
+        """
+        if healthy and not self._closed:
+            self._idle.put(demux)
+        else:
+            demux.connection.close()
+
+        self._slots.release()
+
+    def events(self) -> Iterator[ButtonEvent]:
+        """Iterate over the button presses lircd broadcasts.
+
+        The button presses are read on a connection of their own, which
+        is not part of the pool and is closed once the iteration stops.
+        This blocks until the next one arrives, waiting through socket
+        timeouts. Any SIGHUP packets lircd sends in between are skipped,
+        and so are lines that are neither a button press nor part of a
+        packet.
+
+        Raises:
+            LircdConnectionError: If the connection cannot connect.
+            LircdInvalidReplyPacketError: If lircd sent a SIGHUP packet
+                in an invalid format.
+            LircdSocketError: If lircd closed the connection or some
+                other error happened when reading from the socket.
+
+        Yields:
+            Each button event as it is received.
+        """
+        if self._closed:
+            raise ValueError("the client pool is closed")
+
+        connection = self._connection_factory()
+        connection.connect()
+        try:
+            yield from self._button_events(Demultiplexer(connection))
+        finally:
+            connection.close()
+
+    def send_start(self, remote: str, key: str) -> None:
+        """Send an lircd SEND_START command, like ``Client.send_start``.
+
+        The key being repeated is shared by every thread using the
+        pool, so only one thread at a time can start or stop one.
+        """
+        with self._state_lock:
+            super().send_start(remote, key)
+
+    def send_stop(self, remote: str = "", key: str = "") -> None:
+        """Send an lircd SEND_STOP command, like ``Client.send_stop``."""
+        with self._state_lock:
+            super().send_stop(remote, key)
+
+    def set_transmitters(
+        self, transmitters: Union[int, List[int]], force: bool = False
+    ) -> None:
+        """Set the active transmitters, like ``Client.set_transmitters``.
+
+        The transmitters last set are shared by every thread using the
+        pool, so only one thread at a time can set them.
+        """
+        with self._state_lock:
+            super().set_transmitters(transmitters, force)
+
+    def _track_repeating(
+        self,
+        commands: List[str],
+        results: List[Union[str, List[str], LircdCommandFailureError]],
+    ) -> None:
+        """Keep track of the keys a pipeline started or stopped
+        repeating, one thread at a time.
+        """
+        with self._state_lock:
+            super()._track_repeating(commands, results)
+
+    def subscribe(self, callback: Callable[[Broadcast], None]) -> None:
+        """Call a function with every broadcast from lircd read on
+        any of the pool's connections.
+
+        Since lircd broadcasts to every connection, the same broadcast
+        can be passed to the function once for each open connection.
+
+        Args:
+            callback: The function to call with each broadcast. Exceptions
+                it raises are logged and do not fail the read it came in on.
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Broadcast], None]) -> None:
+        """Stop calling a function that was subscribed to broadcasts.
+
+        Args:
+            callback: The function to stop calling.
+
+        Raises:
+            ValueError: If the function is not subscribed.
+        """
+        self._subscribers.remove(callback)
+
+    def _broadcast(self, event: Broadcast) -> None:
+        """Pass a broadcast read on one of the connections to every
+        subscriber of the pool.
+
+        Args:
+            event: The button event or SIGHUP packet to pass on.
+        """
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("A subscriber failed to handle %r.", event)
+
+    def close(self) -> None:
+        """Close every idle connection. Connections that are in use
+        are closed once the command using them is done.
+        """
+        self._closed = True
+
+        while True:
+            try:
+                self._idle.get_nowait().connection.close()
+            except queue.Empty:
+                return
@@ -0,0 +1,259 @@
+from pathlib import Path
+from typing import List, Optional, Set, Tuple, Union
+
+
+def transmitter_mask(transmitters: Union[int, List[int]]) -> int:
+    """Turn transmitters into the mask SET_TRANSMITTERS takes.
+
+    Args:
+        transmitters: A mask already, or a list of the transmitters,
+            numbered from 1.
+
+    Returns:
+        The mask, with the bit for each transmitter set.
+    """
+    if not isinstance(transmitters, List):
+        return transmitters
+
+    mask = 0
+    for transmitter in transmitters:
+        mask |= 1 << (int(transmitter) - 1)
+    return mask
+
+
+class CommandMixin:
+    """The methods for the lircd commands that a ``Client`` sends
+    straight away and a ``Pipeline`` queues up to send together.
+
+    Each method formats its command and hands it to ``_send_command``,
+    which the class using the mixin implements. It also sets these
+    attributes, which track the state lircd keeps for a connection:
+
+    - ``_last_send_start_remote`` and ``_last_send_start_key``: what
+      ``send_start`` last repeated, for ``send_stop`` to default to.
+    - ``_repeating``: the remote and key of each key being repeated.
+    - ``_transmitter_mask``: the mask ``set_transmitters`` last set,
+      or None if it isn't known.
+    """
+
+    _last_send_start_remote: Optional[str]
+    _last_send_start_key: Optional[str]
+    _repeating: Set[Tuple[str, str]]
+    _transmitter_mask: Optional[int]
+
+    def _send_command(self, command: str) -> Union[str, List[str], None]:
+        """Send a command to lircd, or queue it up to be sent.
+
+        Args:
+            command: A command from the lircd socket command interface.
+
+        Returns:
+            The data from the lirc response packet, or None if
+            the command was only queued up.
+        """
+        raise NotImplementedError
+
+    def send_once(self, remote: str, key: str, repeat_count: int = 0) -> None:
+        """Send an lircd SEND_ONCE command.
+
+        Args:
+            key: The name of the key to send.
+            remote: The remote to use keys from.
+            repeat_count: The number of times to repeat this key.
+                If this is set to 1, that means this key will be
+                sent twice (repeated once).
+
+        .. versionchanged:: 2.0.0
+            The repeat_count parameter has been changed to
+            have a default value of 0 instead of 1. This ensures
+            send_once only sends 1 IR signal instead of sending 1
+            and then repeating it (therefore, 2 signals).
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        self._send_command(f"SEND_ONCE {remote} {key} {repeat_count}")
+
+    def send_start(self, remote: str, key: str) -> None:
+        """Send an lircd SEND_START command.
+
+        This will repeat the given key until
+        send_stop is called.
+
+        Args:
+            remote: The remote to use keys from.
+            key: The name of the key to start sending.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        self._last_send_start_remote = remote
+        self._last_send_start_key = key
+        self._send_command(f"SEND_START {remote} {key}")
+        self._repeating.add((remote, key))
+
+    def send_stop(self, remote: str = "", key: str = "") -> None:
+        """Send an lircd SEND_STOP command.
+
+        The remote and key default to the remote and key
+        last used with ``send_start`` if they are not specified,
+        since the most likely use case is sending a ``send_start``
+        and then a ``send_stop``.
+
+        Args:
+            remote: The remote to stop.
+            key: The key to stop sending.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        if not remote and self._last_send_start_remote:
+            remote = self._last_send_start_remote
+
+        if not key and self._last_send_start_key:
+            key = self._last_send_start_key
+
+        self._send_command(f"SEND_STOP {remote} {key}")
+        self._repeating.discard((remote, key))
+
+    def list_remotes(self) -> List[str]:
+        """List all the remotes that lirc has in
+        its ``/etc/lirc/lircd.conf.d`` folder.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+
+        Returns:
+            The list of all remotes.
+        """
+        return self._send_command("LIST")
+
+    def list_remote_keys(self, remote: str) -> List[str]:
+        """List all the keys for a specific remote.
+
+        Args:
+            remote: The remote to list the keys of.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+
+        Returns:
+            The list of keys from the remote.
+        """
+        return self._send_command(f"LIST {remote}")
+
+    def start_logging(self, path: Union[str, Path]) -> None:
+        """Send a lircd SET_INPUTLOG command which sets
+        the path to log all lircd received data to.
+
+        Args:
+            path: The path to start logging lircd recieved data to.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        self._send_command(f"SET_INPUTLOG {path}")
+
+    def stop_logging(self) -> None:
+        """Stop logging to the inputlog path from start_logging.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        # When calling SET_INPUTLOG without the path argument,
+        # it will stop logging and close the logfile.
+        self._send_command("SET_INPUTLOG")
+
+    def version(self) -> str:
+        """Retrieve the version of LIRC
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+
+        Returns:
+            The version of LIRC being used.
+        """
+        return self._send_command("VERSION")
+
+    def driver_option(self, key: str, value: str) -> None:
+        """Set driver-specific option named key to given value.
+
+        Args:
+            key: The key to set for the driver.
+            value: The value for the key to set.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        self._send_command(f"DRV_OPTION {key} {value}")
+
+    def simulate(
+        self, remote: str, key: str, repeat_count: int = 0, keycode: int = 0
+    ) -> None:
+        """Simulate an IR event.
+
+        The ``--allow-simulate`` command line option to lircd must be active for this
+        command not to fail.
+
+        Lircd Format:
+            <code> <repeat count> <button name> <remote control name>
+
+        Example:
+            0000000000f40bf0 00 KEY_UP ANIMAX
+
+        Args:
+            remote: The remote to simulate key presses from.
+            key: The key on the remote to simulate.
+            repeat_count: The number of times to repeat the simulated key press.
+            keycode: lircd(8) describes this option as a 16 hexadecimal digit
+                number encoding of the IR signal. However, it says it is depreciated
+                and should be ignored.
+
+        .. versionchanged:: 3.0.0
+            The repeat_count parameter has been changed to
+            have a default value of 0 instead of 1. The previous
+            value was incorrect since it leads to the command
+            being sent twice (1 and then repeated once).
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        self._send_command(
+            "SIMULATE %016d %02d %s %s\n" % (keycode, repeat_count, key, remote)
+        )
+
+    def set_transmitters(
+        self, transmitters: Union[int, List[int]], force: bool = False
+    ) -> None:
+        """Set the active transmitters.
+
+        The client remembers the transmitters it last set, and setting
+        the same ones again is skipped since lircd already has them.
+
+        Example:
+            >>> import lirc
+            >>> client = lirc.Client()
+            >>> client.set_transmitters(1)
+            >>> client.set_transmitters([1,3,5])
+
+        Args:
+            transmitters: The transmitters to set active.
+            force: Whether to send the command even if the transmitters
+                are the ones last set, such as when another program may
+                have changed them since.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+        """
+        mask = transmitter_mask(transmitters)
+        if mask == self._transmitter_mask and not force:
+            return
+
+        try:
+            self._send_command(f"SET_TRANSMITTERS {mask}")
+        except BaseException:
+            # lircd may or may not have set the mask, so the next one
+            # is sent whatever it is.
+            self._transmitter_mask = None
+            raise
+        self._transmitter_mask = mask
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Optional, Union
 
 
 class AbstractConnection(ABC):
@@ -13,13 +13,21 @@ class AbstractConnection(ABC):
         pass
 
     @abstractmethod
-    def readline(self) -> str:
+    def readline(self, deadline: Optional[float] = None) -> str:
         pass
 
     @abstractmethod
     def send(self, data: str):
         pass
 
+    def send_bytes(self, data: bytes):
+        """Send data that is already encoded, including its newline.
+
+        Connections can override this to skip the checks and encoding
+        that send() does. By default, it is decoded and passed to send().
+        """
+        self.send(data.decode("utf-8"))
+
     @abstractmethod
     def close(self) -> None:
         pass
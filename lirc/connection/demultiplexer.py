@@ -0,0 +1,540 @@
+import logging
+import time
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional, Union
+
+from lirc.button_event_parser import ButtonEvent, ButtonEventParser
+from lirc.exceptions import (
+    LircdInvalidButtonEventError,
+    LircdInvalidReplyPacketError,
+    LircdTimeoutError,
+)
+from lirc.reply_packet_parser import ReplyPacket, ReplyPacketParser
+
+from .abstract_connection import AbstractConnection
+
+Broadcast = Union[ButtonEvent, ReplyPacket]
+
+logger = logging.getLogger(__name__)
+
+_BEGIN = ReplyPacketParser.State.BEGIN
+
+
+class _Reply(NamedTuple):
+    """A reply packet that was sorted out of the stream, along with
+    the command line lircd echoed in it.
+    """
+
+    command: str
+    parser: ReplyPacketParser
+
+
+class Demultiplexer:
+    def __init__(self, connection: AbstractConnection, max_events: int = 1024):
+        """Sorts the lines read from an lircd connection into the reply
+        packets and the broadcasts lircd sends to every client.
+
+        Besides replying to the commands a client sends, lircd broadcasts
+        a line for every button press it decodes and a SIGHUP packet
+        whenever it re-reads its config. These all arrive on the same
+        socket, so the broadcasts are taken out of the stream here and
+        only the reply packets are handed to whoever is waiting on a
+        command with ``read_reply()``. That way one connection can carry
+        both. Each reply is parsed once, as it is sorted, with the parser
+        of the reader waiting on it if there is one.
+
+        Broadcasts are passed to every subscriber as they are read and
+        are also queued up to be read with ``read_event()``. Button
+        presses are ``ButtonEvent``\\ s and SIGHUPs are ``ReplyPacket``\\ s
+        with a SIGHUP command.
+
+        When a reader gives up on a reply part way through, the rest of
+        it still arrives later. ``abandon()`` keeps track of that, so the
+        next reader skips the leftovers and stale replies, which
+        ``is_leftover()`` and ``is_stale()`` tell apart, instead of
+        reconnecting.
+
+        Args:
+            connection: The connection to lircd to read lines from.
+            max_events: The most broadcasts to keep queued up. Once the
+                queue is full, the oldest broadcast is dropped to make
+                room for a new one.
+        """
+        self._connection = connection
+        # The replies sorted out of the stream that have not been read,
+        # oldest first. Each is a _Reply, or the line or the error to
+        # raise for something that was not a valid reply packet.
+        self._replies = deque()
+        self._events = deque(maxlen=max_events)
+        self._subscribers = []
+
+        # The state of sorting the line that comes in next. A BEGIN
+        # line could start either a reply or a SIGHUP packet, so it
+        # is held on to until the line after it is read.
+        self._begin_line = None
+        self._in_sighup = False
+        self._reply = None
+
+        # The parser of the reader waiting on a reply, to parse the next
+        # reply that begins with, and the function it wants each line of
+        # a reply passed to.
+        self._parser = None
+        self._on_line = None
+
+        # Whether the stream has to be resynchronized before the next
+        # reply is read, and the commands whose replies were given up
+        # on before any of them arrived, oldest first.
+        self._resyncing = False
+        self._abandoned = deque()
+        self._stale_replies = 0
+
+    @property
+    def connection(self) -> AbstractConnection:
+        """Retrieve the connection lines are read from.
+
+        Returns:
+            The connection to lircd.
+        """
+        return self._connection
+
+    @property
+    def pending_events(self) -> int:
+        """Retrieve how many broadcasts are queued up to be read.
+
+        Returns:
+            The number of queued broadcasts.
+        """
+        return len(self._events)
+
+    @property
+    def pending_replies(self) -> int:
+        """Retrieve how many whole replies are sorted and waiting to
+        be read with ``read_reply()``.
+
+        Returns:
+            The number of waiting replies, including stale ones.
+        """
+        return len(self._replies) - (self._reply is not None)
+
+    @property
+    def resyncing(self) -> bool:
+        """Check whether the stream is being resynchronized after a
+        reply was given up on part way through.
+
+        Returns:
+            True until the reply to a command is read in sync again.
+        """
+        return self._resyncing
+
+    @property
+    def stale_replies(self) -> int:
+        """Retrieve how many stale replies were thrown away while
+        resynchronizing.
+
+        Returns:
+            The number of stale replies.
+        """
+        return self._stale_replies
+
+    def subscribe(self, callback: Callable[[Broadcast], None]) -> None:
+        """Call a function with every broadcast that is read.
+
+        Args:
+            callback: The function to call. It is called on the
+                thread that read the broadcast, so it should return
+                quickly. Exceptions it raises are logged and ignored.
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Broadcast], None]) -> None:
+        """Stop calling a function that was subscribed.
+
+        Args:
+            callback: The function to stop calling.
+
+        Raises:
+            ValueError: If the function is not subscribed.
+        """
+        self._subscribers.remove(callback)
+
+    def reset(self) -> None:
+        """Throw away any reply packets read so far and start sorting
+        lines afresh, such as after reconnecting. Queued broadcasts and
+        subscribers are kept.
+        """
+        self._replies.clear()
+        self._begin_line = None
+        self._in_sighup = False
+        self._reply = None
+        self._parser = None
+        self._resyncing = False
+        self._abandoned.clear()
+
+    def abandon(self, command: Optional[str] = None) -> None:
+        """Note that a reply was given up on part way through, such as
+        after a timeout or an invalid reply packet. Whatever is left of
+        it is thrown away before the next reply is read, instead of
+        being mistaken for that reply.
+
+        Args:
+            command: A command none of whose reply was read, so that
+                its whole reply is thrown away once it arrives. None
+                if only the rest of a reply is left to skip.
+        """
+        self._resyncing = True
+        if command is not None:
+            self._abandoned.append(" ".join(command.split()))
+
+    def is_leftover(self, line: str) -> bool:
+        """Check whether a line read where a reply packet should begin
+        is left over from a reply that was given up on.
+
+        Args:
+            line: The line read before the BEGIN line of a reply.
+
+        Returns:
+            True if the stream is being resynchronized and the line
+            is not a BEGIN line, so it should be skipped.
+        """
+        return self._resyncing and line.strip() != "BEGIN"
+
+    def is_stale(self, echoed: str, command: str) -> bool:
+        """Check whether a reply is to a command other than the one
+        the reader is waiting on, by the command line lircd echoes.
+
+        lircd replies to commands in the order it received them, so
+        once the reply to an abandoned command arrives, any abandoned
+        before it will never be replied to. Once the reply to the
+        command itself arrives, the stream is back in sync.
+
+        Args:
+            echoed: The command line of the reply.
+            command: The command that was sent.
+
+        Returns:
+            True if the reply is stale and should be thrown away.
+        """
+        if not self._resyncing:
+            return False
+
+        echoed = " ".join(echoed.split())
+        if echoed in self._abandoned:
+            while self._abandoned.popleft() != echoed:
+                pass
+            self._stale_replies += 1
+            return True
+
+        if echoed != " ".join(command.split()):
+            self._stale_replies += 1
+            return True
+
+        self._abandoned.clear()
+        self._resyncing = False
+        return False
+
+    def read_reply(
+        self,
+        command: str,
+        parser: Optional[ReplyPacketParser] = None,
+        deadline: Optional[float] = None,
+        on_line: Optional[Callable[[str], None]] = None,
+    ) -> ReplyPacketParser:
+        """Read the reply packet to a command, setting aside any
+        broadcasts that come in before it.
+
+        If an earlier reply was given up on part way through, the stream
+        is resynchronized first: lines left over from it are skipped, and
+        replies that echo another command are thrown away. When this
+        reply is given up on, it is abandoned, so the next reply is
+        resynchronized.
+
+        Args:
+            command: The command that was sent.
+            parser: The parser to parse the reply with. It is reset
+                first. A new one is used if this is not given, or if
+                the parser is still parsing a reply that was given up on.
+            deadline: The ``time.monotonic()`` time to have read the
+                whole reply by. Without one, only the timeout of each
+                read from the connection applies.
+            on_line: Called with each line of a reply that is read,
+                such as to measure the reply.
+
+        Raises:
+            LircdTimeoutError: If the connection timed out or the
+                deadline passed.
+            LircdSocketError: If some other error happened when
+                trying to read from the connection.
+            LircdInvalidReplyPacketError: If the reply packet, or a
+                SIGHUP packet, is in an invalid format.
+
+        Returns:
+            The parser the reply was parsed with.
+        """
+        if parser is None or self._is_parsing(parser):
+            parser = ReplyPacketParser()
+        else:
+            parser.reset()
+
+        started = time.monotonic()
+        lines = 0
+
+        def count_line(line: str) -> None:
+            nonlocal lines
+            lines += 1
+            if on_line is not None:
+                on_line(line)
+
+        self._parser = parser
+        self._on_line = count_line
+        try:
+            return self._read_reply_in_sync(command, parser, deadline)
+        except BaseException as error:
+            # An invalid line could have been the start of this reply,
+            # so only a reply none of which was read is waited for in full.
+            if isinstance(error, LircdInvalidReplyPacketError):
+                self.abandon()
+            else:
+                self.abandon(command)
+
+            if isinstance(error, TimeoutError) and not isinstance(
+                error, LircdTimeoutError
+            ):
+                state = _BEGIN
+                if self._reply is not None:
+                    state = self._reply.parser.state
+                raise LircdTimeoutError(
+                    f"The `{command.strip()}` command sent to lircd timed out "
+                    f"after {time.monotonic() - started:.3f} seconds in the "
+                    f"{state.name} state of its reply, having read "
+                    f"{lines} lines: {error}"
+                ) from error
+            raise
+        finally:
+            self._parser = None
+            self._on_line = None
+
+    def _read_reply_in_sync(
+        self,
+        command: str,
+        parser: ReplyPacketParser,
+        deadline: Optional[float],
+    ) -> ReplyPacketParser:
+        """Read replies until the one to a command, skipping over what
+        is left of replies that were given up on.
+
+        Args:
+            command: The command that was sent.
+            parser: The parser offered for the reply.
+            deadline: The ``time.monotonic()`` time to have read the
+                whole reply by, if any.
+
+        Raises:
+            LircdInvalidReplyPacketError: If the reply packet is in an
+                invalid format.
+
+        Returns:
+            The parser the reply was parsed with.
+        """
+        while True:
+            while not self.pending_replies:
+                self._read(deadline)
+
+            reply = self._replies.popleft()
+            if isinstance(reply, str):
+                if self.is_leftover(reply):
+                    continue
+                # A line that is neither a broadcast nor the start of
+                # a reply, which the parser reports as invalid.
+                ReplyPacketParser().feed(reply)
+            if isinstance(reply, LircdInvalidReplyPacketError):
+                raise reply
+
+            if not self.is_stale(reply.command, command):
+                return reply.parser
+
+            # The parser can be used for the next reply, unless
+            # one began while this one was waiting to be read.
+            if reply.parser is parser and self._parser is None:
+                parser.reset()
+                self._parser = parser
+
+    def read_event(self) -> Broadcast:
+        """Read the next broadcast, setting aside the lines of
+        any reply packets that come in before it.
+
+        Raises:
+            TimeoutError: If the connection timed out.
+            LircdSocketError: If some other error happened when
+                trying to read from the connection.
+            LircdInvalidReplyPacketError: If there is a SIGHUP packet
+                which is in an invalid format.
+
+        Returns:
+            The oldest queued button event or SIGHUP packet.
+        """
+        while not self._events:
+            self._read()
+
+        return self._events.popleft()
+
+    def poll(self, deadline: Optional[float] = None) -> None:
+        """Sort every line that can be read without waiting on lircd.
+
+        This is used to pick up broadcasts, such as a SIGHUP, that
+        arrived while nothing was reading from the connection. It does
+        nothing for connections that cannot tell whether they have data
+        waiting, i.e. ones without a ``has_data()`` method.
+
+        Args:
+            deadline: The ``time.monotonic()`` time to have read the
+                rest of a line by, if only part of it has arrived.
+
+        Raises:
+            TimeoutError: If the rest of a line did not arrive
+                before the deadline.
+            LircdSocketError: If lircd closed the connection or some
+                other error happened when reading from it.
+            LircdInvalidReplyPacketError: If there is a SIGHUP packet
+                which is in an invalid format.
+        """
+        has_data = getattr(self._connection, "has_data", None)
+        if has_data is None:
+            return
+
+        while has_data():
+            self._read(deadline)
+
+    def drain_events(self) -> List[Broadcast]:
+        """Take all the queued broadcasts without reading any more.
+
+        Returns:
+            The queued broadcasts, oldest first.
+        """
+        events = list(self._events)
+        self._events.clear()
+        return events
+
+    def _is_parsing(self, parser: ReplyPacketParser) -> bool:
+        """Check whether a parser is parsing a reply that was sorted
+        but not read yet, so it can't be reset and used again.
+        """
+        return any(
+            isinstance(reply, _Reply) and reply.parser is parser
+            for reply in self._replies
+        )
+
+    def _dispatch(self, event: Broadcast) -> None:
+        """Queue a broadcast and pass it to every subscriber.
+
+        Args:
+            event: The button event or SIGHUP packet to pass on.
+        """
+        self._events.append(event)
+        for callback in list(self._subscribers):
+            # A broadcast is passed on while reading whatever is being
+            # read, often the reply to an unrelated command, so a failing
+            # subscriber must not make that read fail.
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("A subscriber failed to handle %r.", event)
+
+    def _read(self, deadline: Optional[float] = None) -> None:
+        """Read a line from the connection and sort it.
+
+        Args:
+            deadline: The ``time.monotonic()`` time to have read the
+                line by, if any.
+
+        Raises:
+            LircdInvalidReplyPacketError: If there is a SIGHUP packet
+                which is in an invalid format.
+        """
+        if deadline is None:
+            line = self._connection.readline()
+        else:
+            line = self._connection.readline(deadline)
+        stripped = line.strip()
+
+        if self._reply is not None:
+            self._sort_reply_line(line, stripped)
+        elif not stripped:
+            return
+        elif self._in_sighup:
+            self._in_sighup = False
+            if stripped != "END":
+                raise LircdInvalidReplyPacketError(
+                    "Expected an END line with the received SIGHUP packet from "
+                    f"lircd, got `{stripped}` instead."
+                )
+            self._dispatch(ReplyPacket("SIGHUP", False))
+        elif self._begin_line is not None:
+            self._sort_packet_start(line, stripped)
+        elif stripped == "BEGIN":
+            self._begin_line = line
+        else:
+            self._sort_stray_line(line, stripped)
+
+    def _sort_reply_line(self, line: str, stripped: str) -> None:
+        """Feed a line to the parser of the reply being sorted.
+
+        Args:
+            line: The line as it was read.
+            stripped: The line without surrounding whitespace.
+        """
+        if self._on_line is not None:
+            self._on_line(line)
+        try:
+            self._reply.parser.feed(stripped)
+        except LircdInvalidReplyPacketError as error:
+            # The reader of the reply gets the error in its place.
+            self._replies[-1] = error
+            self._reply = None
+            return
+
+        if self._reply.parser.is_finished:
+            self._reply = None
+
+    def _sort_packet_start(self, line: str, stripped: str) -> None:
+        """Start sorting a reply or SIGHUP packet by the line after
+        its BEGIN line.
+
+        Args:
+            line: The line as it was read.
+            stripped: The line without surrounding whitespace.
+        """
+        begin_line, self._begin_line = self._begin_line, None
+        if stripped == "SIGHUP":
+            self._in_sighup = True
+            return
+
+        # The reply is parsed with the parser of the reader waiting
+        # on it, if there is one that has not been used yet.
+        parser = self._parser or ReplyPacketParser()
+        self._parser = None
+        parser.feed(begin_line)
+        parser.feed(stripped)
+        self._reply = _Reply(stripped, parser)
+        self._replies.append(self._reply)
+        if self._on_line is not None:
+            self._on_line(begin_line)
+            self._on_line(line)
+
+    def _sort_stray_line(self, line: str, stripped: str) -> None:
+        """Sort a line that is not part of a packet, which is a button
+        event unless it is left over from a reply or an invalid one.
+
+        Args:
+            line: The line as it was read.
+            stripped: The line without surrounding whitespace.
+        """
+        try:
+            self._dispatch(ButtonEventParser.parse(stripped))
+        except LircdInvalidButtonEventError:
+            # Only a reader waiting on a reply has a use for it;
+            # otherwise, it is dropped so it can't pile up.
+            if self._on_line is None:
+                logger.debug("Dropped a stray line from lircd: %r", stripped)
+                return
+            self._on_line(line)
+            self._replies.append(stripped)
@@ -1,6 +1,7 @@
+import select
 import socket
-from collections import deque
-from typing import Union
+import time
+from typing import Optional, Union
 
 from lirc.exceptions import LircdConnectionError, LircdSocketError
 
@@ -34,7 +35,8 @@ class LircdConnection(AbstractConnection):
                 i.e. ``socket.socket(socket.AF_INET, socket.SOCK_STREAM)``.
 
             timeout: The amount of time to wait for data from the socket before
-                we timeout.
+                we timeout. A ``Client`` also uses it as the time budget for the
+                whole reply to each command, unless given a command timeout.
         """
         default = DefaultConnection()
 
@@ -44,10 +46,17 @@ class LircdConnection(AbstractConnection):
         if socket is None:
             socket = default.socket
 
-        self._buffer = deque()
+        # Received data that has not been handed out by readline() yet
+        # starts at _buffer_start in _buffer. Data is received into the
+        # reusable _chunk, so no new bytes objects are created per read.
+        self._buffer = bytearray()
+        self._buffer_start = 0
         self._buffer_size = 4096
+        self._chunk = bytearray(self._buffer_size)
+        self._chunk_view = memoryview(self._chunk)
         self._address = address
         self._socket = socket
+        self._timeout = timeout
         self._socket.settimeout(timeout)
 
     def connect(self):
@@ -77,6 +86,60 @@ class LircdConnection(AbstractConnection):
         """
         return self._address
 
+    @property
+    def timeout(self) -> float:
+        """Retrieve the amount of time to wait for data from the socket.
+
+        Returns:
+            The timeout in seconds.
+        """
+        return self._timeout
+
+    @property
+    def socket(self) -> socket.socket:
+        """Retrieve the socket this lircd connection uses.
+
+        Returns:
+            The socket to lircd.
+        """
+        return self._socket
+
+    def has_data(self) -> bool:
+        """Check whether there is data to read without waiting on lircd.
+
+        Returns:
+            True if there is a complete line in the buffer or data
+            waiting on the socket; False otherwise.
+        """
+        if self._buffer.find(b"\n", self._buffer_start) != -1:
+            return True
+
+        try:
+            readable, _, _ = select.select([self._socket], [], [], 0)
+        except (OSError, ValueError):
+            return False
+
+        return bool(readable)
+
+    def is_alive(self) -> bool:
+        """Check whether the connection to lircd is still open without
+        blocking or taking any data off the socket.
+
+        Returns:
+            False if lircd closed the connection or the socket is in an
+            error state; True otherwise.
+        """
+        if self._buffer_start < len(self._buffer):
+            return True
+
+        try:
+            readable, _, _ = select.select([self._socket], [], [], 0)
+            if not readable:
+                return True
+            return self._socket.recv(1, socket.MSG_PEEK) != b""
+        except (OSError, ValueError):
+            return False
+
     def close(self):
         """Closes the socket connection.
         """
@@ -99,45 +162,112 @@ class LircdConnection(AbstractConnection):
 
         self._socket.sendall(data.encode("utf-8"))
 
-    def readline(self) -> str:
+    def send_bytes(self, data: bytes):
+        """Send an already encoded command to the lircd socket connection.
+
+        Unlike send(), the data is not checked or changed in any way,
+        so it must end with a newline.
+
+        Args:
+            data: The encoded data to send to the lircd socket.
+        """
+        self._socket.sendall(data)
+
+    def readline(self, deadline: Optional[float] = None) -> str:
         """Read a line of data from the lircd socket.
 
-        We read 4096 bytes at a time as the buffer size.
-        Therefore after data is read from the socket, all
-        the lines are stored in a buffer if there is more than
-        1 and subsequent calls grab a line that stored in that
-        buffer until it is empty. Then, another call to the
-        socket would be made.
+        We read up to 4096 bytes at a time from the socket into
+        a reusable chunk and append them to a buffer. Complete lines
+        are then handed out of that buffer one at a time, and a
+        partial line at the end of it is kept until the rest of it
+        arrives, so lines split across reads are never broken up.
+        Another read from the socket is only made once the buffer
+        has no complete lines left.
+
+        Args:
+            deadline: The ``time.monotonic()`` time to have read the line
+                by, no matter how many reads it takes. Without one, each
+                read waits for up to the timeout given on initialization.
 
         Raises:
             TimeoutError: If we are not able to grab data from
                 the socket in a specified amount of time (the initial
-                timeout time on initialization).
+                timeout time on initialization) or before the deadline.
 
-            LircdSocketError: If some other error happened when
-                trying to read from the socket.
+            LircdSocketError: If lircd closed the connection or some
+                other error happened when trying to read from the socket.
 
         Returns:
-            A line from the lircd socket.
+            A line from the lircd socket without its newline. If lircd
+            closed the connection, any partial line left in the buffer
+            is returned as the last line.
         """
-        if len(self._buffer) >= 1:
-            return self._buffer.popleft()
+        while True:
+            end = self._buffer.find(b"\n", self._buffer_start)
 
-        try:
-            packet = self._socket.recv(self._buffer_size)
+            if end != -1:
+                line = self._decode(self._buffer_start, end)
+                self._buffer_start = end + 1
+                return line
+
+            # Move the partial line to the front before reading more
+            # so that the buffer does not keep growing.
+            del self._buffer[: self._buffer_start]
+            self._buffer_start = 0
+
+            if not self._fill(deadline):
+                if not self._buffer:
+                    raise LircdSocketError("lircd closed the connection.")
+
+                line = self._decode(0, len(self._buffer))
+                self._buffer.clear()
+                return line
+
+    def _decode(self, start: int, end: int) -> str:
+        """Decode part of the buffer without copying it to bytes first.
+
+        Args:
+            start: The index of the first byte to decode.
+            end: The index after the last byte to decode.
+
+        Returns:
+            The decoded part of the buffer.
+        """
+        with memoryview(self._buffer) as view:
+            return str(view[start:end], "utf-8")
 
-            if packet.endswith(b"\n"):
-                packet = packet.strip()
+    def _fill(self, deadline: Optional[float] = None) -> int:
+        """Receive data from the socket and add it to the buffer.
+
+        Args:
+            deadline: The ``time.monotonic()`` time to give up waiting at,
+                instead of waiting for up to the timeout of the socket.
 
-            if b"\n" in packet:
-                self._buffer.extend(
-                    line.decode("utf-8") for line in packet.split(b"\n")
+        Raises:
+            TimeoutError: If the socket timed out or the deadline passed.
+            LircdSocketError: If some other error happened when
+                trying to read from the socket.
+
+        Returns:
+            The number of bytes received. This is 0 if lircd
+            closed the connection.
+        """
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(
+                    "the deadline passed before the data on the socket arrived."
                 )
-            else:
-                self._buffer.append(packet.decode("utf-8"))
+            self._socket.settimeout(remaining)
 
-            return self._buffer.popleft()
+        try:
+            received = self._socket.recv_into(self._chunk_view)
         except socket.timeout:
+            if deadline is not None:
+                raise TimeoutError(
+                    "the deadline passed before the data on the socket arrived, "
+                    "socket timed out."
+                )
             raise TimeoutError(
                 "could not find any data on the socket after "
                 f"{self._socket.gettimeout()} seconds, socket timed out."
@@ -146,3 +276,9 @@ class LircdConnection(AbstractConnection):
             raise LircdSocketError(
                 f"An error occurred while reading from the lircd socket: {error}"
             )
+        finally:
+            if deadline is not None:
+                self._socket.settimeout(self._timeout)
+
+        self._buffer += self._chunk_view[:received]
+        return received
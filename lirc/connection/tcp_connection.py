@@ -0,0 +1,152 @@
+import socket
+import time
+from typing import NamedTuple, Tuple
+
+from lirc.exceptions import LircdConnectionError
+
+from .lircd_connection import LircdConnection
+
+# How often and how many times an idle connection is probed with
+# keepalives before the operating system gives up on it.
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_PROBES = 3
+
+
+class Backoff(NamedTuple):
+    """How a ``TcpConnection`` keeps trying to connect when it
+    reconnects, waiting longer after every attempt that fails.
+    """
+
+    #: The number of times to try to connect before giving up.
+    attempts: int = 5
+    #: The number of seconds to wait after the first failed attempt.
+    #: This doubles after every failed attempt after that.
+    delay: float = 0.1
+    #: The most seconds to wait between attempts.
+    max_delay: float = 5.0
+
+
+class TcpConnection(LircdConnection):
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("localhost", 8765),
+        timeout: float = 5.0,
+        keepalive_idle: int = 30,
+        backoff: Backoff = Backoff(),
+    ):
+        """Initialize the TcpConnection, a connection to lircd listening
+        on a TCP port, such as with ``lircd --listen``. Like the
+        LircdConnection, it does not connect until connect() is called.
+
+        Nagle's algorithm is turned off on the socket, since lircd's
+        commands and replies are single small writes that would
+        otherwise be held back waiting for more data. Keepalives are
+        turned on so that a daemon that went away without closing the
+        connection, such as after its host rebooted, is noticed.
+
+        The socket is made by connect() with
+        ``socket.create_connection()``, so the host can be a name or an
+        address of either IPv4 or IPv6, and every address it resolves
+        to is tried in turn. Until then, ``socket`` is an unconnected
+        placeholder.
+
+        When lircd restarts, the connection can be made again with
+        reconnect(). A ``Client`` does that by itself for connections
+        like this one that can reconnect.
+
+        Args:
+            address: The host and port lircd is listening on.
+            timeout: The amount of time to wait for data from the socket
+                before we timeout.
+            keepalive_idle: The number of seconds the connection has to
+                be idle before keepalives are sent. Keepalives are turned
+                off if this is 0.
+            backoff: How many times reconnect() tries to connect and
+                how long it waits between attempts.
+        """
+        super().__init__(address=address, socket=socket.socket(), timeout=timeout)
+        self._keepalive_idle = keepalive_idle
+        self._backoff = backoff
+        self._reconnects = 0
+
+    @property
+    def reconnects(self) -> int:
+        """Retrieve how many times the connection was made again.
+
+        Returns:
+            The number of successful reconnects.
+        """
+        return self._reconnects
+
+    def connect(self):
+        """Connect to lircd at the address specified on init, on a new
+        socket of the family of the address that answered.
+
+        Raises:
+            LircdConnectionError: If the address is invalid or lircd
+                is not listening on it.
+        """
+        try:
+            connected = socket.create_connection(self._address, self._timeout)
+        except OSError as error:
+            raise LircdConnectionError(
+                f"Could not connect to lircd at {self._address}: {error}"
+            )
+
+        self._socket.close()
+        self._socket = connected
+        self._configure_socket()
+
+    def reconnect(self):
+        """Close the connection and connect to lircd again on a new
+        socket, waiting longer after every attempt that fails.
+
+        Anything left unread from the old connection is thrown away.
+
+        Raises:
+            LircdConnectionError: If every attempt to connect failed.
+        """
+        delay = self._backoff.delay
+
+        for attempt in range(1, self._backoff.attempts + 1):
+            self.close()
+            self._buffer.clear()
+            self._buffer_start = 0
+
+            try:
+                self.connect()
+            except LircdConnectionError as error:
+                if attempt == self._backoff.attempts:
+                    raise LircdConnectionError(
+                        f"Could not reconnect to lircd at {self._address} after "
+                        f"{attempt} attempts: {error}"
+                    )
+
+                time.sleep(delay)
+                delay = min(delay * 2, self._backoff.max_delay)
+            else:
+                self._reconnects += 1
+                return
+
+    def _configure_socket(self) -> None:
+        """Turn off Nagle's algorithm and turn on keepalives on the socket.
+        Keepalive options the operating system does not have are skipped.
+        """
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        if not self._keepalive_idle:
+            return
+
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        # TCP_KEEPIDLE is called TCP_KEEPALIVE on macOS.
+        idle_option = getattr(socket, "TCP_KEEPIDLE", None) or getattr(
+            socket, "TCP_KEEPALIVE", None
+        )
+        for option, value in (
+            (idle_option, self._keepalive_idle),
+            (getattr(socket, "TCP_KEEPINTVL", None), KEEPALIVE_INTERVAL),
+            (getattr(socket, "TCP_KEEPCNT", None), KEEPALIVE_PROBES),
+        ):
+            if option is not None:
+                self._socket.setsockopt(socket.IPPROTO_TCP, option, value)
@@ -0,0 +1,335 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, NamedTuple, Sequence, Union
+
+from .client import Client
+from .metrics import DEFAULT_BUCKETS, Histogram
+
+
+class Priority(IntEnum):
+    """The lanes of a ``Dispatcher``. A lower value goes first."""
+
+    #: Commands someone is waiting on, such as a key pressed in a UI.
+    INTERACTIVE = 0
+    #: The default, for everything else.
+    NORMAL = 1
+    #: Commands nobody is waiting on one by one, such as the steps
+    #: of a macro or a burst of ``SIMULATE`` commands.
+    BULK = 2
+
+
+class _Job(NamedTuple):
+    future: Future
+    operation: Callable[[Client], Any]
+    queued: float
+
+
+class _LaneStats:
+    """Everything recorded for one lane of a dispatcher."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.wait = Histogram(buckets)
+        self.submitted = 0
+        self.cancelled = 0
+        self.max_depth = 0
+
+    def snapshot(self, depth: int) -> Dict[str, Any]:
+        return {
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "cancelled": self.cancelled,
+            "wait": self.wait.snapshot(),
+        }
+
+
+class Dispatcher:
+    """Sends commands to lircd from a worker thread of its own, going
+    through them by priority rather than in the order they came in.
+
+    Every command is queued in the lane of its ``Priority`` and returns
+    a ``concurrent.futures.Future`` for lircd's reply. The worker always
+    takes the oldest command of the most urgent lane with any waiting,
+    so a key pressed in a UI is sent as soon as the command already
+    being sent is done, rather than behind every step of a macro queued
+    before it. A busy lane can hold up the lanes behind it for as long
+    as it stays busy.
+
+    Each lane can be bounded, in which case submitting to a full lane
+    blocks until the worker catches up. How long commands waited in
+    each lane and how deep the lanes got is kept for ``snapshot()``.
+
+    Example:
+        >>> import lirc
+        >>> from lirc.dispatcher import Dispatcher, Priority
+        >>> with Dispatcher(lirc.Client(), max_queued=100) as dispatcher:
+        ...     for key in macro:
+        ...         dispatcher.simulate("tv", key, priority=Priority.BULK)
+        ...     dispatcher.send_once(
+        ...         "tv", "KEY_MUTE", priority=Priority.INTERACTIVE
+        ...     ).result()
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        max_queued: int = 0,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Initialize the dispatcher by starting its worker thread.
+
+        Args:
+            client: The client to send the commands with. The dispatcher
+                uses it from its worker thread, so it should not be used
+                by anything else until the dispatcher is closed.
+            max_queued: The most commands to queue up in each lane
+                before submitting another one to it blocks. Lanes are
+                unbounded if this is 0.
+            buckets: The upper bounds in seconds of the histogram
+                buckets of the time commands wait in their lane.
+        """
+        self._client = client
+        self._max_queued = max_queued
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._lanes: Dict[Priority, Deque[_Job]] = {
+            priority: deque() for priority in Priority
+        }
+        self._stats = {priority: _LaneStats(buckets) for priority in Priority}
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="lirc-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> "Dispatcher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def queued(self) -> int:
+        """Retrieve how many commands are waiting to be sent.
+
+        Returns:
+            The number of commands in every lane.
+        """
+        with self._lock:
+            return sum(len(lane) for lane in self._lanes.values())
+
+    def submit(
+        self,
+        command: Union[str, Callable[[Client], Any]],
+        priority: Priority = Priority.NORMAL,
+        block: bool = True,
+        timeout: float = None,
+    ) -> Future:
+        """Queue a command to be sent by the worker thread.
+
+        Args:
+            command: A command from the lircd socket command interface,
+                or a callable that is called with the client on the
+                worker thread, such as ``lambda client: client.version()``
+                or the ``run`` method of a step of a ``Sequence``.
+            priority: The lane to queue the command in.
+            block: Whether to wait for room in the lane if it is full.
+            timeout: The most seconds to wait for room in the lane.
+                Waits for as long as it takes if this is None.
+
+        Raises:
+            ValueError: If the dispatcher is closed.
+            queue.Full: If the lane is full and there was no room
+                for the command in time.
+
+        Returns:
+            A future for lircd's reply, or for what the callable returns.
+        """
+        operation = command
+        if isinstance(command, str):
+
+            def operation(client: Client) -> Any:
+                return client._send_command(command)
+
+        priority = Priority(priority)
+        lane = self._lanes[priority]
+        future = Future()
+
+        with self._not_full:
+            if self._max_queued:
+                end = None if timeout is None else time.monotonic() + timeout
+                while not self._closed and len(lane) >= self._max_queued:
+                    remaining = None if end is None else end - time.monotonic()
+                    if not block or (remaining is not None and remaining <= 0):
+                        raise queue.Full(
+                            f"the {priority.name} lane of the dispatcher is full"
+                        )
+                    self._not_full.wait(remaining)
+
+            if self._closed:
+                raise ValueError("the dispatcher is closed")
+
+            lane.append(_Job(future, operation, time.monotonic()))
+            stats = self._stats[priority]
+            stats.submitted += 1
+            stats.max_depth = max(stats.max_depth, len(lane))
+            self._not_empty.notify()
+
+        return future
+
+    def send_once(
+        self,
+        remote: str,
+        key: str,
+        repeat_count: int = 0,
+        priority: Priority = Priority.NORMAL,
+    ) -> Future:
+        """Queue a key to be sent once, like ``Client.send_once``.
+
+        Args:
+            remote: The remote to use keys from.
+            key: The name of the key to send.
+            repeat_count: The number of times to repeat this key.
+            priority: The lane to queue the command in.
+
+        Returns:
+            A future that is done once lircd replied. It raises a
+            LircdCommandFailureError if lircd failed to send the key.
+        """
+        return self.submit(
+            lambda client: client.send_once(remote, key, repeat_count), priority
+        )
+
+    def send_start(
+        self, remote: str, key: str, priority: Priority = Priority.NORMAL
+    ) -> Future:
+        """Queue a key to start repeating, like ``Client.send_start``.
+
+        Args:
+            remote: The remote to use keys from.
+            key: The name of the key to start sending.
+            priority: The lane to queue the command in.
+
+        Returns:
+            A future that is done once lircd replied.
+        """
+        return self.submit(lambda client: client.send_start(remote, key), priority)
+
+    def send_stop(
+        self, remote: str = "", key: str = "", priority: Priority = Priority.NORMAL
+    ) -> Future:
+        """Queue a repeating key to stop, like ``Client.send_stop``.
+
+        Args:
+            remote: The remote to stop.
+            key: The key to stop sending.
+            priority: The lane to queue the command in.
+
+        Returns:
+            A future that is done once lircd replied.
+        """
+        return self.submit(lambda client: client.send_stop(remote, key), priority)
+
+    def simulate(
+        self,
+        remote: str,
+        key: str,
+        repeat_count: int = 0,
+        priority: Priority = Priority.NORMAL,
+    ) -> Future:
+        """Queue a simulated IR event, like ``Client.simulate``.
+
+        Args:
+            remote: The remote to simulate key presses from.
+            key: The key on the remote to simulate.
+            repeat_count: The number of times to repeat the simulated key press.
+            priority: The lane to queue the command in.
+
+        Returns:
+            A future that is done once lircd replied.
+        """
+        return self.submit(
+            lambda client: client.simulate(remote, key, repeat_count), priority
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retrieve how each lane has been used so far.
+
+        Returns:
+            A dict with a dict for every lane, by the lowercase name of
+            its priority. Each has how many commands are waiting in it,
+            the most that ever were, how many commands were submitted to
+            it and cancelled before they were sent, and a ``wait``
+            histogram of the seconds commands waited before being sent.
+        """
+        with self._lock:
+            return {
+                priority.name.lower(): self._stats[priority].snapshot(
+                    len(self._lanes[priority])
+                )
+                for priority in Priority
+            }
+
+    def close(self, cancel_queued: bool = False) -> None:
+        """Stop the worker thread and close the client. Commands can't
+        be submitted once this is called.
+
+        Args:
+            cancel_queued: Whether to cancel the commands that are still
+                queued rather than wait for them to be sent.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+            if cancel_queued:
+                for priority, lane in self._lanes.items():
+                    for job in lane:
+                        if job.future.cancel():
+                            self._stats[priority].cancelled += 1
+                    lane.clear()
+
+            self._not_empty.notify()
+            self._not_full.notify_all()
+
+        self._thread.join()
+        self._client.close()
+
+    def _run(self) -> None:
+        """Send the oldest command of the most urgent lane with any
+        waiting, until closed and every lane is empty.
+        """
+        while True:
+            with self._not_empty:
+                while True:
+                    priority = next(
+                        (priority for priority in Priority if self._lanes[priority]),
+                        None,
+                    )
+                    if priority is not None:
+                        break
+                    if self._closed:
+                        return
+                    self._not_empty.wait()
+
+                job = self._lanes[priority].popleft()
+                self._not_full.notify_all()
+
+                stats = self._stats[priority]
+                if not job.future.set_running_or_notify_cancel():
+                    stats.cancelled += 1
+                    continue
+                stats.wait.observe(time.monotonic() - job.queued)
+
+            try:
+                result = job.operation(self._client)
+            except BaseException as error:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
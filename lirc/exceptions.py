@@ -18,6 +18,18 @@ class LircdInvalidReplyPacketError(LircError):
     """The reply packet from lircd was in an invalid format."""
 
 
+class LircdInvalidButtonEventError(LircError):
+    """A button event broadcast by lircd was in an invalid format."""
+
+
+class LircdTimeoutError(LircError, TimeoutError):
+    """For when lircd does not reply to a command in time.
+
+    It is also a ``TimeoutError``, so code that caught the
+    ``TimeoutError`` raised before this existed still works.
+    """
+
+
 class LircdCommandFailureError(LircError):
     """For when we send a command to the LIRC server
     and that command fails to send, for whatever reason.
@@ -0,0 +1,308 @@
+import selectors
+import time
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .connection.lircd_connection import LircdConnection
+from .exceptions import (
+    LircdCommandFailureError,
+    LircdInvalidReplyPacketError,
+    LircdSocketError,
+)
+from .pipeline import Pipeline
+from .protocol import LircdProtocol, Reply
+
+CommandResult = Union[str, List[str], LircdCommandFailureError]
+
+
+class DaemonResult(NamedTuple):
+    """The outcome of sending commands to one of the daemons
+    of a ``FanoutClient``.
+    """
+
+    #: The address of the daemon.
+    address: Union[str, Tuple[str, int]]
+    #: The data of each reply, or the LircdCommandFailureError for
+    #: each command that failed, for the replies that were received.
+    results: List[CommandResult]
+    #: Why not all the replies were received, if they weren't.
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether every command was sent and succeeded."""
+        return self.error is None and not any(
+            isinstance(result, LircdCommandFailureError) for result in self.results
+        )
+
+
+class _Exchange:
+    """The progress of sending commands to one daemon and reading
+    its replies, while waiting on all the daemons at once.
+
+    Replies are parsed by the ``LircdProtocol`` of the daemon's
+    connection from whatever bytes have arrived, so a daemon that
+    sends a reply a few bytes at a time never holds up the others.
+    Broadcasts are skipped over, each reply is matched to its command
+    by the command lircd echoes, and the replies to commands that were
+    given up on are thrown away whenever they arrive.
+    """
+
+    def __init__(
+        self, connection: LircdConnection, protocol: LircdProtocol, commands: List[str]
+    ):
+        self.connection = connection
+        self.protocol = protocol
+        self.data = memoryview(
+            b"".join(protocol.send_command(command) for command in commands)
+        )
+        self.results = []
+        self.error = None
+
+    def write(self) -> bool:
+        """Write as much of the commands as the socket takes.
+
+        Returns:
+            True once all of the commands have been written.
+        """
+        sent = self.connection.socket.send(self.data)
+        self.data = self.data[sent:]
+        return not self.data
+
+    def read(self) -> bool:
+        """Read what has arrived on the socket without blocking and
+        add the outcome of every reply it completes.
+
+        Raises:
+            LircdSocketError: If lircd closed the connection.
+            LircdInvalidReplyPacketError: If a reply was invalid.
+
+        Returns:
+            True once all of the replies have been read.
+        """
+        data = self.connection.socket.recv(65536)
+        if not data:
+            raise LircdSocketError(
+                f"lircd at {self.connection.address} closed the connection."
+            )
+
+        for event in self.protocol.receive_data(data):
+            if isinstance(event, Reply):
+                self._add_result(event)
+
+        return not self.protocol.pending
+
+    def abandon(self) -> None:
+        """Give up on the replies that have not been read, so whatever
+        arrives of them is thrown away before the next replies are read.
+        """
+        self.protocol.abandon()
+
+    def _add_result(self, reply: Reply) -> None:
+        """Add the outcome of a reply.
+
+        Args:
+            reply: The reply to one of the commands.
+
+        Raises:
+            LircdInvalidReplyPacketError: If the reply was invalid.
+        """
+        if reply.error is not None:
+            raise reply.error
+
+        data = reply.data[0] if len(reply.data) == 1 else reply.data
+        if reply.success:
+            self.results.append(data)
+        else:
+            self.results.append(
+                LircdCommandFailureError(
+                    f"The `{reply.command}` command sent to lircd "
+                    f"at {self.connection.address} failed: {data}"
+                )
+            )
+
+
+class FanoutClient:
+    """Send the same commands to many lircd daemons at once.
+
+    When there is an lircd per room, sending a command to every one
+    of them with its own ``Client`` takes as long as all of them put
+    together. This writes the commands to every daemon without
+    waiting, and then waits on all of their replies at the same time
+    with non-blocking sockets, so it takes about as long as the
+    slowest daemon.
+
+    Example:
+        >>> import lirc
+        >>> from lirc.fanout_client import FanoutClient
+        >>> fanout = FanoutClient([
+        ...     lirc.TcpConnection(("living-room", 8765)),
+        ...     lirc.TcpConnection(("bedroom", 8765)),
+        ... ])
+        >>> with fanout.pipeline() as pipe:
+        ...     pipe.send_once("tv", "KEY_POWER")
+        ...     results = pipe.execute()
+        >>> [result.ok for result in results]
+        [True, True]
+    """
+
+    def __init__(
+        self, connections: Iterable[LircdConnection], timeout: float = 5.0
+    ) -> None:
+        """Initialize the client by connecting to every daemon.
+
+        The connections are written to directly through their sockets,
+        so they should not be used by anything else at the same time.
+
+        Args:
+            connections: The connections to each lircd daemon.
+            timeout: The overall time to wait for every daemon to
+                reply before giving up on the ones that haven't.
+
+        Raises:
+            LircdConnectionError: If any of the connections cannot connect.
+        """
+        self._connections = list(connections)
+        # Kept between calls, so the replies to commands that timed
+        # out are recognized and thrown away when they arrive late.
+        self._protocols = [LircdProtocol() for _ in self._connections]
+        self._timeout = timeout
+
+        for connection in self._connections:
+            connection.connect()
+
+    def __enter__(self) -> "FanoutClient":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def connections(self) -> List[LircdConnection]:
+        """Retrieve the connections to each daemon.
+
+        Returns:
+            The connections, in the order results are returned in.
+        """
+        return list(self._connections)
+
+    def close(self) -> None:
+        """Close the connection to every daemon."""
+        for connection in self._connections:
+            connection.close()
+
+    def pipeline(self) -> Pipeline:
+        """Create a pipeline whose commands are sent to every daemon.
+
+        Executing the pipeline returns a ``DaemonResult`` for each
+        daemon. Failures are never raised; they are in the results.
+
+        Returns:
+            A new pipeline that sends to every daemon.
+        """
+        return Pipeline(lambda commands, raise_on_error: self.execute(commands))
+
+    def execute(
+        self, commands: List[str], timeout: Optional[float] = None
+    ) -> List[DaemonResult]:
+        """Send commands to every daemon at once and gather the replies.
+
+        Args:
+            commands: Commands from the lircd socket command interface.
+            timeout: The overall time to wait for every daemon to reply.
+                Defaults to the timeout the client was created with.
+
+        Returns:
+            A result for each daemon, in the order of the connections.
+        """
+        if timeout is None:
+            timeout = self._timeout
+
+        commands = [command.strip() for command in commands]
+        exchanges = [
+            _Exchange(connection, protocol, commands)
+            for connection, protocol in zip(self._connections, self._protocols)
+        ]
+        deadline = time.monotonic() + timeout
+
+        if commands:
+            self._exchange(exchanges, deadline, timeout)
+
+        return [
+            DaemonResult(exchange.connection.address, exchange.results, exchange.error)
+            for exchange in exchanges
+        ]
+
+    def _exchange(
+        self, exchanges: List[_Exchange], deadline: float, timeout: float
+    ) -> None:
+        """Write the commands and read the replies of every daemon
+        until they are all done or the deadline passes.
+
+        Args:
+            exchanges: The progress with each daemon.
+            deadline: The monotonic time to give up at.
+            timeout: The overall timeout, used for error messages.
+        """
+        selector = selectors.DefaultSelector()
+        socket_timeouts = {}
+
+        try:
+            for exchange in exchanges:
+                sock = exchange.connection.socket
+                socket_timeouts[sock] = sock.gettimeout()
+                sock.setblocking(False)
+                selector.register(sock, selectors.EVENT_WRITE, exchange)
+
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                for key, events in selector.select(remaining):
+                    self._step(selector, key, events)
+
+            for key in list(selector.get_map().values()):
+                key.data.error = TimeoutError(
+                    f"lircd at {key.data.connection.address} did not reply to "
+                    f"every command within {timeout} seconds."
+                )
+                key.data.abandon()
+        finally:
+            selector.close()
+            for sock, socket_timeout in socket_timeouts.items():
+                sock.settimeout(socket_timeout)
+
+    @staticmethod
+    def _step(
+        selector: selectors.BaseSelector, key: selectors.SelectorKey, events: int
+    ) -> None:
+        """Write to or read from a daemon whose socket is ready, and
+        stop waiting on the daemon once it is done or has failed.
+
+        Args:
+            selector: The selector waiting on every daemon.
+            key: The selector key of the daemon's socket.
+            events: The events the socket is ready for.
+        """
+        exchange = key.data
+        try:
+            if events & selectors.EVENT_WRITE:
+                if exchange.write():
+                    selector.modify(key.fileobj, selectors.EVENT_READ, exchange)
+                return
+
+            if not exchange.read():
+                return
+        except (BlockingIOError, InterruptedError):
+            return
+        except (LircdInvalidReplyPacketError, LircdSocketError) as error:
+            exchange.error = error
+        except OSError as error:
+            exchange.error = LircdSocketError(
+                "An error occurred while talking to lircd at "
+                f"{exchange.connection.address}: {error}"
+            )
+
+        if exchange.error is not None:
+            exchange.abandon()
+        selector.unregister(key.fileobj)
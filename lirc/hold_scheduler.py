@@ -0,0 +1,312 @@
+import atexit
+import heapq
+import itertools
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from .client import Client
+
+# The schedulers that are still open. They are only weakly referenced,
+# so a scheduler that is dropped without being closed can still be
+# garbage collected.
+_open_schedulers: "weakref.WeakSet[HoldScheduler]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_schedulers() -> None:
+    """Release the keys still held by every open scheduler."""
+    for scheduler in list(_open_schedulers):
+        scheduler.close()
+
+
+class Hold:
+    """A key being held down with ``HoldScheduler.hold()``, until it is
+    released on schedule, cancelled or the scheduler is closed.
+    """
+
+    def __init__(
+        self,
+        scheduler: "HoldScheduler",
+        remote: str,
+        key: str,
+        deadline: Optional[float],
+    ) -> None:
+        self._scheduler = scheduler
+        self._remote = remote
+        self._key = key
+        self._deadline = deadline
+        self._released = threading.Event()
+        self._error = None
+
+    def __repr__(self) -> str:
+        return f"Hold(remote={self._remote!r}, key={self._key!r})"
+
+    @property
+    def remote(self) -> str:
+        """Retrieve the remote of the held key.
+
+        Returns:
+            The name of the remote.
+        """
+        return self._remote
+
+    @property
+    def key(self) -> str:
+        """Retrieve the held key.
+
+        Returns:
+            The name of the key.
+        """
+        return self._key
+
+    @property
+    def active(self) -> bool:
+        """Check whether the key is still being held.
+
+        Returns:
+            True until the key is released; False afterwards.
+        """
+        return not self._released.is_set()
+
+    @property
+    def remaining(self) -> Optional[float]:
+        """Retrieve how long until the key is released.
+
+        Returns:
+            The number of seconds left, 0 once it is released, or
+            None if it is held until it is cancelled.
+        """
+        if not self.active:
+            return 0.0
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    @property
+    def error(self) -> Optional[Exception]:
+        """Retrieve why releasing the key failed, if it did.
+
+        Returns:
+            The error from sending SEND_STOP, or None.
+        """
+        return self._error
+
+    def extend(self, seconds: float) -> None:
+        """Hold the key for longer.
+
+        Args:
+            seconds: How much later to release the key. For a key that
+                is held until it is cancelled, how long from now to
+                release it.
+
+        Raises:
+            ValueError: If the key was already released.
+        """
+        self._scheduler._extend(self, seconds)
+
+    def cancel(self) -> None:
+        """Release the key now. Does nothing if it was already released."""
+        self._scheduler._release(self)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the key to be released.
+
+        Args:
+            timeout: The most seconds to wait. Waits forever if this is None.
+
+        Returns:
+            True if the key was released; False if the wait timed out.
+        """
+        return self._released.wait(timeout)
+
+
+class HoldScheduler:
+    """Holds down keys for a while with ``SEND_START`` and releases them
+    with ``SEND_STOP``, for any number of keys at once.
+
+    Every hold is released on a single timer thread shared by all of
+    them, rather than a thread that sleeps for each one. Holds can be
+    extended or cancelled while they are active, and any that are still
+    active when the scheduler is closed, or when the interpreter exits,
+    are released then, so lircd is never left transmitting.
+
+    lircd itself may only repeat one key at a time per daemon, in which
+    case holding a second key on the same daemon fails until the first
+    is released.
+
+    Example:
+        >>> import lirc
+        >>> from lirc.hold_scheduler import HoldScheduler
+        >>> with HoldScheduler(lirc.Client()) as scheduler:
+        ...     volume = scheduler.hold("tv", "KEY_VOLUMEUP", 0.8)
+        ...     volume.extend(0.4)
+        ...     volume.wait()
+        True
+    """
+
+    def __init__(self, client: Client) -> None:
+        """Initialize the scheduler. Its timer thread is started when
+        the first key with a duration is held.
+
+        Args:
+            client: The client to send the commands with. The scheduler
+                sends commands from its timer thread, so the client should
+                not be used by anything else at the same time unless it is
+                a ``ClientPool``.
+        """
+        self._client = client
+        self._client_lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._holds: Dict[Tuple[str, str], Hold] = {}
+        self._timers: List[Tuple[float, int, Hold]] = []
+        self._counter = itertools.count()
+        self._thread = None
+        self._closed = False
+        _open_schedulers.add(self)
+
+    def __enter__(self) -> "HoldScheduler":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def holds(self) -> List[Hold]:
+        """Retrieve the keys being held.
+
+        Returns:
+            Every active hold.
+        """
+        with self._condition:
+            return list(self._holds.values())
+
+    def hold(self, remote: str, key: str, duration: Optional[float] = None) -> Hold:
+        """Start holding a key.
+
+        Args:
+            remote: The remote to use keys from.
+            key: The name of the key to hold.
+            duration: The number of seconds to hold the key for. It is
+                held until it is cancelled if this is None.
+
+        Raises:
+            ValueError: If the key is already being held or the
+                scheduler is closed.
+            LircdCommandFailureError: If lircd failed to start
+                sending the key.
+
+        Returns:
+            The hold, which can be extended, cancelled or waited on.
+        """
+        # The client lock is held from registering the hold until its
+        # SEND_START is sent, so releasing it can never send the
+        # SEND_STOP first.
+        with self._client_lock:
+            with self._condition:
+                if self._closed:
+                    raise ValueError("the hold scheduler is closed")
+                if (remote, key) in self._holds:
+                    raise ValueError(f"`{key}` on `{remote}` is already being held")
+
+                deadline = None if duration is None else time.monotonic() + duration
+                hold = Hold(self, remote, key, deadline)
+                self._holds[(remote, key)] = hold
+
+            try:
+                self._client.send_start(remote, key)
+            except BaseException:
+                with self._condition:
+                    self._holds.pop((remote, key), None)
+                hold._released.set()
+                raise
+
+        if deadline is not None:
+            self._schedule(hold)
+
+        return hold
+
+    def close(self) -> None:
+        """Release every key that is still being held and stop the
+        timer thread. Keys can't be held once this is called.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            holds = list(self._holds.values())
+            self._condition.notify()
+
+        for hold in holds:
+            self._release(hold)
+
+        if self._thread is not None:
+            self._thread.join()
+        _open_schedulers.discard(self)
+
+    def _schedule(self, hold: Hold) -> None:
+        """Add a timer for the current deadline of a hold. Timers for
+        an earlier deadline of the same hold are skipped when they fire.
+        """
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="lirc-hold-scheduler", daemon=True
+                )
+                self._thread.start()
+
+            heapq.heappush(self._timers, (hold._deadline, next(self._counter), hold))
+            self._condition.notify()
+
+    def _extend(self, hold: Hold, seconds: float) -> None:
+        with self._condition:
+            if not hold.active:
+                raise ValueError(f"{hold!r} was already released")
+
+            if hold._deadline is None:
+                hold._deadline = time.monotonic() + seconds
+            else:
+                hold._deadline += seconds
+
+        self._schedule(hold)
+
+    def _release(self, hold: Hold) -> None:
+        """Stop holding a key by sending SEND_STOP, unless it was
+        already released.
+        """
+        with self._condition:
+            if self._holds.get((hold.remote, hold.key)) is not hold:
+                return
+            del self._holds[(hold.remote, hold.key)]
+
+        try:
+            with self._client_lock:
+                self._client.send_stop(hold.remote, hold.key)
+        except Exception as error:
+            hold._error = error
+        finally:
+            hold._released.set()
+
+    def _run(self) -> None:
+        """Release each hold once its deadline passes, until closed."""
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if not self._timers:
+                        self._condition.wait()
+                        continue
+
+                    deadline, _, hold = self._timers[0]
+                    remaining = deadline - time.monotonic()
+                    if remaining > 0:
+                        self._condition.wait(remaining)
+                        continue
+
+                    heapq.heappop(self._timers)
+                    if hold.active and hold._deadline == deadline:
+                        break
+                else:
+                    return
+
+            self._release(hold)
@@ -0,0 +1,271 @@
+import sys
+from array import array
+from typing import Iterable, Iterator, List, Sequence, Tuple, Union
+
+from .exceptions import LircdInvalidReplyPacketError
+
+# Perturbs the probe sequence of the indexes with all the bits of a
+# hash, the way CPython's dicts do, so codes that only differ in their
+# high bits don't all land in the same slot.
+_PERTURB_MASK = (1 << 64) - 1
+
+# The most keys whose positions plus one fit in the slots of an index
+# of unsigned shorts.
+_SHORT_INDEX_KEYS = 0xFFFF
+
+
+def _index_size(count: int) -> int:
+    """Find the number of slots of an index for a number of keys,
+    a power of two that leaves at least a third of them empty.
+    """
+    size = 8
+    while size * 2 < count * 3:
+        size *= 2
+    return size
+
+
+class KeyTable:
+    """The keys of a remote and their codes, parsed once from the
+    reply to ``LIST <remote>``.
+
+    Codes are kept in an ``array('Q')`` and names are interned, so the
+    same key name on many remotes is only stored once. Looking up the
+    code of a name or the name of a code goes through open addressing
+    indexes of positions in those arrays, rather than dicts of Python
+    objects, so a table takes a fraction of the memory of the lines of
+    the reply. This trades speed for memory: both lookups are O(1) and
+    never parse anything, but they probe the indexes in Python, so each
+    one is several times slower than looking up a key in a dict. For
+    a hot path over a small remote, a dict made from ``items()`` is
+    faster.
+
+    If a remote has the same name or code more than once, lookups
+    find the first of them, but every key is kept.
+
+    Example:
+        >>> import lirc
+        >>> client = lirc.Client()
+        >>> keys = client.key_table("tv")
+        >>> hex(keys.code_of("KEY_POWER"))
+        '0x10ef'
+        >>> keys.name_of(0x10EF)
+        'KEY_POWER'
+    """
+
+    __slots__ = ("_remote", "_names", "_codes", "_name_index", "_code_index")
+
+    def __init__(self, remote: str, names: Sequence[str], codes: Iterable[int]):
+        """Initialize the table and build its indexes.
+
+        Args:
+            remote: The name of the remote the keys belong to.
+            names: The name of each key.
+            codes: The code of each key, in the same order as the names.
+
+        Raises:
+            ValueError: If there are not as many codes as names.
+            OverflowError: If a code does not fit in 64 bits.
+        """
+        self._remote = remote
+        self._names = tuple(sys.intern(name) for name in names)
+        self._codes = array("Q", codes)
+        if len(self._codes) != len(self._names):
+            raise ValueError(
+                f"{len(self._names)} key names were given "
+                f"with {len(self._codes)} codes"
+            )
+
+        # Each slot is the position of a key plus one, or 0 if empty.
+        size = _index_size(len(self._names))
+        typecode = "H" if len(self._names) < _SHORT_INDEX_KEYS else "I"
+        self._name_index = array(typecode, bytes(size * array(typecode).itemsize))
+        self._code_index = array(typecode, bytes(size * array(typecode).itemsize))
+
+        for position, (name, code) in enumerate(zip(self._names, self._codes)):
+            self._insert(self._name_index, hash(name), position, self._names, name)
+            self._insert(self._code_index, hash(code), position, self._codes, code)
+
+    @classmethod
+    def from_reply(cls, remote: str, reply: Union[str, List[str]]) -> "KeyTable":
+        """Parse the reply to ``LIST <remote>``.
+
+        Args:
+            remote: The remote that was listed.
+            reply: The data of the reply, as ``Client.list_remote_keys``
+                returns it. Each line is a code of 16 hexadecimal digits
+                and the name of its key, e.g. ``0000000000000001 KEY_POWER``.
+
+        Raises:
+            LircdInvalidReplyPacketError: If a line is not a code
+                and a key name.
+
+        Returns:
+            The table of the remote's keys.
+        """
+        if isinstance(reply, str):
+            reply = [reply]
+
+        names = []
+        codes = array("Q")
+        for line in reply:
+            try:
+                code, name = line.split()
+                codes.append(int(code, 16))
+            except (ValueError, OverflowError):
+                raise LircdInvalidReplyPacketError(
+                    f"Expected a code and a key name in the keys of `{remote}`, "
+                    f"got `{line}`."
+                )
+            names.append(name)
+
+        return cls(remote, names, codes)
+
+    def __repr__(self) -> str:
+        return f"KeyTable(remote={self._remote!r}, keys={len(self._names)})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, KeyTable):
+            return NotImplemented
+        return (
+            self._remote == other._remote
+            and self._names == other._names
+            and self._codes == other._codes
+        )
+
+    __hash__ = None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._find_name(name) >= 0
+
+    def __sizeof__(self) -> int:
+        # The names are interned and shared with every other table
+        # that has them, so only the references to them are counted.
+        return (
+            object.__sizeof__(self)
+            + sys.getsizeof(self._names)
+            + sys.getsizeof(self._codes)
+            + sys.getsizeof(self._name_index)
+            + sys.getsizeof(self._code_index)
+        )
+
+    @property
+    def remote(self) -> str:
+        """Retrieve the remote the keys belong to.
+
+        Returns:
+            The name of the remote.
+        """
+        return self._remote
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """Retrieve the names of the keys.
+
+        Returns:
+            The names, in the order lircd listed them.
+        """
+        return self._names
+
+    @property
+    def codes(self) -> array:
+        """Retrieve the codes of the keys.
+
+        Returns:
+            A copy of the codes, in the same order as the names.
+        """
+        return array("Q", self._codes)
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        """Iterate over the keys.
+
+        Returns:
+            An iterator over the name and code of each key.
+        """
+        return zip(self._names, self._codes)
+
+    def code_of(self, name: str) -> int:
+        """Look up the code of a key.
+
+        Args:
+            name: The name of the key.
+
+        Raises:
+            KeyError: If the remote has no key with the name.
+
+        Returns:
+            The code of the key.
+        """
+        position = self._find_name(name)
+        if position < 0:
+            raise KeyError(name)
+        return self._codes[position]
+
+    def name_of(self, code: int) -> str:
+        """Look up the key with a code.
+
+        Args:
+            code: The code of the key.
+
+        Raises:
+            KeyError: If the remote has no key with the code.
+
+        Returns:
+            The name of the key.
+        """
+        position = self._find(self._code_index, hash(code), self._codes, code)
+        if position < 0:
+            raise KeyError(code)
+        return self._names[position]
+
+    def to_reply(self) -> List[str]:
+        """Format the keys the way lircd lists them.
+
+        Returns:
+            A line for each key, e.g. ``0000000000000001 KEY_POWER``.
+        """
+        return [f"{code:016x} {name}" for name, code in self.items()]
+
+    def _find_name(self, name: str) -> int:
+        return self._find(self._name_index, hash(name), self._names, name)
+
+    @staticmethod
+    def _insert(
+        index: array, hashed: int, position: int, values: Sequence, value: object
+    ) -> None:
+        """Add a key's position to an index, unless an earlier key
+        already has the same value.
+        """
+        mask = len(index) - 1
+        perturb = hashed & _PERTURB_MASK
+        slot = perturb & mask
+        while index[slot]:
+            if values[index[slot] - 1] == value:
+                return
+            perturb >>= 5
+            slot = (slot * 5 + perturb + 1) & mask
+        index[slot] = position + 1
+
+    @staticmethod
+    def _find(index: array, hashed: int, values: Sequence, value: object) -> int:
+        """Find the position of the first key with a value.
+
+        Returns:
+            The position, or -1 if no key has the value.
+        """
+        mask = len(index) - 1
+        perturb = hashed & _PERTURB_MASK
+        slot = perturb & mask
+        while True:
+            entry = index[slot]
+            if not entry:
+                return -1
+            if values[entry - 1] == value:
+                return entry - 1
+            perturb >>= 5
+            slot = (slot * 5 + perturb + 1) & mask
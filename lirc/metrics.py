@@ -0,0 +1,364 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+#: The upper bounds in seconds of the default latency histogram buckets.
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+#: How a command can turn out. lircd replied SUCCESS or ERROR, reading
+#: the reply timed out, or something else went wrong, such as the
+#: connection being lost.
+OUTCOMES = ("success", "failure", "timeout", "error")
+
+
+class Histogram:
+    """Counts observed values into buckets with fixed upper bounds."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Initialize the histogram.
+
+        Args:
+            buckets: The upper bounds of the buckets, in increasing
+                order. Values above the last bound are only counted
+                in the total.
+        """
+        self._bounds = tuple(buckets)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    @property
+    def sum(self) -> float:
+        """Retrieve the sum of every observed value.
+
+        Returns:
+            The sum of the values.
+        """
+        return self._sum
+
+    @property
+    def count(self) -> int:
+        """Retrieve how many values were observed.
+
+        Returns:
+            The number of values.
+        """
+        return self._count
+
+    def observe(self, value: float) -> None:
+        """Count a value into the bucket it falls in.
+
+        Args:
+            value: The value to count.
+        """
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self._sum += value
+        self._count += 1
+
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        """Retrieve how many values were at most each upper bound.
+
+        Returns:
+            A list of (upper bound, count) pairs, ending with an
+            infinite upper bound whose count is every value.
+        """
+        buckets = []
+        total = 0
+        for bound, count in zip(self._bounds + (float("inf"),), self._counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retrieve the state of the histogram.
+
+        Returns:
+            The cumulative buckets, the sum and the count.
+        """
+        return {
+            "buckets": self.cumulative_buckets(),
+            "sum": self._sum,
+            "count": self._count,
+        }
+
+
+class _CommandStats:
+    """Everything recorded for one type of command."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.first_line = Histogram(buckets)
+        self.duration = Histogram(buckets)
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.reply_lines = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "first_line": self.first_line.snapshot(),
+            "duration": self.duration.snapshot(),
+            "outcomes": dict(self.outcomes),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "reply_lines": self.reply_lines,
+        }
+
+
+class _Record(NamedTuple):
+    """What was measured of a single command."""
+
+    command_type: str
+    outcome: str
+    #: The seconds until the first reply line, if one was read.
+    first_line: Optional[float]
+    #: The seconds until the END of the reply, if it was read.
+    duration: Optional[float]
+    bytes_sent: int
+    bytes_received: int
+    lines: int
+
+
+class Measurement:
+    """Measures a single command from the time it is sent until the
+    END of its reply. These are created with ``Metrics.measure()``.
+    """
+
+    __slots__ = (
+        "_metrics",
+        "_command_type",
+        "_bytes_sent",
+        "_started",
+        "_first_line",
+        "_bytes_received",
+        "_lines",
+    )
+
+    def __init__(self, metrics: "Metrics", command_type: str, bytes_sent: int):
+        self._metrics = metrics
+        self._command_type = command_type
+        self._bytes_sent = bytes_sent
+        self._started = time.perf_counter()
+        self._first_line = None
+        self._bytes_received = 0
+        self._lines = 0
+
+    def line(self, line: str) -> None:
+        """Record a line of the reply that was read.
+
+        Args:
+            line: The line, without its newline.
+        """
+        if self._first_line is None:
+            self._first_line = time.perf_counter()
+        self._bytes_received += _encoded_length(line)
+        self._lines += 1
+
+    def finish(self, outcome: str) -> None:
+        """Record the command in the metrics it was measured for.
+
+        Args:
+            outcome: How the command turned out, one of ``OUTCOMES``.
+        """
+        ended = time.perf_counter()
+        first_line = None
+        if self._first_line is not None:
+            first_line = self._first_line - self._started
+
+        self._metrics._record(
+            _Record(
+                self._command_type,
+                outcome,
+                first_line,
+                ended - self._started if outcome in ("success", "failure") else None,
+                self._bytes_sent,
+                self._bytes_received,
+                self._lines,
+            )
+        )
+
+
+class Metrics:
+    """Latency histograms and counters for the commands sent to lircd,
+    kept separately for each type of command, e.g. ``SEND_ONCE`` or
+    ``LIST``.
+
+    For every command, this records the time from sending it until
+    the first line of its reply and until the END of its reply, how
+    many bytes and reply lines went each way and how it turned out.
+    Pass an instance to ``Client`` to start recording. A single
+    instance can be shared by many clients and threads.
+
+    Example:
+        >>> import lirc
+        >>> from lirc.metrics import Metrics
+        >>> metrics = Metrics()
+        >>> client = lirc.Client(metrics=metrics)
+        >>> client.send_once("tv", "KEY_POWER")
+        >>> metrics.snapshot()["commands"]["SEND_ONCE"]["outcomes"]
+        {'success': 1, 'failure': 0, 'timeout': 0, 'error': 0}
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Initialize the metrics.
+
+        Args:
+            buckets: The upper bounds in seconds of the latency
+                histogram buckets, in increasing order.
+        """
+        self._buckets = tuple(buckets)
+        self._commands: Dict[str, _CommandStats] = {}
+        self._lock = threading.Lock()
+
+    def measure(self, command: str, bytes_sent: Optional[int] = None) -> Measurement:
+        """Start measuring a command that is about to be sent.
+
+        Args:
+            command: The command from the lircd socket command interface.
+            bytes_sent: The length of the encoded command. Defaults to
+                the length of the command and its newline in UTF-8.
+
+        Returns:
+            The measurement to pass each reply line to, and to
+            finish once the reply was read.
+        """
+        command = command.strip()
+        if bytes_sent is None:
+            bytes_sent = _encoded_length(command)
+
+        return Measurement(self, command.split(" ", 1)[0].upper(), bytes_sent)
+
+    def _record(self, record: _Record) -> None:
+        with self._lock:
+            stats = self._commands.get(record.command_type)
+            if stats is None:
+                stats = self._commands[record.command_type] = _CommandStats(
+                    self._buckets
+                )
+
+            if record.first_line is not None:
+                stats.first_line.observe(record.first_line)
+            if record.duration is not None:
+                stats.duration.observe(record.duration)
+            stats.outcomes[record.outcome] += 1
+            stats.bytes_sent += record.bytes_sent
+            stats.bytes_received += record.bytes_received
+            stats.reply_lines += record.lines
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._commands.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retrieve a copy of everything recorded so far.
+
+        Returns:
+            A dict with the total bytes sent and received, and a dict of
+            every type of command that was sent. Each has its outcome
+            counts, bytes and reply lines, and ``first_line`` and
+            ``duration`` histograms with cumulative bucket counts. Only
+            commands that were replied to are in the histograms.
+        """
+        with self._lock:
+            commands = {
+                command_type: stats.snapshot()
+                for command_type, stats in sorted(self._commands.items())
+            }
+
+        return {
+            "bytes_sent": sum(stats["bytes_sent"] for stats in commands.values()),
+            "bytes_received": sum(
+                stats["bytes_received"] for stats in commands.values()
+            ),
+            "commands": commands,
+        }
+
+    def to_prometheus(self, prefix: str = "lirc") -> str:
+        """Export everything recorded so far in the Prometheus text
+        exposition format.
+
+        Args:
+            prefix: The prefix of every metric name.
+
+        Returns:
+            The metrics, ending with a newline.
+        """
+        commands = self.snapshot()["commands"]
+        lines = []
+
+        for name, key, description in (
+            (
+                "command_first_line_seconds",
+                "first_line",
+                "Time from sending a command to the first line of its reply.",
+            ),
+            (
+                "command_duration_seconds",
+                "duration",
+                "Time from sending a command to the END of its reply.",
+            ),
+        ):
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for command_type, stats in commands.items():
+                histogram = stats[key]
+                label = f'command="{command_type}"'
+                for bound, count in histogram["buckets"]:
+                    lines.append(
+                        f'{prefix}_{name}_bucket{{{label},le="{_format(bound)}"}} '
+                        f"{count}"
+                    )
+                lines.append(f"{prefix}_{name}_sum{{{label}}} {histogram['sum']!r}")
+                lines.append(f"{prefix}_{name}_count{{{label}}} {histogram['count']}")
+
+        lines.append(f"# HELP {prefix}_commands_total Commands sent, by outcome.")
+        lines.append(f"# TYPE {prefix}_commands_total counter")
+        for command_type, stats in commands.items():
+            for outcome, count in stats["outcomes"].items():
+                lines.append(
+                    f'{prefix}_commands_total{{command="{command_type}",'
+                    f'outcome="{outcome}"}} {count}'
+                )
+
+        for name, key, description in (
+            ("bytes_sent_total", "bytes_sent", "Bytes of commands sent."),
+            ("bytes_received_total", "bytes_received", "Bytes of replies read."),
+            ("reply_lines_total", "reply_lines", "Lines of replies read."),
+        ):
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for command_type, stats in commands.items():
+                lines.append(
+                    f'{prefix}_{name}{{command="{command_type}"}} {stats[key]}'
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+def _encoded_length(line: str) -> int:
+    """Count the bytes a line takes up on the socket, in UTF-8 and
+    with its newline, without encoding lines that are ASCII.
+    """
+    if line.isascii():
+        return len(line) + 1
+    return len(line.encode("utf-8")) + 1
+
+
+def _format(bound: float) -> str:
+    """Format a bucket's upper bound the way Prometheus expects."""
+    return "+Inf" if bound == float("inf") else repr(bound)
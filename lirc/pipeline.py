@@ -0,0 +1,103 @@
+from typing import Callable, List, Union
+
+from .commands import CommandMixin
+from .exceptions import LircdCommandFailureError
+
+PipelineResult = Union[str, List[str], LircdCommandFailureError]
+
+
+class Pipeline(CommandMixin):
+    """Queue up lircd commands and send them all at once.
+
+    A pipeline has the same methods as ``lirc.Client`` for sending
+    each lircd command, but calling them only queues the command.
+    Methods that need a reply straight away or a connection of
+    their own, such as ``key_table`` or ``events``, are only on
+    the client. Nothing is sent to
+    lircd until ``execute()`` is called, which writes every queued
+    command in one go and then reads the replies back in order.
+    This turns n socket round trips into a single one.
+    """
+
+    def __init__(
+        self, execute: Callable[[List[str], bool], List[PipelineResult]]
+    ) -> None:
+        """Initialize the pipeline.
+
+        Pipelines are normally created with ``Client.pipeline()``
+        rather than directly. The pipeline does not own a connection;
+        its commands are sent by whatever created it.
+
+        Args:
+            execute: Sends a list of commands to lircd and returns
+                the result of each one.
+        """
+        # Used for start_repeat and stop_repeat
+        self._last_send_start_remote = None
+        self._last_send_start_key = None
+        self._transmitter_mask = None
+        self._repeating = set()
+
+        self._execute = execute
+        self._commands = []
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.reset()
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    @property
+    def commands(self) -> List[str]:
+        """Retrieves the commands queued up in the pipeline.
+
+        Returns:
+            The queued commands in the order they will be sent.
+        """
+        return list(self._commands)
+
+    def _send_command(self, command: str) -> None:
+        """Queue a command to be sent when the pipeline is executed.
+
+        Args:
+            command: A command from the lircd socket command interface.
+        """
+        self._commands.append(command.strip())
+
+    def close(self) -> None:
+        """Discard the queued commands. The connection used by
+        the pipeline belongs to its client, so it stays open.
+        """
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard the queued commands."""
+        self._commands = []
+        self._transmitter_mask = None
+
+    def execute(self, raise_on_error: bool = True) -> List[PipelineResult]:
+        """Send all the queued commands and read their replies.
+
+        The pipeline is emptied afterwards, so it can be reused
+        for another batch of commands.
+
+        Args:
+            raise_on_error: Whether to raise the first command failure
+                once all the replies have been read. If this is False,
+                the LircdCommandFailureError for a failed command is
+                returned in its place in the results instead.
+
+        Raises:
+            LircdCommandFailureError: If raise_on_error is set and
+                any of the commands fail.
+
+        Returns:
+            The data from the reply packet of each command, in the
+            order the commands were queued.
+        """
+        commands = self._commands
+        self.reset()
+        return self._execute(commands, raise_on_error)
@@ -0,0 +1,64 @@
+from typing import TYPE_CHECKING, List, Union
+
+from .reply_packet_parser import ReplyPacketParser
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+class PreparedCommand:
+    """An lircd command that is formatted and encoded once, so it can
+    be sent many times without doing that work again.
+
+    Prepared commands are created with ``Client.prepare()``. Calling
+    one sends the command with the client it was prepared by and
+    returns the data from the reply, just like the client's own
+    command methods. Since the reply parser is reused, a prepared
+    command should only be called from one thread at a time.
+    """
+
+    __slots__ = ("_client", "_command", "_data", "_parser")
+
+    def __init__(self, client: "Client", command: str) -> None:
+        """Initialize the prepared command.
+
+        Args:
+            client: The client to send the command with.
+            command: A command from the lircd socket command interface.
+        """
+        self._client = client
+        self._command = command.strip()
+        self._data = f"{self._command}\n".encode()
+        self._parser = ReplyPacketParser()
+
+    def __repr__(self) -> str:
+        return f"PreparedCommand({self._command!r})"
+
+    @property
+    def command(self) -> str:
+        """Retrieves the command that is sent.
+
+        Returns:
+            The command, without its newline.
+        """
+        return self._command
+
+    @property
+    def data(self) -> bytes:
+        """Retrieves the encoded command that is written to the socket.
+
+        Returns:
+            The encoded command, including its newline.
+        """
+        return self._data
+
+    def __call__(self) -> Union[str, List[str]]:
+        """Send the command to lircd.
+
+        Raises:
+            LircdCommandFailure: If the command fails.
+
+        Returns:
+            The data from the lirc response packet.
+        """
+        return self._client._send_encoded(self._data, self._command, self._parser)
@@ -0,0 +1,429 @@
+"""The lircd socket protocol without any I/O, for event loops.
+
+``LircdProtocol`` turns commands into the bytes to write to lircd and
+the bytes read back from lircd into replies and broadcasts. It never
+touches a socket itself, so it can be driven by selectors, trio,
+gevent or anything else that can read and write bytes.
+``NonBlockingConnection`` drives it over a non-blocking socket, for
+registering with a ``selectors`` selector next to other file objects.
+"""
+
+from collections import deque
+from typing import List, NamedTuple, Optional, Union
+
+from .button_event_parser import ButtonEvent, ButtonEventParser
+from .connection.lircd_connection import LircdConnection
+from .exceptions import (
+    LircdCommandFailureError,
+    LircdInvalidButtonEventError,
+    LircdInvalidReplyPacketError,
+    LircdSocketError,
+    LircError,
+)
+from .reply_packet_parser import ReplyPacket, ReplyPacketParser
+
+
+class Reply(NamedTuple):
+    """The reply to a command sent with ``LircdProtocol.send_command``."""
+
+    #: The command the reply is to.
+    command: str
+    #: Whether lircd ran the command successfully.
+    success: bool
+    #: The lines of data in the reply.
+    data: List[str]
+    #: Why the reply could not be read, if it couldn't.
+    error: Optional[LircError] = None
+
+    def result(self) -> Union[str, List[str]]:
+        """Retrieve the data of the reply the way ``Client`` commands
+        return it.
+
+        Raises:
+            LircdCommandFailureError: If the command failed.
+            LircdInvalidReplyPacketError: If the reply was invalid.
+
+        Returns:
+            The only line of data, or all of the lines if there
+            isn't exactly one.
+        """
+        if self.error is not None:
+            raise self.error
+
+        data = self.data[0] if len(self.data) == 1 else self.data
+
+        if not self.success:
+            raise LircdCommandFailureError(
+                f"The `{self.command}` command sent to lircd failed: {data}"
+            )
+
+        return data
+
+
+#: What ``LircdProtocol.receive_data`` returns: replies to commands,
+#: button presses and SIGHUP packets.
+Event = Union[Reply, ButtonEvent, ReplyPacket]
+
+
+class LircdProtocol:
+    """The state of a connection to lircd, without the connection.
+
+    Replies are matched to commands by the command line lircd echoes
+    in each of them. lircd replies to commands in the order it got
+    them, so replies come out in the order the commands went in.
+
+    Example:
+        >>> from lirc.protocol import LircdProtocol
+        >>> protocol = LircdProtocol()
+        >>> sock.sendall(protocol.send_command("VERSION"))
+        >>> for event in protocol.receive_data(sock.recv(4096)):
+        ...     print(event)
+        Reply(command='VERSION', success=True, data=['0.10.1'], error=None)
+    """
+
+    def __init__(self) -> None:
+        """Initialize the protocol with no commands waiting on replies."""
+        self._buffer = bytearray()
+        # The commands waiting on a reply, oldest first, each with
+        # whether it was abandoned so its reply is thrown away.
+        self._pending = deque()
+        # Whether the rest of an invalid packet is being skipped over.
+        self._skipping = False
+
+    @property
+    def pending(self) -> List[str]:
+        """Retrieve the commands still waiting on a reply.
+
+        Returns:
+            The commands, oldest first, leaving out abandoned ones.
+        """
+        return [command for command, abandoned in self._pending if not abandoned]
+
+    @property
+    def buffered(self) -> int:
+        """Retrieve how many bytes were received that are not part of
+        a complete line or reply packet yet.
+
+        Returns:
+            The number of bytes.
+        """
+        return len(self._buffer)
+
+    def send_command(self, command: str) -> bytes:
+        """Start waiting on the reply to a command.
+
+        Args:
+            command: A command from the lircd socket command interface.
+
+        Returns:
+            The bytes to write to lircd.
+        """
+        command = " ".join(command.split())
+        self._pending.append([command, False])
+        return f"{command}\n".encode()
+
+    def abandon(self) -> List[str]:
+        """Give up on every command still waiting on a reply, such as
+        after a timeout. Their replies are thrown away when they arrive.
+
+        Returns:
+            The commands that were given up on.
+        """
+        abandoned = []
+        for entry in self._pending:
+            if not entry[1]:
+                entry[1] = True
+                abandoned.append(entry[0])
+        return abandoned
+
+    def receive_data(self, data: Union[bytes, bytearray]) -> List[Event]:
+        """Parse bytes received from lircd.
+
+        Partial lines and reply packets are kept until the rest of them
+        is received. A reply that is not in the reply packet format is
+        returned with an ``error`` for the command it echoes, or for
+        the oldest command if it echoes none, and the rest of it is
+        skipped over up to its END line. Any other lines that are not
+        button events are skipped over as well.
+
+        Args:
+            data: The bytes that were received.
+
+        Returns:
+            The replies to commands, ``ButtonEvent``\\ s and SIGHUP
+            ``ReplyPacket``\\ s in the data, in the order received.
+        """
+        buffer = self._buffer
+        buffer += data
+        events = []
+        consumed = 0
+
+        while True:
+            end = buffer.find(b"\n", consumed)
+            if end == -1:
+                break
+
+            line = buffer[consumed:end].strip()
+
+            if self._skipping and line != b"BEGIN":
+                # The rest of an invalid packet, up to its END line.
+                consumed = end + 1
+                self._skipping = line != b"END"
+                continue
+
+            if line == b"BEGIN":
+                self._skipping = False
+                packets = []
+                try:
+                    packet_end = ReplyPacketParser.scan_packet(
+                        buffer, consumed, packets
+                    )
+                except LircdInvalidReplyPacketError as error:
+                    echoed = self._echoed_command(buffer, end + 1)
+                    consumed = end + 1
+                    self._skipping = True
+                    if echoed is None:
+                        self._fail_oldest(error, events)
+                    else:
+                        self._match(echoed, events, error=error)
+                    continue
+
+                if packet_end is None:
+                    break
+
+                consumed = packet_end
+                packet = packets[0]
+                if packet.is_sighup:
+                    events.append(packet)
+                else:
+                    self._match(
+                        packet.command, events, packet.success, packet.data
+                    )
+                continue
+
+            consumed = end + 1
+            try:
+                events.append(ButtonEventParser.parse(line.decode()))
+            except (LircdInvalidButtonEventError, UnicodeDecodeError):
+                pass
+
+        del buffer[:consumed]
+        return events
+
+    @staticmethod
+    def _echoed_command(buffer: bytearray, start: int) -> Optional[str]:
+        """Find the command an invalid packet echoes.
+
+        Args:
+            buffer: The bytes received so far.
+            start: The index of the line after the packet's BEGIN line.
+
+        Returns:
+            The first line that is not blank after the BEGIN line, or
+            None if it has not been received or can't be decoded.
+        """
+        while True:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                return None
+            line = buffer[start:end].strip()
+            if line:
+                try:
+                    return line.decode()
+                except UnicodeDecodeError:
+                    return None
+            start = end + 1
+
+    def _match(
+        self,
+        echoed: str,
+        events: List[Event],
+        success: bool = False,
+        data: Optional[List[str]] = None,
+        error: Optional[LircError] = None,
+    ) -> None:
+        """Pair a reply with the command it echoes.
+
+        Args:
+            echoed: The command line echoed in the reply.
+            events: Where to add the reply, unless its command was
+                abandoned or never sent.
+            success: Whether lircd ran the command successfully.
+            data: The lines of data in the reply.
+            error: Why the reply could not be read, if it couldn't.
+        """
+        echoed = " ".join(echoed.split())
+
+        for index, (command, _) in enumerate(self._pending):
+            if command == echoed:
+                break
+        else:
+            # A reply to a command this protocol did not send.
+            return
+
+        # lircd replies in order, so it will never reply to the
+        # commands sent before this one.
+        for _ in range(index):
+            self._fail_oldest(
+                LircdInvalidReplyPacketError(
+                    f"lircd replied to `{echoed}` instead of this command."
+                ),
+                events,
+            )
+
+        _, abandoned = self._pending.popleft()
+        if not abandoned:
+            events.append(Reply(echoed, success, data or [], error))
+
+    def _fail_oldest(self, error: LircError, events: List[Event]) -> None:
+        """Give the oldest command waiting on a reply a failed reply.
+
+        Args:
+            error: Why the reply could not be read.
+            events: Where to add the failed reply, unless the command
+                was abandoned.
+        """
+        if not self._pending:
+            return
+
+        command, abandoned = self._pending.popleft()
+        if not abandoned:
+            events.append(Reply(command, False, [], error))
+
+
+class NonBlockingConnection:
+    """Drives an ``LircdProtocol`` over a non-blocking socket.
+
+    It has a ``fileno()``, so it can be registered with a ``selectors``
+    selector directly. Commands are queued with ``send_command()``, and
+    are written by ``flush()`` once the socket is writable. Replies and
+    broadcasts are returned by ``receive()`` once it is readable.
+
+    Example:
+        >>> import selectors
+        >>> from lirc.protocol import NonBlockingConnection
+        >>> lircd = NonBlockingConnection()
+        >>> lircd.send_command("SEND_ONCE tv KEY_POWER 0")
+        >>> selector = selectors.DefaultSelector()
+        >>> selector.register(lircd, selectors.EVENT_READ | selectors.EVENT_WRITE)
+        >>> while lircd.protocol.pending:
+        ...     for key, mask in selector.select():
+        ...         if mask & selectors.EVENT_WRITE and lircd.flush():
+        ...             selector.modify(lircd, selectors.EVENT_READ)
+        ...         if mask & selectors.EVENT_READ:
+        ...             for event in lircd.receive():
+        ...                 print(event)
+    """
+
+    def __init__(self, connection: Optional[LircdConnection] = None) -> None:
+        """Initialize the connection by connecting to lircd.
+
+        Args:
+            connection: The connection to lircd to use the socket of.
+                Defaults to an ``LircdConnection`` with the defaults for
+                the operating system. It should not be used by anything
+                else once it is passed in.
+
+        Raises:
+            LircdConnectionError: If the socket cannot connect to lircd.
+        """
+        if connection is None:
+            connection = LircdConnection()
+
+        connection.connect()
+        connection.socket.setblocking(False)
+
+        self._connection = connection
+        self._protocol = LircdProtocol()
+        self._outgoing = bytearray()
+
+    def __enter__(self) -> "NonBlockingConnection":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def fileno(self) -> int:
+        """Retrieve the file descriptor of the socket to lircd.
+
+        Returns:
+            The file descriptor.
+        """
+        return self._connection.socket.fileno()
+
+    @property
+    def protocol(self) -> LircdProtocol:
+        """Retrieve the protocol state of the connection.
+
+        Returns:
+            The protocol.
+        """
+        return self._protocol
+
+    @property
+    def wants_write(self) -> bool:
+        """Check whether there are queued commands left to write.
+
+        Returns:
+            True if ``flush()`` should be called once the socket
+            is writable; False otherwise.
+        """
+        return bool(self._outgoing)
+
+    def send_command(self, command: str) -> None:
+        """Queue a command to be written by ``flush()``.
+
+        Args:
+            command: A command from the lircd socket command interface.
+        """
+        self._outgoing += self._protocol.send_command(command)
+
+    def flush(self) -> bool:
+        """Write as much of the queued commands as the socket takes
+        without blocking.
+
+        Raises:
+            LircdSocketError: If writing to the socket failed.
+
+        Returns:
+            True once every queued command has been written.
+        """
+        try:
+            sent = self._connection.socket.send(self._outgoing)
+        except (BlockingIOError, InterruptedError):
+            return False
+        except OSError as error:
+            raise LircdSocketError(
+                f"An error occurred while writing to the lircd socket: {error}"
+            )
+
+        del self._outgoing[:sent]
+        return not self._outgoing
+
+    def receive(self) -> List[Event]:
+        """Read what is waiting on the socket without blocking.
+
+        Raises:
+            LircdSocketError: If lircd closed the connection or some
+                other error happened when reading from the socket.
+
+        Returns:
+            The replies and broadcasts that were completed by the read.
+        """
+        try:
+            data = self._connection.socket.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return []
+        except OSError as error:
+            raise LircdSocketError(
+                f"An error occurred while reading from the lircd socket: {error}"
+            )
+
+        if not data:
+            raise LircdSocketError("lircd closed the connection.")
+
+        return self._protocol.receive_data(data)
+
+    def close(self) -> None:
+        """Close the socket to lircd."""
+        self._connection.close()
@@ -1,7 +1,96 @@
 from enum import IntEnum, auto
+from typing import List, Optional, Tuple, Union
 
 from .exceptions import LircdInvalidReplyPacketError
 
+# The lines of a reply packet before its data: BEGIN, the command, the
+# result and then DATA or END. A SIGHUP packet is BEGIN, SIGHUP and END.
+_HEADER_LINES = 4
+_SIGHUP_LINES = 3
+
+
+class ReplyPacket:
+    """A reply packet that was parsed out of raw bytes
+    by ``ReplyPacketParser.feed_bytes``.
+
+    The lines of data in the packet are kept as the raw bytes
+    they were received as, and only decoded the first time
+    ``data`` is accessed.
+    """
+
+    __slots__ = ("_command", "_success", "_raw_data", "_data")
+
+    def __init__(self, command: str, success: bool, raw_data: bytes = b"") -> None:
+        """Initialize the reply packet.
+
+        Args:
+            command: The command line of the packet.
+            success: Whether the result line of the packet was SUCCESS.
+            raw_data: The undecoded lines of data in the packet.
+        """
+        self._command = command
+        self._success = success
+        self._raw_data = raw_data
+        self._data = None
+
+    def __repr__(self) -> str:
+        return (
+            f"ReplyPacket(command={self._command!r}, success={self._success!r}, "
+            f"raw_data={self._raw_data!r})"
+        )
+
+    @property
+    def command(self) -> str:
+        """Retrieves the command that the packet is a reply to.
+
+        Returns:
+            The command, or SIGHUP for a SIGHUP packet.
+        """
+        return self._command
+
+    @property
+    def success(self) -> bool:
+        """Checks whether the packet has a SUCCESS result.
+
+        Returns:
+            True if the command result is success; False otherwise.
+        """
+        return self._success
+
+    @property
+    def is_sighup(self) -> bool:
+        """Checks whether this is a SIGHUP packet lircd broadcasts
+        after re-reading its config, rather than a reply.
+
+        Returns:
+            True if this is a SIGHUP packet; False otherwise.
+        """
+        return self._command == "SIGHUP"
+
+    @property
+    def raw_data(self) -> bytes:
+        """Retrieves the undecoded lines of data in the packet.
+
+        Returns:
+            The lines of data, each ending with a newline.
+        """
+        return self._raw_data
+
+    @property
+    def data(self) -> List[str]:
+        """Retrieves the lines of data in the packet, decoding
+        them on the first access.
+
+        Returns:
+            The data response.
+        """
+        if self._data is None:
+            self._data = [
+                line.strip() for line in self._raw_data.decode("utf-8").splitlines()
+            ]
+
+        return self._data
+
 
 class ReplyPacketParser:
     class State(IntEnum):
@@ -80,6 +169,14 @@ class ReplyPacketParser:
             self.State.SIGHUP_END: self._sighup_end,
             self.State.END: self._end,
         }
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset the parser to read in another reply packet.
+
+        This allows a parser to be reused for many packets
+        instead of creating a new one for each of them.
+        """
         self._state = self.State.BEGIN
         self._command_result = self.Result.UNDETERMINED
         self._data_response = []
@@ -94,6 +191,16 @@ class ReplyPacketParser:
         """
         return self._data_response
 
+    @property
+    def state(self) -> "ReplyPacketParser.State":
+        """Retrieves the state the parser is in, i.e. the part of
+        the reply packet it expects next.
+
+        Returns:
+            The current state.
+        """
+        return self._state
+
     @property
     def is_finished(self) -> bool:
         """Checks whether we are in the finished state.
@@ -247,7 +354,7 @@ class ReplyPacketParser:
             LircdInvalidReplyPacketError: If the line does not contain END.
         """
         if line == "END":
-            self.__init__()
+            self.reset()
         else:
             raise LircdInvalidReplyPacketError(
                 "Expected an END line with the received SIGHUP packet from "
@@ -273,6 +380,218 @@ class ReplyPacketParser:
                 f"got `{line}` instead."
             )
 
+    @staticmethod
+    def feed_bytes(
+        buffer: Union[bytes, bytearray], skip_broadcasts: bool = False
+    ) -> Tuple[List[ReplyPacket], int]:
+        """Parse every complete reply packet in a buffer of raw bytes.
+
+        Unlike ``feed()``, this does not go through the finite state
+        machine line by line. The buffer is scanned once, jumping from
+        newline to newline, and the lines of data in each packet are
+        sliced out without being decoded. This does not use or change
+        the state of the parser, so partial packets are left for the
+        caller to feed in again once more bytes arrived.
+
+        Args:
+            buffer: Raw bytes read from an lircd connection.
+            skip_broadcasts: Whether to skip over lines outside of
+                packets, such as the button events lircd broadcasts,
+                instead of treating them as invalid packets.
+
+        Raises:
+            LircdInvalidReplyPacketError: If there is a packet in the
+                buffer that is not in the reply packet format. The
+                packets before it are on the error as ``packets``, and
+                the number of bytes they took up as ``consumed``, so
+                they are not lost. The invalid packet starts there.
+
+        Returns:
+            The complete packets in the buffer, including any SIGHUP
+            packets, and the number of bytes they took up. Bytes after
+            that belong to a packet that has not been fully received.
+        """
+        packets = []
+        consumed = 0
+
+        try:
+            while True:
+                if skip_broadcasts:
+                    end = buffer.find(b"\n", consumed)
+                    if end == -1:
+                        return packets, consumed
+
+                    if buffer[consumed:end].strip() != b"BEGIN":
+                        consumed = end + 1
+                        continue
+
+                end = ReplyPacketParser.scan_packet(buffer, consumed, packets)
+                if end is None:
+                    return packets, consumed
+                consumed = end
+        except LircdInvalidReplyPacketError as error:
+            error.packets = packets
+            error.consumed = consumed
+            raise
+
+    @staticmethod
+    def scan_packet(
+        buffer: Union[bytes, bytearray], start: int, packets: List[ReplyPacket]
+    ) -> Optional[int]:
+        """Scan a single reply or SIGHUP packet from a buffer of raw
+        bytes, the same way ``feed_bytes`` does. This is for parsers of
+        the stream from lircd that need to step over the packets in it.
+
+        Args:
+            buffer: Raw bytes read from an lircd connection.
+            start: The index of the buffer the packet starts at.
+            packets: The packets found so far. The scanned packet is
+                appended to it.
+
+        Raises:
+            LircdInvalidReplyPacketError: If the packet is not in the
+                reply packet format.
+
+        Returns:
+            The index after the end of the packet, or None if the
+            packet is not complete yet.
+        """
+        scanned = ReplyPacketParser._scan_header(buffer, start)
+        if scanned is None:
+            return None
+
+        header, pos = scanned
+        if header[1] == b"SIGHUP":
+            packets.append(ReplyPacket("SIGHUP", False))
+            return pos
+
+        _, command, result, marker = header
+        if marker == b"END":
+            packets.append(ReplyPacket(command.decode(), result == b"SUCCESS"))
+            return pos
+
+        scanned = ReplyPacketParser._scan_data(buffer, pos)
+        if scanned is None:
+            return None
+
+        data, pos = scanned
+        packets.append(ReplyPacket(command.decode(), result == b"SUCCESS", data))
+        return pos
+
+    @staticmethod
+    def _scan_header(
+        buffer: Union[bytes, bytearray], start: int
+    ) -> Optional[Tuple[List[bytes], int]]:
+        """Scan the lines of a packet up to its data, or the whole of
+        a SIGHUP packet. Blank lines are skipped over just like
+        ``feed()`` does.
+
+        Args:
+            buffer: Raw bytes read from an lircd connection.
+            start: The index of the buffer the packet starts at.
+
+        Raises:
+            LircdInvalidReplyPacketError: If the lines are not the
+                start of a packet.
+
+        Returns:
+            BEGIN, the command, the result and then DATA or END, or
+            BEGIN, SIGHUP and END, with the index after them. None if
+            they are not complete yet.
+        """
+        find = buffer.find
+        pos = start
+        header = []
+
+        while len(header) < _HEADER_LINES:
+            end = find(b"\n", pos)
+            if end == -1:
+                return None
+
+            line = buffer[pos:end].strip()
+            pos = end + 1
+            if not line:
+                continue
+
+            header.append(line)
+
+            if len(header) == 1 and line != b"BEGIN":
+                raise LircdInvalidReplyPacketError(
+                    f"Expected a BEGIN line from lircd, got `{line.decode()}`."
+                )
+
+            if len(header) == _SIGHUP_LINES and header[1] == b"SIGHUP":
+                if line != b"END":
+                    raise LircdInvalidReplyPacketError(
+                        "Expected an END line with the received SIGHUP packet from "
+                        f"lircd, got `{line.decode()}` instead."
+                    )
+                return header, pos
+
+        _, _, result, marker = header
+        if result not in (b"SUCCESS", b"ERROR"):
+            raise LircdInvalidReplyPacketError(
+                f"Expected a result line from lircd, got `{result.decode()}`."
+            )
+
+        if marker not in (b"END", b"DATA"):
+            raise LircdInvalidReplyPacketError(
+                f"Expected an END or DATA line from lircd, got `{marker.decode()}`."
+            )
+
+        return header, pos
+
+    @staticmethod
+    def _scan_data(
+        buffer: Union[bytes, bytearray], pos: int
+    ) -> Optional[Tuple[bytes, int]]:
+        """Scan the data of a packet, from its line count to its END line.
+
+        Args:
+            buffer: Raw bytes read from an lircd connection.
+            pos: The index of the buffer the line count starts at.
+
+        Raises:
+            LircdInvalidReplyPacketError: If the line count or the END
+                line after the data is invalid.
+
+        Returns:
+            The lines of data and the index after the END line, or
+            None if they are not complete yet.
+        """
+        find = buffer.find
+        end = find(b"\n", pos)
+        if end == -1:
+            return None
+
+        try:
+            lines_left = int(buffer[pos:end])
+        except ValueError:
+            raise LircdInvalidReplyPacketError(
+                "Expected a remaining line count line from lircd, "
+                f"got `{buffer[pos:end].decode()}`."
+            )
+
+        data_start = pos = end + 1
+        for _ in range(lines_left):
+            end = find(b"\n", pos)
+            if end == -1:
+                return None
+            pos = end + 1
+        data_end = pos
+
+        end = find(b"\n", pos)
+        if end == -1:
+            return None
+
+        if buffer[pos:end].strip() != b"END":
+            raise LircdInvalidReplyPacketError(
+                "Expected an END line from lircd's reply packet, "
+                f"got `{buffer[pos:end].decode()}` instead."
+            )
+
+        return bytes(buffer[data_start:data_end]), end + 1
+
     def feed(self, line: str) -> None:
         """Feed a line from the reply packet into the parser.
 
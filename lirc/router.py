@@ -0,0 +1,251 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List
+
+from .client import Client
+
+# Put on a worker's queue to stop it.
+_STOP = object()
+
+
+class _Worker:
+    """Runs the commands for one lircd daemon in order on a thread
+    of its own, so that a slow daemon only holds up its own queue.
+    """
+
+    def __init__(self, client: Client, name: str, max_queued: int):
+        self.client = client
+        self.queue = queue.Queue(max_queued)
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, operation: Callable[[Client], Any]) -> Future:
+        """Queue an operation to run with the daemon's client.
+
+        Args:
+            operation: Called with the client on the worker's thread.
+
+        Returns:
+            A future for what the operation returns.
+        """
+        future = Future()
+        self.queue.put((future, operation))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+
+            future, operation = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                result = operation(self.client)
+            except BaseException as error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+class RemoteRouter:
+    """Sends commands for a remote to the lircd daemon it belongs to.
+
+    With one lircd per IR blaster, every remote is set up on exactly
+    one of the daemons. The router asks each daemon which remotes it
+    has and keeps an index of them, so callers only need the name of
+    the remote. Each daemon has its own queue of commands, run in order
+    on a thread of its own, so a slow blaster in one room never holds
+    up the commands going to another.
+
+    Commands return a ``concurrent.futures.Future`` for lircd's reply.
+
+    Example:
+        >>> import lirc
+        >>> from lirc.router import RemoteRouter
+        >>> router = RemoteRouter([
+        ...     lirc.Client(lirc.TcpConnection(("living-room", 8765))),
+        ...     lirc.Client(lirc.TcpConnection(("bedroom", 8765))),
+        ... ])
+        >>> router.send_once("bedroom-tv", "KEY_POWER").result()
+    """
+
+    def __init__(self, clients: Iterable[Client], max_queued: int = 0) -> None:
+        """Initialize the router by starting a worker for each daemon
+        and building the index of their remotes.
+
+        Args:
+            clients: A client for each lircd daemon. The router uses
+                them from its worker threads, so they should not be
+                used by anything else until the router is closed.
+            max_queued: The most commands to queue up for a daemon
+                before sending another one to it blocks. Queues are
+                unbounded if this is 0.
+
+        Raises:
+            ValueError: If more than one daemon has the same remote.
+            LircdCommandFailureError: If listing the remotes of any
+                of the daemons failed.
+        """
+        self._workers = [
+            _Worker(client, f"lirc-router-{index}", max_queued)
+            for index, client in enumerate(clients)
+        ]
+        self._routes: Dict[str, _Worker] = {}
+        self._closed = False
+
+        try:
+            self.refresh()
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> "RemoteRouter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def remotes(self) -> List[str]:
+        """Retrieve the remotes the router can send commands for.
+
+        Returns:
+            The name of every remote on any of the daemons.
+        """
+        return list(self._routes)
+
+    def refresh(self) -> None:
+        """Rebuild the index of remotes by asking every daemon which
+        remotes it has, such as after lircd re-read its config. The
+        daemons are asked at once, behind any commands already queued.
+
+        Raises:
+            ValueError: If more than one daemon has the same remote.
+            LircdCommandFailureError: If listing the remotes of any
+                of the daemons failed.
+        """
+        futures = [
+            worker.submit(lambda client: client.list_remotes())
+            for worker in self._workers
+        ]
+
+        routes = {}
+        for worker, future in zip(self._workers, futures):
+            remotes = future.result()
+            # A reply with a single line of data is returned as a string.
+            for remote in [remotes] if isinstance(remotes, str) else remotes:
+                if remote in routes:
+                    raise ValueError(
+                        f"the remote `{remote}` is on more than one lircd daemon"
+                    )
+                routes[remote] = worker
+
+        self._routes = routes
+
+    def client_for(self, remote: str) -> Client:
+        """Retrieve the client of the daemon a remote belongs to.
+
+        Args:
+            remote: The name of the remote.
+
+        Raises:
+            ValueError: If no daemon has the remote.
+
+        Returns:
+            The client of the daemon with the remote.
+        """
+        return self._route(remote).client
+
+    def send_once(self, remote: str, key: str, repeat_count: int = 0) -> Future:
+        """Queue a key to be sent once by the daemon with the remote.
+
+        Args:
+            remote: The remote to use keys from.
+            key: The name of the key to send.
+            repeat_count: The number of times to repeat this key.
+
+        Raises:
+            ValueError: If no daemon has the remote.
+
+        Returns:
+            A future that is done once lircd replied. It raises a
+            LircdCommandFailureError if lircd failed to send the key.
+        """
+        return self._route(remote).submit(
+            lambda client: client.send_once(remote, key, repeat_count)
+        )
+
+    def send_start(self, remote: str, key: str) -> Future:
+        """Queue a key to start repeating on the daemon with the remote.
+
+        Args:
+            remote: The remote to use keys from.
+            key: The name of the key to start sending.
+
+        Raises:
+            ValueError: If no daemon has the remote.
+
+        Returns:
+            A future that is done once lircd replied.
+        """
+        return self._route(remote).submit(
+            lambda client: client.send_start(remote, key)
+        )
+
+    def send_stop(self, remote: str, key: str) -> Future:
+        """Queue a repeating key to stop on the daemon with the remote.
+
+        Unlike ``Client.send_stop``, the remote and key are needed
+        to know which daemon to send the command to.
+
+        Args:
+            remote: The remote to stop.
+            key: The key to stop sending.
+
+        Raises:
+            ValueError: If no daemon has the remote.
+
+        Returns:
+            A future that is done once lircd replied.
+        """
+        return self._route(remote).submit(
+            lambda client: client.send_stop(remote, key)
+        )
+
+    def close(self) -> None:
+        """Stop every worker once the commands queued on it have been
+        sent, and close the clients.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        for worker in self._workers:
+            worker.queue.put(_STOP)
+
+        for worker in self._workers:
+            worker.thread.join()
+            worker.client.close()
+
+    def _route(self, remote: str) -> _Worker:
+        """Find the worker for the daemon a remote belongs to.
+
+        Args:
+            remote: The name of the remote.
+
+        Raises:
+            ValueError: If no daemon has the remote.
+
+        Returns:
+            The worker of the daemon with the remote.
+        """
+        try:
+            return self._routes[remote]
+        except KeyError:
+            raise ValueError(
+                f"none of the lircd daemons have a remote named `{remote}`"
+            ) from None
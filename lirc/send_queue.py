@@ -0,0 +1,200 @@
+from typing import Dict, List, NamedTuple, Optional, Union
+
+from .client import Client
+from .commands import transmitter_mask
+from .exceptions import LircdCommandFailureError
+from .pipeline import Pipeline
+
+
+class _QueuedSend(NamedTuple):
+    remote: str
+    key: str
+    repeat_count: int
+
+
+class SendQueue:
+    """Queue up keys to send on different transmitters, then send them
+    grouped by their transmitters so they change as few times as possible.
+
+    Sending keys to many zones one after the other means setting the
+    transmitters before nearly every key. A send queue instead sends
+    every key for the same transmitters together, after a single
+    SET_TRANSMITTERS, starting with the transmitters the client already
+    has set. The keys for the same transmitters are sent in the order
+    they were queued, but the groups are not, so keys that have to be
+    sent in a certain order across zones should be sent with the client.
+
+    Everything is sent in one pipeline when the queue is flushed.
+
+    Example:
+        >>> import lirc
+        >>> from lirc.send_queue import SendQueue
+        >>> client = lirc.Client()
+        >>> with SendQueue(client) as sends:
+        ...     sends.send_once("tv", "KEY_POWER", [1])
+        ...     sends.send_once("tv", "KEY_POWER", [2])
+        ...     sends.send_once("tv", "KEY_MUTE", [1])
+        ...     sends.flush()
+        [None, None, None]
+    """
+
+    def __init__(self, client: Client) -> None:
+        """Initialize the queue with no keys to send.
+
+        Args:
+            client: The client to send the keys with.
+        """
+        self._client = client
+        self._sends: List[_QueuedSend] = []
+        self._masks: List[int] = []
+
+    def __enter__(self) -> "SendQueue":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.reset()
+
+    def __len__(self) -> int:
+        return len(self._sends)
+
+    def send_once(
+        self,
+        remote: str,
+        key: str,
+        transmitters: Union[int, List[int]],
+        repeat_count: int = 0,
+    ) -> None:
+        """Queue a key to be sent once on some transmitters.
+
+        Args:
+            remote: The remote to use keys from.
+            key: The name of the key to send.
+            transmitters: The transmitters to send the key on, as a mask
+                or a list like ``Client.set_transmitters`` takes.
+            repeat_count: The number of times to repeat this key.
+        """
+        self._sends.append(_QueuedSend(remote, key, repeat_count))
+        self._masks.append(transmitter_mask(transmitters))
+
+    def reset(self) -> None:
+        """Discard the queued keys."""
+        self._sends = []
+        self._masks = []
+
+    def flush(
+        self, raise_on_error: bool = True
+    ) -> List[Optional[LircdCommandFailureError]]:
+        """Send every queued key, grouped by its transmitters, and
+        read the replies. The queue is emptied afterwards.
+
+        Args:
+            raise_on_error: Whether to raise the first failure once all
+                the replies have been read, rather than return it.
+
+        Raises:
+            LircdCommandFailureError: If raise_on_error is set and
+                any of the keys or transmitters failed to be sent.
+
+        Returns:
+            For each key in the order it was queued, None if it was sent
+            or the LircdCommandFailureError of why it wasn't. A key whose
+            transmitters failed to be set has the failure of setting them.
+        """
+        sends, masks = self._sends, self._masks
+        self.reset()
+
+        groups = self._group(masks)
+        pipe = self._client.pipeline()
+        switches = self._queue(pipe, sends, groups)
+        results = self._results(
+            pipe.execute(raise_on_error=False), groups, switches, len(sends)
+        )
+
+        if raise_on_error:
+            for result in results:
+                if result is not None:
+                    raise result
+
+        return results
+
+    def _group(self, masks: List[int]) -> Dict[int, List[int]]:
+        """Group the queued keys by their transmitters.
+
+        Args:
+            masks: The transmitter mask of each queued key.
+
+        Returns:
+            The indexes of the keys for each mask, in the order the
+            groups are sent in. The transmitters already set go first,
+            to save changing them.
+        """
+        groups: Dict[int, List[int]] = {}
+        for index, mask in enumerate(masks):
+            groups.setdefault(mask, []).append(index)
+
+        current = self._client._transmitter_mask
+        order = sorted(groups, key=lambda mask: mask != current)
+        return {mask: groups[mask] for mask in order}
+
+    def _queue(
+        self, pipe: Pipeline, sends: List[_QueuedSend], groups: Dict[int, List[int]]
+    ) -> List[bool]:
+        """Queue each group of keys on a pipeline, after setting
+        its transmitters if they are not set already.
+
+        Args:
+            pipe: The pipeline to queue the commands on.
+            sends: The queued keys.
+            groups: The indexes of the keys for each mask, from ``_group``.
+
+        Returns:
+            Whether the transmitters were set for each group.
+        """
+        current = self._client._transmitter_mask
+        switches = []
+        for mask, indexes in groups.items():
+            switches.append(mask != current)
+            if mask != current:
+                pipe.set_transmitters(mask)
+                current = mask
+            for index in indexes:
+                pipe.send_once(*sends[index])
+        return switches
+
+    @staticmethod
+    def _results(
+        replies: List[Union[str, List[str], LircdCommandFailureError]],
+        groups: Dict[int, List[int]],
+        switches: List[bool],
+        count: int,
+    ) -> List[Optional[LircdCommandFailureError]]:
+        """Find the outcome of each key from the replies to the pipeline.
+
+        Args:
+            replies: The reply to each command of the pipeline.
+            groups: The indexes of the keys for each mask, from ``_group``.
+            switches: Whether the transmitters were set for each group.
+            count: The number of keys that were queued.
+
+        Returns:
+            For each key in the order it was queued, None if it was sent
+            or the failure of sending it or of setting its transmitters.
+        """
+        replies = iter(replies)
+        results: List[Optional[LircdCommandFailureError]] = [None] * count
+
+        for indexes, switched in zip(groups.values(), switches):
+            failure = None
+            if switched:
+                reply = next(replies)
+                if isinstance(reply, LircdCommandFailureError):
+                    failure = reply
+
+            for index in indexes:
+                reply = next(replies)
+                if isinstance(reply, LircdCommandFailureError):
+                    results[index] = reply
+                else:
+                    results[index] = failure
+
+        return results
@@ -0,0 +1,272 @@
+import threading
+import time
+from typing import List, NamedTuple, Optional, Set, Tuple, Union
+from typing import Sequence as SequenceType
+
+from .client import Client
+
+
+class SendOnce(NamedTuple):
+    """Send a key once, like ``Client.send_once``."""
+
+    remote: str
+    key: str
+    repeat_count: int = 0
+
+    def run(self, client: Client) -> None:
+        """Send the key once with the client."""
+        client.send_once(self.remote, self.key, self.repeat_count)
+
+
+class SendStart(NamedTuple):
+    """Start repeating a key until a later ``SendStop``,
+    like ``Client.send_start``.
+    """
+
+    remote: str
+    key: str
+
+    def run(self, client: Client) -> None:
+        """Start repeating the key with the client."""
+        client.send_start(self.remote, self.key)
+
+
+class SendStop(NamedTuple):
+    """Stop repeating a key, like ``Client.send_stop``. The remote
+    and key default to those of the last ``SendStart`` step.
+    """
+
+    remote: str = ""
+    key: str = ""
+
+    def run(self, client: Client) -> None:
+        """Stop repeating the key with the client."""
+        client.send_stop(self.remote, self.key)
+
+
+class SetTransmitters(NamedTuple):
+    """Set the active transmitters, like ``Client.set_transmitters``."""
+
+    transmitters: Union[int, List[int]]
+
+    def run(self, client: Client) -> None:
+        """Set the transmitters with the client."""
+        client.set_transmitters(self.transmitters)
+
+
+class Delay(NamedTuple):
+    """Wait before running the next step."""
+
+    seconds: float
+
+
+Step = Union[SendOnce, SendStart, SendStop, SetTransmitters, Delay]
+
+
+class StepTiming(NamedTuple):
+    """How a command step of a sequence ran compared to the plan.
+
+    All times are in seconds since the sequence started.
+    """
+
+    #: The index of the step in the sequence.
+    index: int
+    #: The step that ran.
+    step: Step
+    #: When the step was planned to be sent.
+    planned: float
+    #: When the step was actually sent.
+    actual: float
+    #: How long lircd took to reply to the step.
+    latency: float
+
+    @property
+    def drift(self) -> float:
+        """How late the step was sent compared to the plan.
+        This is negative if it was sent early.
+        """
+        return self.actual - self.planned
+
+
+class Sequence:
+    """Runs a list of steps against a client on a fixed schedule.
+
+    Each step is planned at an offset from the start of the sequence,
+    which is the sum of all the delays before it. Steps are sent at
+    their planned offsets measured on a monotonic clock, rather than
+    sleeping for each delay after the previous command returned, so
+    the time lircd takes to reply and any oversleeping never add up
+    over the length of the sequence.
+
+    Example:
+        >>> import lirc
+        >>> from lirc.sequence import Delay, SendOnce, Sequence
+        >>> client = lirc.Client()
+        >>> sequence = Sequence(client, [
+        ...     SendOnce("tv", "KEY_POWER"),
+        ...     Delay(1.5),
+        ...     SendOnce("tv", "KEY_INPUT"),
+        ...     Delay(0.2),
+        ...     SendOnce("tv", "KEY_3"),
+        ...     SendOnce("tv", "KEY_7"),
+        ... ])
+        >>> timings = sequence.run()
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        steps: SequenceType[Step],
+        compensate_latency: bool = False,
+    ) -> None:
+        """Initialize the sequence.
+
+        Args:
+            client: The client to send the steps with.
+            steps: The steps to run, in order.
+            compensate_latency: Whether to send each step early by the
+                average time lircd has taken to reply so far, so that
+                its reply lands at the planned time instead.
+        """
+        self._client = client
+        self._steps = list(steps)
+        self._compensate_latency = compensate_latency
+        self._cancelled = threading.Event()
+
+    @property
+    def steps(self) -> List[Step]:
+        """Retrieve the steps of the sequence.
+
+        Returns:
+            The steps, in order.
+        """
+        return list(self._steps)
+
+    @property
+    def duration(self) -> float:
+        """Retrieve how long the sequence is planned to take, not
+        counting the time the commands after the last delay take.
+
+        Returns:
+            The sum of all the delays in seconds.
+        """
+        return sum(step.seconds for step in self._steps if isinstance(step, Delay))
+
+    @property
+    def cancelled(self) -> bool:
+        """Check whether the sequence was cancelled.
+
+        Returns:
+            True if ``cancel()`` was called since the sequence last
+            started running; False otherwise.
+        """
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Stop the sequence before its next step. This can be called
+        from any thread while the sequence is running.
+        """
+        self._cancelled.set()
+
+    def plan(self) -> List[Tuple[float, Step]]:
+        """Work out when each command step should be sent.
+
+        Returns:
+            The offset in seconds from the start of the sequence
+            and the step, for every step that is not a delay.
+        """
+        planned = []
+        offset = 0.0
+
+        for step in self._steps:
+            if isinstance(step, Delay):
+                offset += step.seconds
+            else:
+                planned.append((offset, step))
+
+        return planned
+
+    def run(self) -> List[StepTiming]:
+        """Run the steps of the sequence, blocking until the last one
+        is done or the sequence is cancelled.
+
+        Any keys that were started with a ``SendStart`` step and not
+        stopped by the end of the sequence, whether it finished, was
+        cancelled or failed, are stopped. A sequence that was cancelled
+        can be run again from the start.
+
+        Raises:
+            LircdCommandFailure: If one of the steps fails. The rest of
+                the sequence is not run. If stopping a held key fails
+                as well, that failure is chained to it as its context.
+                Otherwise, if stopping a held key fails, that failure
+                is raised once every key was tried.
+
+        Returns:
+            The timing of each step that was sent.
+        """
+        timings = []
+        holding: Set[Tuple[str, str]] = set()
+        last_start: Optional[Tuple[str, str]] = None
+        average_latency = 0.0
+        clock = time.perf_counter
+        planned = 0.0
+        self._cancelled.clear()
+        start = clock()
+
+        try:
+            for index, step in enumerate(self._steps):
+                if isinstance(step, Delay):
+                    planned += step.seconds
+                    continue
+
+                lead = average_latency if self._compensate_latency else 0.0
+                remaining = start + planned - lead - clock()
+                if remaining > 0 and self._cancelled.wait(remaining):
+                    break
+                if self._cancelled.is_set():
+                    break
+
+                sent = clock()
+                step.run(self._client)
+                latency = clock() - sent
+
+                timings.append(StepTiming(index, step, planned, sent - start, latency))
+                average_latency += (latency - average_latency) / len(timings)
+
+                if isinstance(step, SendStart):
+                    last_start = (step.remote, step.key)
+                    holding.add(last_start)
+                elif isinstance(step, SendStop):
+                    holding.discard(
+                        (step.remote, step.key)
+                        if step.remote and step.key
+                        else last_start
+                    )
+        except BaseException as error:
+            stop_error = self._stop(holding)
+            if stop_error is not None and error.__context__ is None:
+                error.__context__ = stop_error
+            raise
+
+        stop_error = self._stop(holding)
+        if stop_error is not None:
+            raise stop_error
+
+        return timings
+
+    def _stop(self, holding: Set[Tuple[str, str]]) -> Optional[Exception]:
+        """Stop every key that is still being held, even if stopping
+        one of them fails.
+
+        Returns:
+            The first failure to stop a key, or None.
+        """
+        first_error = None
+        for remote, key in holding:
+            try:
+                self._client.send_stop(remote, key)
+            except Exception as error:
+                if first_error is None:
+                    first_error = error
+        return first_error
@@ -0,0 +1,506 @@
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from .client import Client
+from .connection.lircd_connection import LircdConnection
+from .connection.tcp_connection import Backoff, TcpConnection
+
+Address = Union[str, Tuple[str, int]]
+# Whether a command succeeded and the lines of data to reply with.
+_Result = Tuple[bool, List[str]]
+
+# The remote and key of SEND_ONCE, SEND_START and SEND_STOP, and the
+# code, repeat count, key and remote of SIMULATE.
+_SEND_ARGS = 2
+_SIMULATE_ARGS = 4
+
+
+class Fault(Enum):
+    """Ways the fake lircd can misbehave when replying to a command."""
+
+    #: Reply ERROR instead of running the command.
+    ERROR = "error"
+    #: Close the connection instead of replying.
+    DROP = "drop"
+    #: Never reply.
+    HANG = "hang"
+    #: Reply with a packet whose result line is invalid.
+    GARBAGE = "garbage"
+    #: Send a SIGHUP packet right before the reply.
+    SIGHUP = "sighup"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Serves one client of the fake lircd."""
+
+    def setup(self) -> None:
+        super().setup()
+        self.write_lock = threading.Lock()
+        self.server.lircd._add_client(self)
+
+    def handle(self) -> None:
+        try:
+            for raw_line in self.rfile:
+                line = raw_line.decode("utf-8").strip()
+                if line and not self.server.lircd._handle(self, line):
+                    return
+        except ConnectionError:
+            # The client went away part way through a reply, such as
+            # after giving up on it at its deadline.
+            return
+
+    def finish(self) -> None:
+        self.server.lircd._remove_client(self)
+        super().finish()
+
+    def write(self, data: bytes) -> None:
+        """Send data to the client without anything else being sent
+        to it in between, in chunks if the fake lircd is set up to.
+        """
+        with self.write_lock:
+            self.server.lircd._write(self.connection, data)
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+class FakeLircd:
+    """An lircd that runs in the same process, for tests and load
+    generation without any IR hardware.
+
+    It listens on a local TCP port or unix socket and speaks the real
+    reply packet protocol for LIST, SEND_ONCE, SEND_START, SEND_STOP,
+    VERSION, SIMULATE, SET_TRANSMITTERS, SET_INPUTLOG and DRV_OPTION,
+    serving any number of clients at once on their own threads.
+
+    To reproduce timing bugs, replies can be delayed and written in
+    small chunks with pauses in between, button presses and SIGHUPs
+    can be broadcast at any time, and faults can be injected into
+    the replies to upcoming commands.
+
+    Example:
+        >>> from lirc.testing import Fault, FakeLircd
+        >>> with FakeLircd({"tv": ["KEY_POWER", "KEY_UP"]}, chunk_size=3) as lircd:
+        ...     client = lircd.client()
+        ...     lircd.press("tv", "KEY_UP")
+        ...     lircd.inject(Fault.SIGHUP, "LIST")
+        ...     client.list_remotes()
+        'tv'
+    """
+
+    def __init__(
+        self,
+        remotes: Optional[Dict[str, Sequence[str]]] = None,
+        address: Address = ("127.0.0.1", 0),
+        latency: float = 0.0,
+        chunk_size: int = 0,
+        chunk_delay: float = 0.0,
+    ) -> None:
+        """Initialize the fake lircd. It starts listening once
+        ``start()`` is called or it is used as a context manager.
+
+        Args:
+            remotes: The keys of each remote lircd knows about.
+            address: A path to listen on a unix socket at, or a host and
+                port to listen on over TCP. A port of 0 picks a free one.
+            latency: The number of seconds to wait before replying to
+                each command.
+            chunk_size: The most bytes to write to a client at a time.
+                Everything is written at once if this is 0.
+            chunk_delay: The number of seconds to wait between chunks.
+        """
+        self._remotes = {
+            remote: list(keys) for remote, keys in (remotes or {}).items()
+        }
+        self._requested_address = address
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        #: What to reply to the VERSION command with.
+        self.version = "0.10.1"
+        #: Whether the SIMULATE command is allowed, like lircd's
+        #: ``--allow-simulate`` option.
+        self.allow_simulate = True
+
+        self._lock = threading.Lock()
+        self._clients = set()
+        self._commands = []
+        self._faults: Deque[Tuple[Fault, Optional[str]]] = deque()
+        self._transmitter_mask = None
+        self._repeating = None
+        self._server = None
+        self._thread = None
+
+        # How to run each command, by its directive.
+        self._handlers: Dict[str, Callable[[List[str]], _Result]] = {
+            "VERSION": self._version_command,
+            "LIST": self._list,
+            "SEND_ONCE": self._send_once,
+            "SEND_START": self._send_start,
+            "SEND_STOP": self._send_stop,
+            "SET_TRANSMITTERS": self._set_transmitters,
+            "SIMULATE": self._simulate,
+            "SET_INPUTLOG": self._accept,
+            "DRV_OPTION": self._accept,
+        }
+
+    def __enter__(self) -> "FakeLircd":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    @property
+    def address(self) -> Address:
+        """Retrieve the address the fake lircd listens on.
+
+        Returns:
+            The path of the unix socket, or the host and port.
+        """
+        if self._server is None:
+            return self._requested_address
+        return self._server.server_address
+
+    @property
+    def commands(self) -> List[str]:
+        """Retrieve every command received so far, from any client.
+
+        Returns:
+            The commands in the order they were received.
+        """
+        with self._lock:
+            return list(self._commands)
+
+    @property
+    def clients(self) -> int:
+        """Retrieve how many clients are connected.
+
+        Returns:
+            The number of connected clients.
+        """
+        with self._lock:
+            return len(self._clients)
+
+    @property
+    def transmitter_mask(self) -> Optional[int]:
+        """Retrieve the mask last set with SET_TRANSMITTERS.
+
+        Returns:
+            The mask, or None if it was never set.
+        """
+        return self._transmitter_mask
+
+    @property
+    def repeating(self) -> Optional[Tuple[str, str]]:
+        """Retrieve the key being repeated after a SEND_START.
+
+        Returns:
+            The remote and key, or None if no key is being repeated.
+        """
+        return self._repeating
+
+    def start(self) -> None:
+        """Start listening for clients on a thread of its own."""
+        if isinstance(self._requested_address, str):
+            if os.path.exists(self._requested_address):
+                os.unlink(self._requested_address)
+            self._server = _UnixServer(self._requested_address, _Handler)
+        else:
+            self._server = _TCPServer(self._requested_address, _Handler)
+
+        self._server.lircd = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="fake-lircd",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop listening and disconnect every client."""
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self.disconnect_all()
+
+        if isinstance(self._requested_address, str):
+            try:
+                os.unlink(self._requested_address)
+            except FileNotFoundError:
+                pass
+
+        self._server = None
+
+    def connection(self, timeout: float = 5.0) -> LircdConnection:
+        """Create a connection to the fake lircd. It is not connected yet.
+
+        Args:
+            timeout: The amount of time to wait for data from the socket.
+
+        Returns:
+            A LircdConnection for a unix socket, or a TcpConnection.
+        """
+        if isinstance(self.address, str):
+            return LircdConnection(
+                self.address,
+                socket.socket(socket.AF_UNIX, socket.SOCK_STREAM),
+                timeout,
+            )
+
+        return TcpConnection(self.address, timeout, backoff=Backoff(delay=0.01))
+
+    def client(self, **kwargs) -> Client:
+        """Create a client connected to the fake lircd.
+
+        Args:
+            **kwargs: Passed on to ``Client``.
+
+        Returns:
+            The connected client.
+        """
+        return Client(self.connection(), **kwargs)
+
+    def inject(self, fault: Fault, command: Optional[str] = None) -> None:
+        """Misbehave when replying to an upcoming command. Faults are
+        used up in the order they were injected, one per command.
+
+        Args:
+            fault: How to misbehave.
+            command: The type of command to misbehave on, such as
+                ``SEND_ONCE``. Any command if this is None.
+        """
+        with self._lock:
+            self._faults.append((fault, command.upper() if command else None))
+
+    def press(self, remote: str, key: str, repeat: int = 0, code: int = 0) -> None:
+        """Broadcast a button press to every client, as lircd does
+        when it decodes an IR signal.
+
+        Args:
+            remote: The name of the remote.
+            key: The name of the key.
+            repeat: How many times the key was repeated so far.
+            code: The decoded IR code.
+        """
+        self._broadcast(f"{code:016x} {repeat:02x} {key} {remote}\n".encode())
+
+    def sighup(self, remotes: Optional[Dict[str, Sequence[str]]] = None) -> None:
+        """Broadcast a SIGHUP to every client, as lircd does when it
+        re-reads its config.
+
+        Args:
+            remotes: The keys of each remote in the new config.
+                The remotes are left as they are if this is None.
+        """
+        if remotes is not None:
+            with self._lock:
+                self._remotes = {
+                    remote: list(keys) for remote, keys in remotes.items()
+                }
+
+        self._broadcast(b"BEGIN\nSIGHUP\nEND\n")
+
+    def disconnect_all(self) -> None:
+        """Close the connection to every client, as if lircd restarted."""
+        with self._lock:
+            clients = list(self._clients)
+
+        for client in clients:
+            try:
+                client.connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _add_client(self, client: _Handler) -> None:
+        with self._lock:
+            self._clients.add(client)
+
+    def _remove_client(self, client: _Handler) -> None:
+        with self._lock:
+            self._clients.discard(client)
+
+    def _broadcast(self, data: bytes) -> None:
+        with self._lock:
+            clients = list(self._clients)
+
+        for client in clients:
+            try:
+                client.write(data)
+            except OSError:
+                pass
+
+    def _write(self, sock: socket.socket, data: bytes) -> None:
+        if not self.chunk_size:
+            sock.sendall(data)
+            return
+
+        for start in range(0, len(data), self.chunk_size):
+            if start and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            sock.sendall(data[start : start + self.chunk_size])
+
+    def _take_fault(self, directive: str) -> Optional[Fault]:
+        for index, (fault, command) in enumerate(self._faults):
+            if command is None or command == directive:
+                del self._faults[index]
+                return fault
+        return None
+
+    def _handle(self, client: _Handler, line: str) -> bool:
+        """Reply to a command from a client.
+
+        Returns:
+            False if the connection to the client was dropped.
+        """
+        directive = line.split(None, 1)[0].upper()
+        with self._lock:
+            self._commands.append(line)
+            fault = self._take_fault(directive)
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if fault is Fault.DROP:
+            client.connection.shutdown(socket.SHUT_RDWR)
+            return False
+        if fault is Fault.HANG:
+            return True
+        if fault is Fault.GARBAGE:
+            client.write(b"BEGIN\n%s\nMAYBE\nEND\n" % line.encode())
+            return True
+        if fault is Fault.SIGHUP:
+            client.write(b"BEGIN\nSIGHUP\nEND\n")
+
+        if fault is Fault.ERROR:
+            success, data = False, ["injected failure"]
+        else:
+            success, data = self._execute(directive, line.split()[1:])
+
+        packet = [
+            "BEGIN",
+            line,
+            "SUCCESS" if success else "ERROR",
+        ]
+        if data:
+            packet += ["DATA", str(len(data))] + data
+        packet.append("END")
+        client.write(("\n".join(packet) + "\n").encode("utf-8"))
+        return True
+
+    def _execute(self, directive: str, args: List[str]) -> _Result:
+        """Run a command like lircd would.
+
+        Returns:
+            Whether the command succeeded and the lines of data to
+            reply with.
+        """
+        handler = self._handlers.get(directive)
+        if handler is None:
+            return False, [f'unknown directive: "{directive}"']
+        return handler(args)
+
+    def _version_command(self, args: List[str]) -> _Result:
+        return True, [self.version]
+
+    def _list(self, args: List[str]) -> _Result:
+        with self._lock:
+            if not args:
+                return True, list(self._remotes)
+            keys = self._remotes.get(args[0])
+
+        if keys is None:
+            return False, [f'unknown remote: "{args[0]}"']
+        return True, [f"{code:016x} {key}" for code, key in enumerate(keys, 1)]
+
+    def _send_once(self, args: List[str]) -> _Result:
+        return self._check_send(args) or (True, [])
+
+    def _send_start(self, args: List[str]) -> _Result:
+        failure = self._check_send(args)
+        if failure:
+            return failure
+
+        self._repeating = (args[0], args[1])
+        return True, []
+
+    def _send_stop(self, args: List[str]) -> _Result:
+        failure = self._check_send(args)
+        if failure:
+            return failure
+
+        if self._repeating != (args[0], args[1]):
+            return False, ["not repeating"]
+        self._repeating = None
+        return True, []
+
+    def _set_transmitters(self, args: List[str]) -> _Result:
+        try:
+            self._transmitter_mask = int(args[0])
+        except (IndexError, ValueError):
+            return False, ["invalid argument"]
+        return True, []
+
+    def _simulate(self, args: List[str]) -> _Result:
+        if not self.allow_simulate:
+            return False, ["SIMULATE command is disabled"]
+        if len(args) != _SIMULATE_ARGS:
+            return False, ["bad simulate command"]
+
+        code, repeat, key, remote = args
+        error = self._check_key(remote, key)
+        if error:
+            return False, [error]
+
+        try:
+            self.press(remote, key, int(repeat, 16), int(code, 16))
+        except ValueError:
+            return False, ["bad simulate command"]
+        return True, []
+
+    def _accept(self, args: List[str]) -> _Result:
+        return True, []
+
+    def _check_send(self, args: List[str]) -> Optional[_Result]:
+        """Check the remote and key of a SEND_ONCE, SEND_START or
+        SEND_STOP command.
+
+        Returns:
+            The failed result to reply with, or None if lircd knows
+            about the key.
+        """
+        if len(args) < _SEND_ARGS:
+            return False, ["bad send packet"]
+
+        error = self._check_key(args[0], args[1])
+        if error:
+            return False, [error]
+        return None
+
+    def _check_key(self, remote: str, key: str) -> Optional[str]:
+        with self._lock:
+            keys = self._remotes.get(remote)
+
+        if keys is None:
+            return f'unknown remote: "{remote}"'
+        if key not in keys:
+            return f'unknown command: "{key}"'
+        return None
@@ -11,6 +11,30 @@ def mock_socket():
     return mock.MagicMock(spec=socket.socket)
 
 
+@pytest.fixture
+def socket_payload(mock_socket):
+    """Sets what the mock socket receives on each recv_into() call.
+
+    Each chunk passed in is received by one call, in order,
+    and the last chunk is then received by every call after.
+    A chunk can also be an exception, which that call raises.
+    """
+
+    def set_payload(*chunks: bytes) -> None:
+        remaining = list(chunks)
+
+        def recv_into(buffer, nbytes=0):
+            chunk = remaining.pop(0) if len(remaining) > 1 else remaining[0]
+            if isinstance(chunk, type) and issubclass(chunk, Exception):
+                raise chunk
+            buffer[: len(chunk)] = chunk
+            return len(chunk)
+
+        mock_socket.recv_into.side_effect = recv_into
+
+    return set_payload
+
+
 @pytest.fixture
 def mock_connection(mock_socket):
     return LircdConnection(socket=mock_socket)
@@ -0,0 +1,232 @@
+import asyncio
+
+import pytest
+
+from lirc import AsyncClient
+from lirc.exceptions import (
+    LircdCommandFailureError,
+    LircdConnectionError,
+    LircdSocketError,
+    LircdTimeoutError,
+)
+
+SUCCESS_PACKET = b"BEGIN\n%s\nSUCCESS\nEND\n"
+
+
+async def serve(path, reply, received):
+    """Start a unix socket server that records every command line
+    it receives and answers each with the given reply callable.
+    """
+
+    async def handle(reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            received.append(line)
+            writer.write(reply(line.strip()))
+            await writer.drain()
+        writer.close()
+
+    return await asyncio.start_unix_server(handle, path=str(path))
+
+
+def success(command):
+    return SUCCESS_PACKET % command
+
+
+@pytest.mark.parametrize(
+    "client_command, args, lircd_command",
+    [
+        ("send_once", {"remote": "REMOTE", "key": "KEY"}, b"SEND_ONCE REMOTE KEY 0\n"),
+        ("send_start", {"remote": "REMOTE", "key": "KEY"}, b"SEND_START REMOTE KEY\n"),
+        ("list_remote_keys", {"remote": "REMOTE"}, b"LIST REMOTE\n"),
+        ("stop_logging", {}, b"SET_INPUTLOG\n"),
+        (
+            "simulate",
+            {"remote": "REMOTE", "key": "KEY", "repeat_count": 4, "keycode": 53},
+            b"SIMULATE 0000000000000053 04 KEY REMOTE\n",
+        ),
+        ("set_transmitters", {"transmitters": [10, 1, 1]}, b"SET_TRANSMITTERS 513\n"),
+    ],
+)
+def test_that_async_client_commands_send_the_correct_command(
+    tmp_path, client_command, args, lircd_command
+):
+    """
+    lirc.AsyncClient
+
+    Ensure that the coroutine commands mirror the commands
+    that lirc.Client sends to lircd.
+    """
+    received = []
+
+    async def main():
+        server = await serve(tmp_path / "lircd", success, received)
+        async with server, AsyncClient(address=str(tmp_path / "lircd")) as client:
+            await getattr(client, client_command)(**args)  # SUT
+
+    asyncio.run(main())
+
+    assert received == [lircd_command]
+
+
+def test_that_async_client_returns_reply_data(tmp_path):
+    """
+    lirc.AsyncClient.list_remotes
+    lirc.AsyncClient.version
+
+    Ensure the data of the reply packet is returned.
+    """
+
+    def reply(command):
+        if command == b"VERSION":
+            return b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\nEND\n"
+        return b"BEGIN\nLIST\nSUCCESS\nDATA\n2\nremote-a\nremote-b\nEND\n"
+
+    async def main():
+        server = await serve(tmp_path / "lircd", reply, [])
+        async with server, AsyncClient(address=str(tmp_path / "lircd")) as client:
+            return await client.version(), await client.list_remotes()  # SUT
+
+    assert asyncio.run(main()) == ("0.10.1", ["remote-a", "remote-b"])
+
+
+def test_that_concurrent_commands_share_one_connection(tmp_path):
+    """
+    lirc.AsyncClient._send_command
+
+    Ensure many coroutines can use the client at the same time
+    and each gets the reply to its own command.
+    """
+    connections = []
+
+    def reply(command):
+        return b"BEGIN\n%s\nSUCCESS\nDATA\n1\n%s\nEND\n" % (command, command)
+
+    async def main():
+        server = await serve(tmp_path / "lircd", reply, connections)
+        async with server, AsyncClient(address=str(tmp_path / "lircd")) as client:
+            return await asyncio.gather(
+                *(client._send_command(f"LIST remote-{n}") for n in range(50))
+            )  # SUT
+
+    results = asyncio.run(main())
+
+    assert results == [f"LIST remote-{n}" for n in range(50)]
+
+
+def test_that_failed_command_raises_custom_exception(tmp_path):
+    """
+    lirc.AsyncClient._send_command
+
+    Ensure that an ERROR reply packet raises a LircdCommandFailureError.
+    """
+
+    def reply(command):
+        return b"BEGIN\n%s\nERROR\nDATA\n1\nunknown remote\nEND\n" % command
+
+    async def main():
+        server = await serve(tmp_path / "lircd", reply, [])
+        async with server, AsyncClient(address=str(tmp_path / "lircd")) as client:
+            await client.send_once("remote", "key")  # SUT
+
+    with pytest.raises(LircdCommandFailureError) as error:
+        asyncio.run(main())
+
+    assert "command sent to lircd failed: unknown remote" in str(error)
+
+
+def test_that_broadcasts_in_a_reply_are_skipped(tmp_path):
+    """
+    lirc.AsyncClient._send_command
+
+    Ensure a button press and a SIGHUP lircd broadcasts while a
+    command waits on its reply are not taken for part of it.
+    """
+    received = []
+
+    def reply(command):
+        return (
+            b"0000000000f40bf0 00 KEY_UP tv\nBEGIN\nSIGHUP\nEND\n"
+            b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\nEND\n"
+        )
+
+    async def main():
+        server = await serve(tmp_path / "lircd", reply, received)
+        async with server, AsyncClient(address=str(tmp_path / "lircd")) as client:
+            return await client.version()  # SUT
+
+    assert asyncio.run(main()) == "0.10.1"
+
+
+def test_that_closed_stream_raises_socket_error_and_reconnects(tmp_path):
+    """
+    lirc.AsyncClient._send_command
+
+    Ensure lircd closing the connection mid-reply raises a
+    LircdSocketError and that the next command reconnects.
+    """
+    async def handle(reader, writer):
+        await reader.readline()
+        if handle.calls == 0:
+            writer.write(b"BEGIN\nVERSION\n")
+        else:
+            writer.write(success(b"VERSION"))
+        handle.calls += 1
+        await writer.drain()
+        writer.close()
+
+    handle.calls = 0
+
+    async def main():
+        server = await asyncio.start_unix_server(handle, path=str(tmp_path / "lircd"))
+        async with server, AsyncClient(address=str(tmp_path / "lircd")) as client:
+            with pytest.raises(LircdSocketError):
+                await client.version()  # SUT
+            assert await client.version() == []  # SUT
+
+    asyncio.run(main())
+
+
+def test_that_a_reply_trickling_in_times_out_as_a_whole(tmp_path):
+    """
+    lirc.AsyncClient._send_command
+
+    Ensure the timeout covers the whole reply rather than each
+    line, so a reply sent a line at a time still times out.
+    """
+
+    async def handle(reader, writer):
+        await reader.readline()
+        for line in success(b"VERSION").splitlines(keepends=True):
+            writer.write(line)
+            await writer.drain()
+            await asyncio.sleep(0.03)
+        writer.close()
+
+    async def main():
+        server = await asyncio.start_unix_server(handle, path=str(tmp_path / "lircd"))
+        async with server, AsyncClient(str(tmp_path / "lircd"), timeout=0.05) as client:
+            await client.version()  # SUT
+
+    with pytest.raises(LircdTimeoutError) as error:
+        asyncio.run(main())
+
+    assert "`VERSION` command sent to lircd timed out" in str(error)
+
+
+def test_that_connection_error_is_raised_on_invalid_address(tmp_path):
+    """
+    lirc.AsyncClient.connect
+
+    Ensure that an address without lircd raises a LircdConnectionError.
+    """
+
+    async def main():
+        await AsyncClient(address=str(tmp_path / "missing")).connect()  # SUT
+
+    with pytest.raises(LircdConnectionError) as error:
+        asyncio.run(main())
+
+    assert "Could not connect to lircd" in str(error)
@@ -0,0 +1,42 @@
+import json
+
+from benchmarks import run
+
+
+def test_that_a_quick_run_writes_every_benchmark(tmp_path, capsys):
+    """
+    benchmarks.run.main
+
+    Ensure the benchmarks run and write their results to a file
+    that a later run can be compared against.
+    """
+    output = tmp_path / "results.json"
+
+    run.main(["--quick", "--output", str(output)])  # SUT
+    run.main(["--quick", "--output", str(output), "--compare", str(output)])  # SUT
+
+    results = json.loads(output.read_text())
+    assert set(results["benchmarks"]) == {
+        "send_once",
+        "large_list",
+        "readline",
+        "events",
+        "allocations",
+        "concurrency",
+    }
+    assert results["benchmarks"]["send_once"]["tcp"]["ops_per_sec"] > 0
+    assert "send_once.tcp.ops_per_sec: " in capsys.readouterr().out
+
+
+def test_that_percentiles_pick_the_nearest_sample():
+    """
+    benchmarks.run.percentile
+
+    Ensure the percentile is one of the samples.
+    """
+    samples = [5.0, 1.0, 3.0, 2.0, 4.0]
+    ordered = sorted(samples)
+
+    assert run.percentile(samples, 0.5) == ordered[2]  # SUT
+    assert run.percentile(samples, 0.99) == ordered[-1]  # SUT
+    assert run.percentile(samples, 0.0) == ordered[0]  # SUT
@@ -0,0 +1,110 @@
+import pytest
+
+from lirc.button_event_parser import ButtonEvent, ButtonEventParser
+from lirc.exceptions import LircdInvalidButtonEventError, LircdInvalidReplyPacketError
+
+
+@pytest.mark.parametrize(
+    "line, expected_event",
+    [
+        (
+            "0000000000f40bf0 00 KEY_UP ANIMAX",
+            ButtonEvent(0xF40BF0, 0, "KEY_UP", "ANIMAX"),
+        ),
+        (
+            "000000000000000a 1f KEY_VOLUMEUP tv\n",
+            ButtonEvent(10, 31, "KEY_VOLUMEUP", "tv"),
+        ),
+    ],
+)
+def test_parse_button_event_line(line, expected_event):
+    """
+    lirc.button_event_parser.ButtonEventParser.parse
+
+    Ensure a button event line broadcast by lircd is parsed
+    into its code, repeat count, key and remote.
+    """
+    event = ButtonEventParser.parse(line)  # SUT
+
+    assert event == expected_event
+
+
+@pytest.mark.parametrize(
+    "line", ["BEGIN", "0000000000f40bf0 00 KEY_UP", "not-hex 00 KEY_UP ANIMAX"]
+)
+def test_parse_raises_error_on_invalid_line(line):
+    """
+    lirc.button_event_parser.ButtonEventParser.parse
+
+    Ensure lines that are not button events raise an error.
+    """
+    with pytest.raises(LircdInvalidButtonEventError):
+        ButtonEventParser.parse(line)  # SUT
+
+
+def test_feed_bytes_parses_complete_events_and_skips_packets():
+    """
+    lirc.button_event_parser.ButtonEventParser.feed_bytes
+
+    Ensure every complete event in the buffer is returned, SIGHUP
+    packets are skipped and a partial line at the end is left alone.
+    """
+    complete = (
+        b"0000000000f40bf0 00 KEY_VOLUMEUP tv\n"
+        b"BEGIN\nSIGHUP\nEND\n"
+        b"0000000000f40bf0 01 KEY_VOLUMEUP tv\n"
+    )
+
+    events, consumed = ButtonEventParser.feed_bytes(
+        complete + b"0000000000f40bf0 02 KEY_VOL"
+    )  # SUT
+
+    assert consumed == len(complete)
+    assert [event.repeat for event in events] == [0, 1]
+    assert all(event.key == "KEY_VOLUMEUP" for event in events)
+
+
+def test_feed_bytes_leaves_partial_packets_alone():
+    """
+    lirc.button_event_parser.ButtonEventParser.feed_bytes
+
+    Ensure a packet that has not been fully received yet is not consumed.
+    """
+    events, consumed = ButtonEventParser.feed_bytes(b"BEGIN\nSIGHUP\n")  # SUT
+
+    assert events == []
+    assert consumed == 0
+
+
+def test_feed_bytes_raises_error_on_invalid_line():
+    """
+    lirc.button_event_parser.ButtonEventParser.feed_bytes
+
+    Ensure a line that is neither an event nor part of a packet
+    raises an error.
+    """
+    with pytest.raises(LircdInvalidButtonEventError):
+        ButtonEventParser.feed_bytes(b"garbage\n")  # SUT
+
+
+@pytest.mark.parametrize(
+    "invalid, error",
+    [
+        (b"garbage\n", LircdInvalidButtonEventError),
+        (b"BEGIN\nVERSION\nNOPE\nEND\n", LircdInvalidReplyPacketError),
+    ],
+)
+def test_feed_bytes_keeps_the_events_before_an_invalid_line(invalid, error):
+    """
+    lirc.button_event_parser.ButtonEventParser.feed_bytes
+
+    Ensure the events parsed before an invalid line or packet, and
+    the bytes they took up, are on the error raised for it.
+    """
+    valid = b"0000000000f40bf0 00 KEY_UP tv\nBEGIN\nSIGHUP\nEND\n"
+
+    with pytest.raises(error) as raised:
+        ButtonEventParser.feed_bytes(valid + invalid)  # SUT
+
+    assert raised.value.events == [ButtonEvent(0xF40BF0, 0, "KEY_UP", "tv")]
+    assert raised.value.consumed == len(valid)
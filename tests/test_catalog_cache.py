@@ -0,0 +1,179 @@
+import socket
+
+import pytest
+
+from lirc import Client, LircdConnection
+from lirc.catalog_cache import CatalogCache
+from lirc.exceptions import LircdCommandFailureError
+from lirc.reply_packet_parser import ReplyPacket
+
+REMOTES = ["tv", "receiver"]
+KEYS = ["0000000000000001 KEY_POWER", "0000000000000002 KEY_MUTE"]
+LOOKUPS = 3
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def cache(sent):
+    def send_command(command):
+        sent.append(command)
+        if command == "LIST":
+            return list(REMOTES)
+        if command in {f"LIST {remote}" for remote in REMOTES}:
+            return list(KEYS)
+        raise LircdCommandFailureError(f"{command} failed")
+
+    return CatalogCache(send_command)
+
+
+def test_that_lookups_are_served_from_memory(cache, sent):
+    """
+    lirc.catalog_cache.CatalogCache.remotes
+    lirc.catalog_cache.CatalogCache.remote_keys
+
+    Ensure only the first lookup of each kind goes to lircd
+    and the counters keep track of it.
+    """
+    for _ in range(LOOKUPS):
+        assert cache.remotes() == REMOTES  # SUT
+        assert cache.remote_keys("tv") == KEYS  # SUT
+
+    assert sent == ["LIST", "LIST tv"]
+    assert cache.misses == len(sent)
+    assert cache.hits == len(sent) * (LOOKUPS - 1)
+
+
+def test_that_returned_lists_do_not_change_the_cache(cache):
+    """
+    lirc.catalog_cache.CatalogCache.remotes
+
+    Ensure changing a returned list does not change the cache.
+    """
+    cache.remotes().append("other")
+
+    remotes = cache.remotes()  # SUT
+
+    assert remotes == REMOTES
+
+
+def test_that_key_tables_are_parsed_once(cache, sent):
+    """
+    lirc.catalog_cache.CatalogCache.key_table
+
+    Ensure a remote's key table is parsed once, from the keys
+    already in the cache if there are any, and dropped with them.
+    """
+    cache.remote_keys("tv")
+
+    tv = cache.key_table("tv")  # SUT
+    receiver = cache.key_table("receiver")  # SUT
+
+    assert cache.key_table("tv") is tv
+    assert cache.key_table("receiver") is receiver
+    assert tv.code_of("KEY_MUTE") == int(KEYS[1].split()[0], 16)
+    assert sent == ["LIST tv", "LIST receiver"]
+    # The tv keys already cached, and then both tables again.
+    served_from_memory = 3
+    assert cache.hits == served_from_memory
+
+    cache.invalidate()
+    assert cache.key_table("tv") is not tv
+    assert sent == ["LIST tv", "LIST receiver", "LIST tv"]
+
+
+def test_that_failed_lookups_are_not_cached(cache, sent):
+    """
+    lirc.catalog_cache.CatalogCache.remote_keys
+
+    Ensure a remote lircd does not know about is asked
+    about again on the next lookup.
+    """
+    for _ in range(2):
+        with pytest.raises(LircdCommandFailureError):
+            cache.remote_keys("unknown")  # SUT
+
+    assert sent == ["LIST unknown", "LIST unknown"]
+
+
+def test_that_sighup_drops_the_cache(cache, sent):
+    """
+    lirc.catalog_cache.CatalogCache.on_broadcast
+
+    Ensure a SIGHUP packet drops the cache while other broadcasts don't.
+    """
+    cache.remotes()
+    cache.on_broadcast(ReplyPacket("VERSION", True))
+
+    cache.on_broadcast(ReplyPacket("SIGHUP", False))  # SUT
+
+    cache.remotes()
+    assert sent == ["LIST", "LIST"]
+    assert cache.invalidations == 1
+
+
+def test_that_a_reply_read_across_a_sighup_is_not_kept():
+    """
+    lirc.catalog_cache.CatalogCache.remotes
+
+    Ensure a reply that was being read when the cache was dropped
+    is returned but not kept, since it may be from before the SIGHUP.
+    """
+    sent = []
+
+    def send_command(command):
+        sent.append(command)
+        if len(sent) == 1:
+            cache.on_broadcast(ReplyPacket("SIGHUP", False))
+        return list(REMOTES)
+
+    cache = CatalogCache(send_command)
+
+    assert cache.remotes() == REMOTES  # SUT
+    assert cache.remotes() == REMOTES  # SUT
+
+    assert sent == ["LIST", "LIST"]
+
+
+def test_that_refresh_loads_the_whole_catalog(cache, sent):
+    """
+    lirc.catalog_cache.CatalogCache.refresh
+
+    Ensure refresh loads every remote and its keys up front.
+    """
+    cache.refresh()  # SUT
+
+    assert sent == ["LIST", "LIST tv", "LIST receiver"]
+    cache.remote_keys("receiver")
+    assert cache.misses == 0
+
+
+def test_that_client_drops_cache_on_sighup_received_while_idle():
+    """
+    lirc.Client.list_remotes
+
+    Ensure a SIGHUP lircd sent while the client was idle is picked
+    up before serving remotes from the cache.
+    """
+    ours, theirs = socket.socketpair()
+    connection = LircdConnection(socket=ours)
+    connection.connect = lambda: None
+    client = Client(connection, catalog_cache=True)
+    reply = b"BEGIN\nLIST\nSUCCESS\nDATA\n2\ntv\nreceiver\nEND\n"
+
+    theirs.sendall(reply)
+    assert client.list_remotes() == REMOTES
+    assert client.list_remotes() == REMOTES
+
+    theirs.sendall(b"BEGIN\nSIGHUP\nEND\n" + reply)
+    client.list_remotes()  # SUT
+
+    sent = theirs.recv(100)
+    assert sent == b"LIST\nLIST\n"
+    assert client.catalog_cache.misses == sent.count(b"LIST\n")
+    assert client.catalog_cache.hits == 1
+    client.close()
+    theirs.close()
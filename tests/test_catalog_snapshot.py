@@ -0,0 +1,222 @@
+import time
+from unittest import mock
+
+import pytest
+
+from lirc import Client
+from lirc.catalog_snapshot import CatalogSnapshot, PersistentCatalog
+from lirc.exceptions import LircdInvalidReplyPacketError
+from lirc.key_table import KeyTable
+from lirc.testing import FakeLircd
+
+REMOTES = {"tv": ["KEY_POWER", "KEY_MUTE"], "receiver": ["KEY_POWER"]}
+
+
+@pytest.fixture
+def lircd():
+    with FakeLircd(REMOTES) as lircd:
+        yield lircd
+
+
+@pytest.fixture
+def snapshot():
+    return CatalogSnapshot(
+        "0.10.1",
+        [
+            KeyTable("tv", ["KEY_POWER", "KEY_MUTE"], [1, 2**64 - 1]),
+            KeyTable("receiver", ["KEY_POWER"], [0x10EF]),
+            KeyTable("empty", [], []),
+        ],
+    )
+
+
+def wait_for(condition, timeout=5.0):
+    """Wait for a condition to become true on another thread."""
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out waiting for the condition"
+        time.sleep(0.01)
+
+
+def test_that_a_snapshot_is_fetched_in_two_round_trips(lircd):
+    """
+    lirc.catalog_snapshot.CatalogSnapshot.fetch
+
+    Ensure the version, the remotes and all of their keys are
+    fetched with one pipeline for the remotes and one for the keys.
+    """
+    client = lircd.client()
+
+    snapshot = CatalogSnapshot.fetch(client)  # SUT
+
+    assert snapshot.version == "0.10.1"
+    assert snapshot.remotes == ["tv", "receiver"]
+    assert snapshot.key_table("tv") == KeyTable("tv", REMOTES["tv"], [1, 2])
+    assert lircd.commands == ["VERSION", "LIST", "LIST tv", "LIST receiver"]
+    client.close()
+
+
+def test_that_a_version_of_many_lines_raises():
+    """
+    lirc.catalog_snapshot.CatalogSnapshot.fetch
+    lirc.catalog_snapshot.CatalogSnapshot.__init__
+
+    Ensure a version that is not a single line is rejected rather
+    than being mixed into the names saved after it.
+    """
+    client = mock.MagicMock(spec=Client)
+    pipe = client.pipeline.return_value.__enter__.return_value
+    pipe.execute.return_value = [["0.10.1", "tv"], "tv"]
+
+    with pytest.raises(LircdInvalidReplyPacketError, match="2 lines"):
+        CatalogSnapshot.fetch(client)  # SUT
+    with pytest.raises(ValueError):
+        CatalogSnapshot("0.10.1\ntv", [])  # SUT
+
+
+def test_that_a_saved_snapshot_loads_back_the_same(snapshot, tmp_path):
+    """
+    lirc.catalog_snapshot.CatalogSnapshot.save
+    lirc.catalog_snapshot.CatalogSnapshot.load
+
+    Ensure a snapshot survives being saved and loaded, and that key
+    names used by more than one remote are only stored once.
+    """
+    path = tmp_path / "catalog.bin"
+
+    snapshot.save(path)  # SUT
+    loaded = CatalogSnapshot.load(path)  # SUT
+
+    assert loaded == snapshot
+    assert loaded.remotes == ["tv", "receiver", "empty"]
+    assert path.read_bytes().count(b"KEY_POWER") == 1
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        lambda data: b"NOTACATALOG" + data,
+        lambda data: data[:-1],
+        lambda data: data[:20] + bytes([data[20] ^ 1]) + data[21:],
+    ],
+)
+def test_that_a_corrupt_snapshot_raises(snapshot, tmp_path, corrupt):
+    """
+    lirc.catalog_snapshot.CatalogSnapshot.load
+
+    Ensure a file that is not a snapshot, or was cut short or
+    changed, raises a ValueError.
+    """
+    path = tmp_path / "catalog.bin"
+    snapshot.save(path)
+    path.write_bytes(corrupt(path.read_bytes()))
+
+    with pytest.raises(ValueError):
+        CatalogSnapshot.load(path)  # SUT
+
+
+def test_that_a_saved_catalog_is_ready_at_once(lircd, snapshot, tmp_path):
+    """
+    lirc.catalog_snapshot.PersistentCatalog.__init__
+
+    Ensure the saved snapshot is served straight away, and then
+    replaced by the catalog fetched from lircd in the background.
+    """
+    path = tmp_path / "catalog.bin"
+    snapshot.save(path)
+    changes = []
+
+    with PersistentCatalog(
+        lircd.client(), path, on_change=changes.append
+    ) as catalog:  # SUT
+        assert changes[0] == snapshot
+        assert catalog.wait_ready(0)
+
+        wait_for(lambda: len(changes) > 1)
+        assert catalog.snapshot.remotes == ["tv", "receiver"]
+        wait_for(lambda: CatalogSnapshot.load(path) == catalog.snapshot)
+        assert catalog.error is None
+
+
+def test_that_an_unchanged_catalog_is_not_saved_again(lircd, tmp_path):
+    """
+    lirc.catalog_snapshot.PersistentCatalog.__init__
+
+    Ensure a snapshot that lircd still agrees with is not
+    written to disk again.
+    """
+    path = tmp_path / "catalog.bin"
+    client = lircd.client()
+    CatalogSnapshot.fetch(client).save(path)
+    client.close()
+    saved = path.stat().st_mtime_ns
+
+    # Once for the saved snapshot, and once more in the background.
+    fetches = 2
+
+    with PersistentCatalog(lircd.client(), path) as catalog:  # SUT
+        wait_for(lambda: lircd.commands.count("VERSION") == fetches)
+        wait_for(lambda: lircd.commands.count("LIST receiver") == fetches)
+        time.sleep(0.05)
+
+        assert catalog.snapshot == CatalogSnapshot.load(path)
+    assert path.stat().st_mtime_ns == saved
+
+
+def test_that_a_sighup_fetches_the_catalog_again(lircd, tmp_path):
+    """
+    lirc.catalog_snapshot.PersistentCatalog
+
+    Ensure the catalog is fetched and saved again once lircd
+    broadcasts that it re-read its config.
+    """
+    path = tmp_path / "catalog.bin"
+
+    with PersistentCatalog(lircd.client(), path, poll_interval=0.01) as catalog:
+        assert catalog.wait_ready(5)
+        assert catalog.error is None
+
+        lircd.sighup({"projector": ["KEY_POWER"]})  # SUT
+
+        wait_for(lambda: catalog.snapshot.remotes == ["projector"])
+        wait_for(lambda: CatalogSnapshot.load(path).remotes == ["projector"])
+
+
+def test_that_a_catalog_without_lircd_serves_the_saved_snapshot(
+    snapshot, tmp_path
+):
+    """
+    lirc.catalog_snapshot.PersistentCatalog
+
+    Ensure the saved snapshot is kept while fetching from lircd
+    fails, and the failure is kept on the catalog.
+    """
+    path = tmp_path / "catalog.bin"
+    snapshot.save(path)
+
+    with FakeLircd(REMOTES) as lircd:
+        client = lircd.client()
+    with PersistentCatalog(client, path, poll_interval=0.01) as catalog:  # SUT
+        wait_for(lambda: catalog.error is not None)
+
+        assert catalog.snapshot == snapshot
+
+
+def test_that_a_client_cache_is_seeded_from_a_snapshot(lircd, snapshot):
+    """
+    lirc.catalog_cache.CatalogCache.seed
+
+    Ensure a client with a seeded cache serves the remotes and
+    keys of the snapshot without asking lircd.
+    """
+    client = lircd.client(catalog_cache=True)
+
+    client.catalog_cache.seed(snapshot)  # SUT
+
+    assert client.list_remotes() == ["tv", "receiver", "empty"]
+    assert client.list_remote_keys("receiver") == "00000000000010ef KEY_POWER"
+    assert client.list_remote_keys("empty") == []
+    assert client.key_table("tv") is snapshot.key_table("tv")
+    assert lircd.commands == []
+    client.close()
@@ -0,0 +1,205 @@
+import io
+import json
+import os
+
+import pytest
+
+from lirc.cli import (
+    main,
+    open_input,
+    parse_batch_command,
+    read_batches,
+    run_batch,
+)
+from lirc.commands import transmitter_mask
+from lirc.testing import FakeLircd
+
+
+@pytest.fixture
+def lircd():
+    with FakeLircd({"tv": ["KEY_POWER", "KEY_UP"]}) as server:
+        yield server
+
+
+@pytest.fixture
+def address(lircd):
+    host, port = lircd.address
+    return f"{host}:{port}"
+
+
+def pipe_with(data: bytes):
+    """Create the read end of a pipe that has data written to it
+    and is then closed.
+    """
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, data)
+    os.close(write_fd)
+    return open(read_fd, "rb")
+
+
+@pytest.mark.parametrize(
+    "line,expected",
+    [
+        ("send_once tv KEY_UP", ("send_once", ["tv", "KEY_UP"])),
+        ("SEND-ONCE tv KEY_UP 2", ("send_once", ["tv", "KEY_UP", "2"])),
+        ("send_stop", ("send_stop", [])),
+        ("list tv", ("list", ["tv"])),
+        ("set_transmitters 1 3", ("set_transmitters", ["1", "3"])),
+    ],
+)
+def test_that_batch_commands_are_parsed(line, expected):
+    """
+    lirc.cli.parse_batch_command
+
+    Ensure commands and their arguments are read from a line.
+    """
+    assert parse_batch_command(line) == expected  # SUT
+
+
+@pytest.mark.parametrize(
+    "line", ["irsend tv KEY_UP", "send_once tv", "send_stop tv", "version 1"]
+)
+def test_that_invalid_batch_commands_are_errors(line):
+    """
+    lirc.cli.parse_batch_command
+
+    Ensure unknown commands and wrong numbers of arguments are errors.
+    """
+    with pytest.raises(ValueError):
+        parse_batch_command(line)  # SUT
+
+
+def test_that_batches_are_pipelined_and_reported_as_json(lircd):
+    """
+    lirc.cli.run_batch
+
+    Ensure each line's result is printed as JSON in order, with
+    invalid lines and failed commands reported without stopping
+    the rest of the batch.
+    """
+    client = lircd.client()
+    output = io.StringIO()
+    stream = pipe_with(
+        b"send_once tv KEY_POWER\n"
+        b"# a comment\n"
+        b"\n"
+        b"send_once tv KEY_RED\n"
+        b"fly tv\n"
+        b"set_transmitters 1 2\n"
+        b"list"
+    )
+
+    status = run_batch(client, stream, output)  # SUT
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert status == 1
+    assert results[0] == {
+        "line": 1,
+        "command": "send_once tv KEY_POWER",
+        "ok": True,
+        "data": [],
+    }
+    assert [result["line"] for result in results] == [1, 4, 5, 6, 7]
+    assert not results[1]["ok"]
+    assert "unknown command" in results[1]["error"]
+    assert results[2] == {
+        "line": 5,
+        "command": "fly tv",
+        "ok": False,
+        "error": "unknown command `fly`",
+    }
+    assert results[3]["ok"]
+    assert results[4]["data"] == ["tv"]
+    assert lircd.transmitter_mask == transmitter_mask([1, 2])
+    assert lircd.commands == [
+        "SEND_ONCE tv KEY_POWER 0",
+        "SEND_ONCE tv KEY_RED 0",
+        "SET_TRANSMITTERS 3",
+        "LIST",
+    ]
+    client.close()
+
+
+def test_that_single_commands_print_their_data(address, capsys):
+    """
+    lirc.cli.main
+
+    Ensure single commands print lircd's data and exit with 0.
+    """
+    assert main(["--address", address, "list", "tv"]) == 0  # SUT
+    assert main(["--address", address, "send-once", "tv", "KEY_UP"]) == 0  # SUT
+
+    assert capsys.readouterr().out == (
+        "0000000000000001 KEY_POWER\n0000000000000002 KEY_UP\n"
+    )
+
+
+def test_that_failures_exit_with_1(address, capsys):
+    """
+    lirc.cli.main
+
+    Ensure failed commands and unreachable daemons are reported.
+    """
+    assert main(["--address", address, "send-stop", "tv", "KEY_UP"]) == 1  # SUT
+    assert main(["--address", "/nonexistent/lircd", "version"]) == 1  # SUT
+
+    errors = capsys.readouterr().err.splitlines()
+    assert "not repeating" in errors[0]
+    assert errors[1].startswith("lirc: Could not connect to lircd")
+
+
+def test_that_a_followed_fifo_is_read_from_every_writer(tmp_path):
+    """
+    lirc.cli.open_input
+
+    Ensure a followed FIFO keeps being read after each writer
+    closes it.
+    """
+    fifo = tmp_path / "commands"
+    os.mkfifo(fifo)
+
+    with open_input(str(fifo), follow=True) as stream:  # SUT
+        batches = read_batches(stream)
+        for key in ("KEY_POWER", "KEY_UP"):
+            with open(fifo, "wb") as writer:
+                writer.write(f"send_once tv {key}\n".encode())
+
+            assert next(batches) == [f"send_once tv {key}".encode()]
+
+
+def test_that_batch_mode_reads_stdin(address, lircd, monkeypatch, capsys):
+    """
+    lirc.cli.main
+
+    Ensure batch mode runs the commands from stdin by default.
+    """
+    stdin = pipe_with(b"send_once tv KEY_UP\nversion\n")
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(stdin))
+
+    assert main(["--address", address, "batch"]) == 0  # SUT
+
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [result["data"] for result in results] == [[], ["0.10.1"]]
+    assert not stdin.closed
+
+
+def test_that_lines_that_are_not_utf_8_only_fail_themselves(lircd):
+    """
+    lirc.cli.run_batch
+
+    Ensure a line that can't be decoded is reported as an error
+    while the lines around it are still run.
+    """
+    client = lircd.client()
+    output = io.StringIO()
+    stream = pipe_with(b"send_once tv KEY_UP\nsend_once tv KEY_\xff\nversion\n")
+
+    status = run_batch(client, stream, output)  # SUT
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert status == 1
+    assert [result["ok"] for result in results] == [True, False, True]
+    assert [result["line"] for result in results] == [1, 2, 3]
+    assert "can't decode byte 0xff" in results[1]["error"]
+    assert lircd.commands == ["SEND_ONCE tv KEY_UP 0", "VERSION"]
+    client.close()
@@ -1,9 +1,17 @@
+import socket
+import time
 from unittest import mock
 
 import pytest
 
 from lirc import Client, LircdConnection
-from lirc.exceptions import LircdCommandFailureError
+from lirc.button_event_parser import ButtonEvent
+from lirc.exceptions import (
+    LircdCommandFailureError,
+    LircdInvalidReplyPacketError,
+    LircdTimeoutError,
+)
+from lirc.testing import FakeLircd, Fault
 
 
 def test_that_custom_connections_can_be_used(mock_socket):
@@ -99,7 +107,7 @@ def test_that_close_closes_the_socket(mock_client_and_connection):
     ],
 )
 def test_that_client_commands_send_the_correct_command(
-    mock_client_and_connection, client_command, args, lircd_command
+    mock_client_and_connection, client_command, args, lircd_command, socket_payload
 ):
     """
     lirc.Client.send_once
@@ -124,7 +132,7 @@ def test_that_client_commands_send_the_correct_command(
         lircd_command: The expected corresponding command sent to lircd.
     """
     client, connection = mock_client_and_connection
-    connection._socket.recv.return_value = b"BEGIN\nCOMMAND\nSUCCESS\nEND\n"
+    socket_payload(b"BEGIN\nCOMMAND\nSUCCESS\nEND\n")
 
     getattr(client, client_command)(**args)  # SUT
 
@@ -133,7 +141,9 @@ def test_that_client_commands_send_the_correct_command(
     )
 
 
-def test_unsuccessful_command_raises_custom_exception(mock_client_and_connection):
+def test_unsuccessful_command_raises_custom_exception(
+    mock_client_and_connection, socket_payload
+):
     """
     lirc.client.__send_command (which all lircd wrapper functions use)
 
@@ -141,7 +151,7 @@ def test_unsuccessful_command_raises_custom_exception(mock_client_and_connection
     LircdCommandFailureError.
     """
     client, connection = mock_client_and_connection
-    connection._socket.recv.return_value = b"BEGIN\nCOMMAND\nERROR\nEND\n"
+    socket_payload(b"BEGIN\nCOMMAND\nERROR\nEND\n")
 
     with pytest.raises(LircdCommandFailureError) as error:
         client.send_once("remote", "key")
@@ -149,7 +159,9 @@ def test_unsuccessful_command_raises_custom_exception(mock_client_and_connection
     assert "command sent to lircd failed: []" in str(error)
 
 
-def test_last_send_start_remote_and_key_is_used(mock_client_and_connection):
+def test_last_send_start_remote_and_key_is_used(
+    mock_client_and_connection, socket_payload
+):
     """
     lirc.client.send_start
     lirc.client.send_stop
@@ -159,9 +171,337 @@ def test_last_send_start_remote_and_key_is_used(mock_client_and_connection):
     had passed in as args if no args are provided to send_stop.
     """
     client, connection = mock_client_and_connection
-    connection._socket.recv.return_value = b"BEGIN\nCOMMAND\nSUCCESS\nEND\n"
+    socket_payload(b"BEGIN\nCOMMAND\nSUCCESS\nEND\n")
     client.send_start("remote", "key")
 
     client.send_stop()  # SUT
 
     connection._socket.sendall.assert_called_with(b"SEND_STOP remote key\n")
+
+
+def test_events_yields_button_events(mock_client, socket_payload):
+    """
+    lirc.client.events
+
+    Ensure that button events broadcast by lircd are yielded,
+    skipping over SIGHUP packets and socket timeouts.
+    """
+    socket_payload(
+        b"0000000000f40bf0 00 KEY_VOLUMEUP tv\nBEGIN\nSIGHUP\n",
+        socket.timeout,
+        b"END\n0000000000f40bf0 01 KEY_VOLUMEUP tv\n",
+    )
+    events = mock_client.events()
+
+    received = [next(events), next(events)]  # SUT
+
+    assert received == [
+        ButtonEvent(0xF40BF0, 0, "KEY_VOLUMEUP", "tv"),
+        ButtonEvent(0xF40BF0, 1, "KEY_VOLUMEUP", "tv"),
+    ]
+
+
+def test_that_stray_lines_while_reading_events_are_dropped(
+    mock_client, socket_payload
+):
+    """
+    lirc.client.events
+
+    Ensure lines that are not button events, read while no command
+    waits on a reply, are dropped rather than kept for the next reply.
+    """
+    socket_payload(
+        *[b"garbage line here\n" * 100] * 10,
+        b"0000000000f40bf0 00 KEY_VOLUMEUP tv\n",
+        b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\nEND\n",
+    )
+
+    event = next(mock_client.events())  # SUT
+
+    assert event == ButtonEvent(0xF40BF0, 0, "KEY_VOLUMEUP", "tv")
+    assert mock_client._demux.pending_replies == 0
+    assert mock_client.version() == "0.10.1"
+
+
+def test_command_reply_is_read_past_broadcasts(mock_client, socket_payload):
+    """
+    lirc.client._send_command
+
+    Ensure a button event or SIGHUP packet arriving before the
+    reply to a command does not make the command fail, and that
+    subscribers are passed the broadcasts.
+    """
+    received = []
+    mock_client.subscribe(received.append)
+    socket_payload(
+        b"0000000000f40bf0 00 KEY_VOLUMEUP tv\n"
+        b"BEGIN\nSIGHUP\nEND\n"
+        b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\nEND\n"
+    )
+
+    version = mock_client.version()  # SUT
+
+    assert version == "0.10.1"
+    assert received[0] == ButtonEvent(0xF40BF0, 0, "KEY_VOLUMEUP", "tv")
+    assert received[1].is_sighup
+
+
+def test_that_a_reply_trickling_in_times_out_as_a_whole():
+    """
+    lirc.Client._send_command
+
+    Ensure the command timeout covers the whole reply, so a reply
+    whose every read is quick but which takes too long in total
+    times out with the command and where in the reply it got to.
+    """
+    with FakeLircd(chunk_size=4, chunk_delay=0.03) as lircd:
+        command_timeout = 0.1
+        client = lircd.client(command_timeout=command_timeout)
+        start = time.monotonic()
+
+        with pytest.raises(LircdTimeoutError) as error:
+            client.version()  # SUT
+
+        assert time.monotonic() - start < command_timeout * 2
+        assert isinstance(error.value, TimeoutError)
+        assert "`VERSION` command" in str(error.value)
+        assert "state of its reply" in str(error.value)
+        client.close()
+
+
+def test_that_the_connection_timeout_is_the_default_budget(mock_client):
+    """
+    lirc.Client._send_command
+
+    Ensure commands get the timeout of the connection as the
+    budget for their whole reply without a command timeout.
+    """
+    with mock.patch.object(
+        mock_client._connection, "readline", side_effect=TimeoutError("timed out")
+    ) as readline:
+        with pytest.raises(LircdTimeoutError):
+            mock_client.send_once("tv", "KEY_POWER")  # SUT
+
+    (deadline,) = readline.call_args.args
+    assert deadline - time.monotonic() == pytest.approx(5.0, abs=0.1)
+
+
+def test_that_deadline_blocks_share_one_budget():
+    """
+    lirc.Client.deadline
+
+    Ensure the commands in a deadline block can't run past it
+    in total, even though each one is within its own timeout.
+    """
+    with FakeLircd(latency=0.04) as lircd:
+        client = lircd.client()
+
+        attempts = 5
+        with pytest.raises(LircdTimeoutError):
+            with client.deadline(0.1):  # SUT
+                for _ in range(attempts):
+                    client.version()
+
+        assert len(lircd.commands) < attempts
+        assert client._local.deadline is None
+        client.close()
+
+
+def test_that_nested_deadlines_cannot_extend_the_outer_one(mock_client):
+    """
+    lirc.Client.deadline
+
+    Ensure a deadline inside another one uses whichever of
+    the two is earlier, and the outer one is restored after.
+    """
+    with mock_client.deadline(1):
+        outer = mock_client._command_deadline(mock_client._connection)
+
+        with mock_client.deadline(60):  # SUT
+            assert mock_client._command_deadline(mock_client._connection) == outer
+
+        with mock_client.deadline(0.5):  # SUT
+            assert mock_client._command_deadline(mock_client._connection) < outer
+
+        assert mock_client._command_deadline(mock_client._connection) == outer
+
+
+def test_that_the_reply_after_a_timeout_is_thrown_away(mock_client, socket_payload):
+    """
+    lirc.Client._read_reply
+
+    Ensure the reply to a command that timed out before any of it
+    arrived is thrown away, even when the next command is the same.
+    """
+    socket_payload(
+        socket.timeout,
+        b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\nstale\nEND\n"
+        b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\nEND\n",
+    )
+    with pytest.raises(LircdTimeoutError):
+        mock_client.version()
+
+    version = mock_client.version()  # SUT
+
+    assert version == "0.10.1"
+    assert mock_client._demux.stale_replies == 1
+
+
+def test_that_leftovers_of_a_reply_cut_short_are_skipped(
+    mock_client, socket_payload
+):
+    """
+    lirc.Client._read_reply
+
+    Ensure the rest of a reply that timed out part way through is
+    skipped over up to the next reply.
+    """
+    socket_payload(
+        b"BEGIN\nVERSION\nSUCC",
+        socket.timeout,
+        b"ESS\nDATA\n1\n0.10.1\nEND\nBEGIN\nLIST\nSUCCESS\nDATA\n1\ntv\nEND\n",
+    )
+    with pytest.raises(LircdTimeoutError):
+        mock_client.version()
+
+    remotes = mock_client.list_remotes()  # SUT
+
+    assert remotes == "tv"
+    assert not mock_client._demux.resyncing
+
+
+def test_that_a_pipeline_cut_short_throws_away_the_rest(mock_client, socket_payload):
+    """
+    lirc.Client._execute_pipeline
+
+    Ensure the replies to the commands of a pipeline that were
+    still to come when it timed out are thrown away.
+    """
+    socket_payload(
+        b"BEGIN\nSEND_ONCE tv KEY_3 0\nSUCCESS\nEND\n",
+        socket.timeout,
+        b"BEGIN\nSEND_ONCE tv KEY_7 0\nSUCCESS\nEND\n"
+        b"BEGIN\nVERSION\nSUCCESS\nEND\n"
+        b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\nEND\n",
+    )
+    with pytest.raises(LircdTimeoutError):
+        with mock_client.pipeline() as pipe:
+            pipe.send_once("tv", "KEY_3")
+            pipe.send_once("tv", "KEY_7")
+            pipe.version()
+            sent = len(pipe)
+            pipe.execute()
+
+    version = mock_client.version()  # SUT
+
+    assert version == "0.10.1"
+    # Only the reply to the first command was read before the timeout.
+    assert mock_client._demux.stale_replies == sent - 1
+
+
+def test_that_each_reply_of_a_pipeline_gets_its_own_budget():
+    """
+    lirc.Client._execute_pipeline
+
+    Ensure a pipeline that takes longer than the command timeout
+    in total still succeeds when every reply is in time, and that
+    a timeout reports how long the whole pipeline took.
+    """
+    with FakeLircd(latency=0.05) as lircd:
+        client = lircd.client(command_timeout=0.2)
+
+        with client.pipeline() as pipe:
+            for _ in range(8):
+                pipe.version()
+            results = pipe.execute()  # SUT
+
+        assert results == ["0.10.1"] * 8
+
+        lircd.latency = 0.3
+        with pytest.raises(LircdTimeoutError, match="read 0 of their replies"):
+            with client.pipeline() as pipe:
+                pipe.version()
+                pipe.version()
+                pipe.execute()  # SUT
+        client.close()
+
+
+def test_that_a_client_recovers_from_an_invalid_reply_and_a_slow_one():
+    """
+    lirc.Client._read_reply
+
+    Ensure a client keeps working over the same connection after
+    an invalid reply and after a reply that came too late.
+    """
+    with FakeLircd({"tv": ["KEY_POWER"]}) as lircd:
+        client = lircd.client(command_timeout=0.2)
+        lircd.inject(Fault.GARBAGE, "VERSION")
+        with pytest.raises(LircdInvalidReplyPacketError):
+            client.version()
+
+        lircd.latency = 0.3
+        with pytest.raises(LircdTimeoutError):
+            client.list_remote_keys("tv")
+        lircd.latency = 0
+
+        assert client.version() == "0.10.1"  # SUT
+        assert client.list_remotes() == "tv"  # SUT
+        assert lircd.clients == 1
+        client.close()
+
+
+def test_that_setting_the_same_transmitters_again_is_skipped():
+    """
+    lirc.Client.set_transmitters
+
+    Ensure SET_TRANSMITTERS is only sent when the mask changes
+    or when forced, and is sent again after it failed.
+    """
+    with FakeLircd() as lircd:
+        client = lircd.client()
+
+        client.set_transmitters([1, 3])  # SUT
+        client.set_transmitters(5)  # SUT
+        client.set_transmitters([3, 1])  # SUT
+        client.set_transmitters([2])  # SUT
+        client.set_transmitters([2], force=True)  # SUT
+
+        lircd.inject(Fault.ERROR, "SET_TRANSMITTERS")
+        with pytest.raises(LircdCommandFailureError):
+            client.set_transmitters([1])  # SUT
+        client.set_transmitters([1])  # SUT
+        client.set_transmitters([1])  # SUT
+
+        assert lircd.commands == [
+            "SET_TRANSMITTERS 5",
+            "SET_TRANSMITTERS 2",
+            "SET_TRANSMITTERS 2",
+            "SET_TRANSMITTERS 1",
+            "SET_TRANSMITTERS 1",
+        ]
+        client.close()
+
+
+def test_that_transmitters_set_in_a_pipeline_are_remembered():
+    """
+    lirc.Client.set_transmitters
+
+    Ensure the transmitters set by a pipeline are the ones the
+    client compares against afterwards.
+    """
+    with FakeLircd() as lircd:
+        client = lircd.client()
+        client.set_transmitters([1])
+        with client.pipeline() as pipe:
+            pipe.set_transmitters([2])
+            pipe.execute()
+
+        client.set_transmitters([1])  # SUT
+        client.set_transmitters([1])  # SUT
+
+        assert lircd.commands == [
+            "SET_TRANSMITTERS 1",
+            "SET_TRANSMITTERS 2",
+            "SET_TRANSMITTERS 1",
+        ]
+        client.close()
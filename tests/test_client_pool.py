@@ -0,0 +1,305 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from lirc import ClientPool, LircdConnection
+from lirc.button_event_parser import ButtonEvent
+from lirc.exceptions import (
+    LircdCommandFailureError,
+    LircdSocketError,
+    LircdTimeoutError,
+)
+from lirc.testing import FakeLircd
+
+VERSION_REPLY = b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\nEND\n"
+POOL_SIZE = 3
+
+
+def mock_socket_receiving(*chunks):
+    """Create a mock socket that receives each chunk on one
+    recv_into() call, and then the last chunk on every call after.
+    """
+    mock_socket = mock.MagicMock(spec=socket.socket)
+    remaining = list(chunks)
+
+    def recv_into(buffer, nbytes=0):
+        chunk = remaining.pop(0) if len(remaining) > 1 else remaining[0]
+        if isinstance(chunk, Exception):
+            raise chunk
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+    mock_socket.recv_into.side_effect = recv_into
+    return mock_socket
+
+
+def wait_for(condition, timeout=5.0):
+    """Wait for a condition to become true on another thread."""
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out waiting for the condition"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def sockets():
+    return []
+
+
+@pytest.fixture
+def make_pool(sockets):
+    def make_pool(*chunks, **kwargs):
+        def connection_factory():
+            sockets.append(mock_socket_receiving(*chunks))
+            connection = LircdConnection(socket=sockets[-1])
+            connection.is_alive = lambda: not sockets[-1].close.called
+            return connection
+
+        return ClientPool(connection_factory=connection_factory, **kwargs)
+
+    return make_pool
+
+
+def test_that_pool_reuses_connections(make_pool, sockets):
+    """
+    lirc.ClientPool._send_command
+
+    Ensure a connection is returned to the pool after a command
+    and reused by the next one instead of connecting again.
+    """
+    pool = make_pool(VERSION_REPLY)
+
+    versions = [pool.version() for _ in range(3)]  # SUT
+
+    assert versions == ["0.10.1"] * 3
+    assert len(sockets) == 1
+    assert pool.idle_connections == 1
+
+
+def test_that_connections_failing_mid_reply_are_discarded(make_pool, sockets):
+    """
+    lirc.ClientPool._send_command
+
+    Ensure a connection that failed part way through a reply is
+    closed instead of going back into the pool.
+    """
+    pool = make_pool(b"BEGIN\nVERSION\n", OSError("connection reset"))
+
+    with pytest.raises(LircdSocketError):
+        pool.version()  # SUT
+
+    sockets[0].close.assert_called()
+    assert pool.idle_connections == 0
+
+
+def test_that_failed_commands_keep_their_connection(make_pool, sockets):
+    """
+    lirc.ClientPool._send_command
+
+    Ensure a command that lircd replied to with an ERROR leaves
+    its connection in the pool, since the reply was read in full.
+    """
+    pool = make_pool(b"BEGIN\nSEND_ONCE tv KEY_3 0\nERROR\nEND\n")
+
+    with pytest.raises(LircdCommandFailureError):
+        pool.send_once("tv", "KEY_3")  # SUT
+
+    sockets[0].close.assert_not_called()
+    assert pool.idle_connections == 1
+
+
+def test_that_timed_out_connections_are_kept_and_resynced(make_pool, sockets):
+    """
+    lirc.ClientPool._send_command
+
+    Ensure a connection whose reply timed out goes back into the
+    pool, and the late reply is skipped by the next command.
+    """
+    pool = make_pool(socket.timeout(), VERSION_REPLY + VERSION_REPLY)
+    with pytest.raises(LircdTimeoutError):
+        pool.version()
+
+    version = pool.version()  # SUT
+
+    assert version == "0.10.1"
+    assert len(sockets) == 1
+    sockets[0].close.assert_not_called()
+
+
+def test_that_concurrent_threads_get_their_own_connection(make_pool, sockets):
+    """
+    lirc.ClientPool._checkout
+
+    Ensure threads using the pool at the same time are never
+    given the same connection, and no more than size are opened.
+    """
+    in_use = set()
+    overlaps = []
+    pool = make_pool(VERSION_REPLY, size=POOL_SIZE)
+    original_checkout = pool._checkout
+
+    def checkout():
+        demux = original_checkout()
+        overlaps.append(demux in in_use)
+        in_use.add(demux)
+        return demux
+
+    def checkin(demux, healthy):
+        in_use.discard(demux)
+        ClientPool._checkin(pool, demux, healthy)
+
+    pool._checkout, pool._checkin = checkout, checkin
+
+    threads = [
+        threading.Thread(target=lambda: [pool.version() for _ in range(20)])
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not any(overlaps)
+    assert len(sockets) <= POOL_SIZE
+
+
+def test_that_checkout_times_out_when_all_connections_are_in_use(make_pool):
+    """
+    lirc.ClientPool._checkout
+
+    Ensure a TimeoutError is raised if no connection is returned
+    within the checkout timeout.
+    """
+    pool = make_pool(VERSION_REPLY, size=1, checkout_timeout=0.01)
+    pool._checkout()
+
+    with pytest.raises(TimeoutError):
+        pool.version()  # SUT
+
+
+def test_that_pipelines_use_a_single_checked_out_connection(make_pool, sockets):
+    """
+    lirc.ClientPool._execute_pipeline
+
+    Ensure a pipeline sends all its commands on one connection.
+    """
+    pool = make_pool(VERSION_REPLY + VERSION_REPLY)
+
+    with pool.pipeline() as pipe:
+        pipe.version()
+        pipe.version()
+        results = pipe.execute()  # SUT
+
+    assert results == ["0.10.1", "0.10.1"]
+    sockets[0].sendall.assert_called_once_with(b"VERSION\nVERSION\n")
+
+
+def test_that_close_closes_idle_connections(make_pool, sockets):
+    """
+    lirc.ClientPool.close
+
+    Ensure closing the pool closes its idle connections and
+    that it cannot be used afterwards.
+    """
+    pool = make_pool(VERSION_REPLY)
+    pool.version()
+
+    pool.close()  # SUT
+
+    sockets[0].close.assert_called()
+    with pytest.raises(ValueError):
+        pool.version()
+
+
+def test_that_size_must_be_positive():
+    """
+    lirc.ClientPool.__init__
+
+    Ensure a pool without room for any connection cannot be made.
+    """
+    with pytest.raises(ValueError):
+        ClientPool(size=0)  # SUT
+
+
+def test_that_events_are_read_on_a_connection_of_their_own():
+    """
+    lirc.ClientPool.events
+
+    Ensure button presses are read on a connection outside the
+    pool, which is closed once the iteration stops.
+    """
+    with FakeLircd() as lircd, ClientPool(
+        connection_factory=lircd.connection
+    ) as pool, ThreadPoolExecutor(1) as executor:
+        events = pool.events()  # SUT
+        event = executor.submit(next, events)
+        wait_for(lambda: lircd.clients == 1)
+
+        lircd.press("tv", "KEY_POWER")
+
+        assert event.result(5) == ButtonEvent(0, 0, "KEY_POWER", "tv")
+        assert pool.idle_connections == 0
+        events.close()
+        wait_for(lambda: lircd.clients == 0)
+
+
+def test_that_broadcasts_are_read_off_idle_connections():
+    """
+    lirc.ClientPool._poll_broadcasts
+
+    Ensure the broadcasts that arrive on idle connections are
+    read off them and passed to subscribers, and that polling
+    does not make a connection when none are idle.
+    """
+    with FakeLircd() as lircd, ClientPool(
+        size=POOL_SIZE, connection_factory=lircd.connection
+    ) as pool:
+        received = []
+        pool.subscribe(received.append)
+
+        pool._poll_broadcasts()  # SUT
+
+        assert lircd.clients == 0
+        demuxes = [pool._checkout() for _ in range(POOL_SIZE)]
+        for demux in demuxes:
+            pool._checkin(demux, True)
+        wait_for(lambda: lircd.clients == POOL_SIZE)
+        lircd.press("tv", "KEY_POWER")
+        wait_for(lambda: all(demux.connection.has_data() for demux in demuxes))
+
+        pool._poll_broadcasts()  # SUT
+
+        assert len(received) == POOL_SIZE
+        assert not any(demux.connection.has_data() for demux in demuxes)
+        assert pool.idle_connections == POOL_SIZE
+
+
+def test_that_threads_agree_on_the_transmitters_set_last():
+    """
+    lirc.ClientPool.set_transmitters
+
+    Ensure threads setting transmitters at the same time leave
+    the pool remembering the transmitters lircd has.
+    """
+    with FakeLircd() as lircd, ClientPool(
+        connection_factory=lircd.connection
+    ) as pool:
+
+        def set_transmitters(offset):
+            for mask in range(1, 30):
+                pool.set_transmitters((mask + offset) % 7 + 1)  # SUT
+
+        threads = [
+            threading.Thread(target=set_transmitters, args=(offset,))
+            for offset in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert pool._transmitter_mask == lircd.transmitter_mask
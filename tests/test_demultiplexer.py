@@ -0,0 +1,223 @@
+import socket
+
+import pytest
+
+from lirc.button_event_parser import ButtonEvent
+from lirc.connection.demultiplexer import Demultiplexer
+from lirc.exceptions import LircdInvalidReplyPacketError
+from lirc.reply_packet_parser import ReplyPacketParser
+
+VOLUME_UP = ButtonEvent(0xF40BF0, 0, "KEY_VOLUMEUP", "tv")
+
+
+@pytest.fixture
+def demux(mock_connection):
+    return Demultiplexer(mock_connection)
+
+
+def test_that_broadcasts_are_taken_out_of_replies(demux, socket_payload):
+    """
+    lirc.connection.demultiplexer.Demultiplexer.read_reply
+
+    Ensure button events and SIGHUP packets that arrive before
+    a reply are queued up and only the reply lines are returned.
+    """
+    socket_payload(
+        b"0000000000f40bf0 00 KEY_VOLUMEUP tv\n"
+        b"BEGIN\nSIGHUP\nEND\n"
+        b"BEGIN\nLIST\nSUCCESS\nDATA\n1\ntv\nEND\n"
+    )
+
+    parser = demux.read_reply("LIST")  # SUT
+
+    assert parser.success
+    assert parser.data == ["tv"]
+    events = demux.drain_events()
+    assert events[0] == VOLUME_UP
+    assert events[1].is_sighup
+
+
+def test_that_reply_data_is_never_mistaken_for_a_broadcast(demux, socket_payload):
+    """
+    lirc.connection.demultiplexer.Demultiplexer.read_reply
+
+    Ensure lines inside a reply packet are always handed to the
+    reply, even ones that look like a broadcast.
+    """
+    socket_payload(
+        b"BEGIN\nLIST tv\nSUCCESS\nDATA\n2\n"
+        b"0000000000f40bf0 00 KEY_VOLUMEUP tv\nBEGIN\nEND\n"
+    )
+
+    parser = demux.read_reply("LIST tv")  # SUT
+
+    assert parser.data == ["0000000000f40bf0 00 KEY_VOLUMEUP tv", "BEGIN"]
+    assert demux.pending_events == 0
+
+
+def test_that_sorting_survives_timeouts(demux, socket_payload):
+    """
+    lirc.connection.demultiplexer.Demultiplexer.read_event
+
+    Ensure a timeout between the lines of a packet does not
+    lose track of the packet being sorted.
+    """
+    socket_payload(
+        b"BEGIN\n",
+        socket.timeout,
+        b"SIGHUP\nEND\n0000000000f40bf0 00 KEY_VOLUMEUP tv\n",
+    )
+
+    with pytest.raises(TimeoutError):
+        demux.read_event()
+    events = [demux.read_event(), demux.read_event()]  # SUT
+
+    assert events[0].is_sighup
+    assert events[1] == VOLUME_UP
+
+
+def test_that_replies_read_while_waiting_on_events_are_kept(demux, socket_payload):
+    """
+    lirc.connection.demultiplexer.Demultiplexer.read_event
+
+    Ensure a reply that arrives while reading events is kept
+    for the next reader of a reply.
+    """
+    socket_payload(
+        b"BEGIN\nVERSION\nSUCCESS\nEND\n0000000000f40bf0 00 KEY_VOLUMEUP tv\n"
+    )
+
+    event = demux.read_event()  # SUT
+
+    assert event == VOLUME_UP
+    assert demux.read_reply("VERSION").success
+
+
+def test_that_subscribers_get_every_broadcast(demux, socket_payload):
+    """
+    lirc.connection.demultiplexer.Demultiplexer.subscribe
+
+    Ensure subscribers are called with each broadcast until
+    they unsubscribe.
+    """
+    received = []
+    socket_payload(
+        b"0000000000f40bf0 00 KEY_VOLUMEUP tv\n"
+        b"BEGIN\nVERSION\nSUCCESS\nEND\n"
+        b"0000000000f40bf0 01 KEY_VOLUMEUP tv\n"
+    )
+    demux.subscribe(received.append)
+
+    demux.read_reply("VERSION")  # SUT
+    demux.unsubscribe(received.append)
+    demux.read_event()  # SUT
+
+    assert received == [VOLUME_UP]
+
+
+@pytest.mark.parametrize(
+    "payload, error",
+    [
+        (b"NOTBEGIN\n", LircdInvalidReplyPacketError),
+        (b"BEGIN\nSIGHUP\nNOTEND\n", LircdInvalidReplyPacketError),
+    ],
+)
+def test_that_invalid_lines_still_raise_errors(demux, socket_payload, payload, error):
+    """
+    lirc.connection.demultiplexer.Demultiplexer.read_reply
+
+    Ensure lines that are neither broadcasts nor valid reply
+    packets still make reading a reply fail.
+    """
+    socket_payload(payload)
+
+    with pytest.raises(error):
+        demux.read_reply("VERSION")  # SUT
+
+
+def test_that_abandoned_replies_are_stale_until_back_in_sync(demux):
+    """
+    lirc.connection.demultiplexer.Demultiplexer.is_stale
+
+    Ensure replies to abandoned commands and to other commands are
+    stale while resyncing, and the reply to the command itself
+    ends the resync.
+    """
+    demux.abandon("VERSION")
+    demux.abandon("LIST  tv\n")
+
+    stale = ["LIST tv", "SEND_ONCE tv KEY_3 0"]
+
+    assert all(demux.is_stale(command, "VERSION") for command in stale)  # SUT
+    assert not demux.is_stale("VERSION", "VERSION")  # SUT
+    assert not demux.resyncing
+    assert demux.stale_replies == len(stale)
+    assert not demux.is_stale("LIST tv", "VERSION")  # SUT
+
+
+def test_that_only_leftovers_are_skipped_while_resyncing(demux):
+    """
+    lirc.connection.demultiplexer.Demultiplexer.is_leftover
+
+    Ensure lines before a BEGIN line are only leftovers while the
+    stream is being resynchronized.
+    """
+    assert not demux.is_leftover("END")  # SUT
+
+    demux.abandon()
+
+    assert demux.is_leftover("END")  # SUT
+    assert not demux.is_leftover("BEGIN\n")  # SUT
+    demux.reset()
+    assert not demux.resyncing
+
+
+def test_that_replies_are_parsed_with_the_readers_parser(demux, socket_payload):
+    """
+    lirc.connection.demultiplexer.Demultiplexer.read_reply
+
+    Ensure a reply is parsed once, with the parser of the reader
+    waiting on it, and that a parser still parsing a reply that was
+    given up on is not reset for the next one.
+    """
+    parser = ReplyPacketParser()
+    socket_payload(
+        b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\nEND\n"
+        b"BEGIN\nLIST\nSUCCESS\nDATA\n1\n",
+        socket.timeout,
+        b"tv\nEND\nBEGIN\nVERSION\nSUCCESS\nEND\n",
+    )
+
+    assert demux.read_reply("VERSION", parser) is parser  # SUT
+    assert parser.data == ["0.10.1"]
+    with pytest.raises(TimeoutError):
+        demux.read_reply("LIST", parser)  # SUT
+    reply = demux.read_reply("VERSION", parser)  # SUT
+
+    assert reply is not parser
+    assert reply.success
+    assert parser.data == ["tv"]
+    assert demux.stale_replies == 1
+
+
+def test_that_a_failing_subscriber_does_not_fail_the_read(
+    demux, socket_payload, caplog
+):
+    """
+    lirc.connection.demultiplexer.Demultiplexer.subscribe
+
+    Ensure an exception raised by a subscriber is logged, and the
+    reply being read and the other subscribers are not affected.
+    """
+    received = []
+    socket_payload(
+        b"0000000000f40bf0 00 KEY_VOLUMEUP tv\nBEGIN\nVERSION\nSUCCESS\nEND\n"
+    )
+    demux.subscribe(lambda event: 1 / 0)
+    demux.subscribe(received.append)
+
+    reply = demux.read_reply("VERSION")  # SUT
+
+    assert reply.success
+    assert received == [VOLUME_UP]
+    assert "ZeroDivisionError" in caplog.text
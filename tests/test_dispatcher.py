@@ -0,0 +1,199 @@
+import queue
+import threading
+from unittest import mock
+
+import pytest
+
+from lirc import Client
+from lirc.dispatcher import Dispatcher, Priority
+from lirc.exceptions import LircdCommandFailureError
+from lirc.testing import FakeLircd
+
+
+@pytest.fixture
+def client():
+    return mock.Mock(spec=Client)
+
+
+def block_worker(dispatcher):
+    """Queue a command that keeps the worker busy until the
+    returned event is set.
+    """
+    started = threading.Event()
+    release = threading.Event()
+
+    def busy(client):
+        started.set()
+        release.wait(5)
+
+    dispatcher.submit(busy)
+    assert started.wait(5)
+    return release
+
+
+def test_that_commands_are_sent_on_the_worker_thread(client):
+    """
+    lirc.dispatcher.Dispatcher.submit
+
+    Ensure a command is sent with the client from the worker
+    thread and its future has the reply.
+    """
+    client._send_command.side_effect = lambda command: threading.current_thread().name
+
+    with Dispatcher(client) as dispatcher:
+        future = dispatcher.submit("VERSION")  # SUT
+
+        assert future.result(5) == "lirc-dispatcher"
+    client._send_command.assert_called_once_with("VERSION")
+
+
+def test_that_interactive_commands_go_ahead_of_bulk_ones(client):
+    """
+    lirc.dispatcher.Dispatcher.submit
+
+    Ensure a command in a more urgent lane is sent before the
+    commands queued in the lanes behind it.
+    """
+    with Dispatcher(client) as dispatcher:
+        release = block_worker(dispatcher)
+        bulk = [
+            dispatcher.simulate("tv", f"KEY_{index}", priority=Priority.BULK)  # SUT
+            for index in range(3)
+        ]
+        normal = dispatcher.send_start("tv", "KEY_UP")  # SUT
+        interactive = dispatcher.send_once(
+            "tv", "KEY_POWER", priority=Priority.INTERACTIVE
+        )  # SUT
+        release.set()
+
+        for future in bulk + [normal, interactive]:
+            future.result(5)
+
+    assert client.mock_calls == [
+        mock.call.send_once("tv", "KEY_POWER", 0),
+        mock.call.send_start("tv", "KEY_UP"),
+        mock.call.simulate("tv", "KEY_0", 0),
+        mock.call.simulate("tv", "KEY_1", 0),
+        mock.call.simulate("tv", "KEY_2", 0),
+        mock.call.close(),
+    ]
+
+
+def test_that_errors_are_set_on_the_future(client):
+    """
+    lirc.dispatcher.Dispatcher.send_once
+
+    Ensure a command that fails raises from its future and the
+    worker keeps sending the commands after it.
+    """
+    client.send_once.side_effect = [LircdCommandFailureError("failed"), None]
+
+    with Dispatcher(client) as dispatcher:
+        failed = dispatcher.send_once("tv", "KEY_POWER")  # SUT
+        sent = dispatcher.send_once("tv", "KEY_POWER")  # SUT
+
+        with pytest.raises(LircdCommandFailureError):
+            failed.result(5)
+        assert sent.result(5) is None
+
+
+def test_that_a_full_lane_blocks_until_there_is_room(client):
+    """
+    lirc.dispatcher.Dispatcher.submit
+
+    Ensure submitting to a full lane waits for the worker and
+    raises queue.Full once the timeout passes, while the other
+    lanes still take commands.
+    """
+    with Dispatcher(client, max_queued=1) as dispatcher:
+        release = block_worker(dispatcher)
+        dispatcher.simulate("tv", "KEY_1", priority=Priority.BULK)
+
+        with pytest.raises(queue.Full):
+            dispatcher.submit("VERSION", Priority.BULK, timeout=0.05)  # SUT
+        with pytest.raises(queue.Full):
+            dispatcher.submit("VERSION", Priority.BULK, block=False)  # SUT
+        dispatcher.send_once("tv", "KEY_POWER", priority=Priority.INTERACTIVE)
+
+        threading.Timer(0.05, release.set).start()
+        future = dispatcher.submit("VERSION", Priority.BULK, timeout=5)  # SUT
+
+        future.result(5)
+        assert dispatcher.queued == 0
+
+
+def test_that_closing_can_cancel_queued_commands(client):
+    """
+    lirc.dispatcher.Dispatcher.close
+
+    Ensure closing cancels the commands still queued when asked
+    to, closes the client and refuses any more commands.
+    """
+    dispatcher = Dispatcher(client)
+    release = block_worker(dispatcher)
+    queued = dispatcher.send_once("tv", "KEY_POWER")
+    threading.Timer(0.05, release.set).start()
+
+    dispatcher.close(cancel_queued=True)  # SUT
+
+    assert queued.cancelled()
+    client.send_once.assert_not_called()
+    client.close.assert_called_once()
+    with pytest.raises(ValueError):
+        dispatcher.submit("VERSION")
+
+
+def test_that_lanes_are_measured(client):
+    """
+    lirc.dispatcher.Dispatcher.snapshot
+
+    Ensure the depth of each lane and how long its commands
+    waited are recorded.
+    """
+    with Dispatcher(client) as dispatcher:
+        release = block_worker(dispatcher)
+        futures = [
+            dispatcher.simulate("tv", "KEY_1", priority=Priority.BULK)
+            for _ in range(2)
+        ]
+        waiting = dispatcher.snapshot()  # SUT
+        release.set()
+        for future in futures:
+            future.result(5)
+
+        snapshot = dispatcher.snapshot()  # SUT
+
+    assert waiting["bulk"]["depth"] == len(futures)
+    assert snapshot["bulk"]["depth"] == 0
+    assert snapshot["bulk"]["max_depth"] == len(futures)
+    assert snapshot["bulk"]["submitted"] == len(futures)
+    assert snapshot["bulk"]["wait"]["count"] == len(futures)
+    assert snapshot["normal"]["submitted"] == 1
+    assert snapshot["interactive"] == {
+        "depth": 0,
+        "max_depth": 0,
+        "submitted": 0,
+        "cancelled": 0,
+        "wait": {
+            "buckets": snapshot["interactive"]["wait"]["buckets"],
+            "sum": 0.0,
+            "count": 0,
+        },
+    }
+
+
+def test_that_commands_are_sent_to_lircd():
+    """
+    lirc.dispatcher.Dispatcher.submit
+
+    Ensure raw commands and client calls are both sent to lircd.
+    """
+    with FakeLircd({"tv": ["KEY_POWER"], "amp": ["KEY_MUTE"]}) as lircd:
+        with Dispatcher(lircd.client()) as dispatcher:
+            version = dispatcher.submit("VERSION")  # SUT
+            remotes = dispatcher.submit(
+                lambda client: client.list_remotes(), Priority.INTERACTIVE
+            )  # SUT
+
+            assert isinstance(version.result(5), str)
+            assert sorted(remotes.result(5)) == ["amp", "tv"]
@@ -0,0 +1,207 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from lirc import LircdConnection
+from lirc.exceptions import LircdCommandFailureError, LircdSocketError
+from lirc.fanout_client import FanoutClient
+
+
+def fake_daemon(sock, delay=0.0, reply=None, trickle=None):
+    """Answer every command line received on a socket after a delay,
+    until the other end closes it. Replies are split in two writes,
+    or sent a few bytes at a time with a pause between each if
+    trickle is a (number of bytes, pause) pair.
+    """
+
+    def serve():
+        buffer = b""
+        while True:
+            try:
+                data = sock.recv(4096)
+            except OSError:
+                return
+            if not data:
+                return
+            buffer += data
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                time.sleep(delay)
+                packet = (reply or success)(line)
+                if packet is None:
+                    sock.close()
+                    return
+                size, pause = trickle or ((len(packet) + 1) // 2, 0)
+                try:
+                    for start in range(0, len(packet), size):
+                        sock.sendall(packet[start : start + size])
+                        time.sleep(pause)
+                except OSError:
+                    return
+
+    threading.Thread(target=serve, daemon=True).start()
+
+
+def success(command):
+    return b"BEGIN\n%s\nSUCCESS\nEND\n" % command
+
+
+@pytest.fixture
+def daemons():
+    """Create connected fanout client and daemon socket pairs."""
+    created = []
+
+    def make(count):
+        connections = []
+        for n in range(count):
+            ours, theirs = socket.socketpair()
+            connection = LircdConnection(address=f"daemon-{n}", socket=ours)
+            connection.connect = lambda: None
+            connections.append(connection)
+            created.append(theirs)
+        return connections, list(created)
+
+    yield make
+
+    for sock in created:
+        sock.close()
+
+
+def test_that_commands_are_sent_to_every_daemon_at_once(daemons):
+    """
+    lirc.fanout_client.FanoutClient.execute
+
+    Ensure every daemon is sent the commands and that the total
+    time is about that of the slowest daemon, not their sum.
+    """
+    delay = 0.1
+    connections, socks = daemons(4)
+    for sock in socks:
+        fake_daemon(sock, delay=delay)
+    fanout = FanoutClient(connections)
+
+    start = time.monotonic()
+    results = fanout.execute(["SEND_ONCE tv KEY_POWER 0"])  # SUT
+    elapsed = time.monotonic() - start
+
+    assert elapsed < delay * (len(connections) - 1)
+    assert [result.address for result in results] == [
+        "daemon-0",
+        "daemon-1",
+        "daemon-2",
+        "daemon-3",
+    ]
+    assert all(result.ok for result in results)
+
+
+def test_that_pipeline_gathers_every_reply_per_daemon(daemons):
+    """
+    lirc.fanout_client.FanoutClient.pipeline
+
+    Ensure a pipeline's commands are all sent to every daemon and
+    each daemon's replies are returned in order.
+    """
+    connections, socks = daemons(2)
+
+    def reply(command):
+        if command == b"VERSION":
+            return b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\nEND\n"
+        return b"0000000000f40bf0 00 KEY_UP tv\n" + success(command)
+
+    for sock in socks:
+        fake_daemon(sock, reply=reply)
+    fanout = FanoutClient(connections)
+
+    with fanout.pipeline() as pipe:
+        pipe.send_once("tv", "KEY_POWER")
+        pipe.version()
+        results = pipe.execute()  # SUT
+
+    assert [result.results for result in results] == [[[], "0.10.1"]] * 2
+
+
+def test_that_failures_and_timeouts_are_reported_per_daemon(daemons):
+    """
+    lirc.fanout_client.FanoutClient.execute
+
+    Ensure a failed command, a closed connection and a daemon
+    that is too slow only affect their own daemon's result.
+    """
+    connections, socks = daemons(4)
+    fake_daemon(socks[0])
+    fake_daemon(socks[1], reply=lambda command: b"BEGIN\n%s\nERROR\nEND\n" % command)
+    fake_daemon(socks[2], reply=lambda command: None)
+    fake_daemon(socks[3], delay=1)
+    fanout = FanoutClient(connections, timeout=0.2)
+
+    results = fanout.execute(["SEND_ONCE tv KEY_POWER 0"])  # SUT
+
+    assert results[0].ok
+    assert isinstance(results[1].results[0], LircdCommandFailureError)
+    assert isinstance(results[2].error, LircdSocketError)
+    assert isinstance(results[3].error, TimeoutError)
+    assert not any(result.ok for result in results[1:])
+
+
+def test_that_a_stalling_daemon_does_not_hold_up_the_others(daemons):
+    """
+    lirc.fanout_client.FanoutClient.execute
+
+    Ensure a daemon that sends its reply a few bytes at a time,
+    slower than the timeout, does not keep a fast daemon's reply
+    from being read.
+    """
+    connections, socks = daemons(2)
+    fake_daemon(socks[0], delay=0.1)
+    fake_daemon(socks[1], trickle=(4, 0.6))
+    fanout = FanoutClient(connections, timeout=0.5)
+
+    results = fanout.execute(["SEND_ONCE tv KEY_POWER 0"])  # SUT
+
+    assert results[0].ok
+    assert results[0].results == [[]]
+    assert isinstance(results[1].error, TimeoutError)
+
+
+def test_that_sockets_are_blocking_again_afterwards(daemons):
+    """
+    lirc.fanout_client.FanoutClient.execute
+
+    Ensure each socket gets its original timeout back.
+    """
+    connections, socks = daemons(1)
+    fake_daemon(socks[0])
+    socket_timeout = 3.0
+    connections[0].socket.settimeout(socket_timeout)
+
+    FanoutClient(connections).execute(["VERSION"])  # SUT
+
+    assert connections[0].socket.gettimeout() == socket_timeout
+
+
+def test_that_replies_to_timed_out_commands_are_thrown_away(daemons):
+    """
+    lirc.fanout_client.FanoutClient.execute
+
+    Ensure the reply to a command that timed out, which arrives
+    late, is not taken for the reply to the next command.
+    """
+    connections, socks = daemons(1)
+
+    def reply(command):
+        if command == b"LIST":
+            time.sleep(0.3)
+            return b"BEGIN\nLIST\nSUCCESS\nDATA\n2\ntv\nreceiver\nEND\n"
+        return b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\nEND\n"
+
+    fake_daemon(socks[0], reply=reply)
+    fanout = FanoutClient(connections)
+    timed_out = fanout.execute(["LIST"], timeout=0.1)
+
+    results = fanout.execute(["VERSION"])  # SUT
+
+    assert isinstance(timed_out[0].error, TimeoutError)
+    assert results[0].ok
+    assert results[0].results == ["0.10.1"]
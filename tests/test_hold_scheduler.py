@@ -0,0 +1,220 @@
+import gc
+import time
+import weakref
+from unittest import mock
+
+import pytest
+
+from lirc import Client
+from lirc.exceptions import LircdCommandFailureError
+from lirc.hold_scheduler import HoldScheduler, _close_open_schedulers
+from lirc.testing import FakeLircd
+
+
+@pytest.fixture
+def client():
+    return mock.Mock(spec=Client)
+
+
+@pytest.fixture
+def scheduler(client):
+    with HoldScheduler(client) as scheduler:
+        yield scheduler
+
+
+def test_that_holding_a_key_sends_start_then_stop_after_its_duration(
+    client, scheduler
+):
+    """
+    lirc.hold_scheduler.HoldScheduler.hold
+
+    Ensure a key is started straight away and stopped
+    once its duration has passed.
+    """
+    duration = 0.05
+    start = time.monotonic()
+
+    hold = scheduler.hold("tv", "KEY_VOLUMEUP", duration)  # SUT
+
+    assert hold.active
+    assert hold.wait(1)
+    assert time.monotonic() - start >= duration
+    assert client.mock_calls == [
+        mock.call.send_start("tv", "KEY_VOLUMEUP"),
+        mock.call.send_stop("tv", "KEY_VOLUMEUP"),
+    ]
+    assert not hold.active
+    assert scheduler.holds == []
+
+
+def test_that_concurrent_holds_are_each_stopped_at_their_deadline(
+    client, scheduler
+):
+    """
+    lirc.hold_scheduler.HoldScheduler.hold
+
+    Ensure many keys can be held at once and are stopped
+    in the order of their deadlines.
+    """
+    long = scheduler.hold("tv", "KEY_VOLUMEUP", 0.09)  # SUT
+    short = scheduler.hold("amp", "KEY_VOLUMEDOWN", 0.03)  # SUT
+
+    assert scheduler.holds == [long, short]
+    assert short.wait(1) and long.wait(1)
+    assert client.send_stop.call_args_list == [
+        mock.call("amp", "KEY_VOLUMEDOWN"),
+        mock.call("tv", "KEY_VOLUMEUP"),
+    ]
+
+
+def test_that_extending_a_hold_delays_its_stop(client, scheduler):
+    """
+    lirc.hold_scheduler.Hold.extend
+
+    Ensure an extended hold is only stopped at its new deadline.
+    """
+    hold = scheduler.hold("tv", "KEY_VOLUMEUP", 0.03)
+
+    hold.extend(0.1)  # SUT
+
+    assert not hold.wait(0.06)
+    client.send_stop.assert_not_called()
+    assert hold.wait(1)
+    client.send_stop.assert_called_once_with("tv", "KEY_VOLUMEUP")
+
+
+def test_that_cancelling_a_hold_stops_it_once(client, scheduler):
+    """
+    lirc.hold_scheduler.Hold.cancel
+
+    Ensure cancelling a hold stops the key straight away and
+    only once, even after its deadline passes.
+    """
+    hold = scheduler.hold("tv", "KEY_VOLUMEUP", 0.03)
+
+    hold.cancel()  # SUT
+    hold.cancel()  # SUT
+
+    assert not hold.active
+    time.sleep(0.05)
+    client.send_stop.assert_called_once_with("tv", "KEY_VOLUMEUP")
+    with pytest.raises(ValueError):
+        hold.extend(1)
+
+
+def test_that_closing_stops_every_active_hold(client):
+    """
+    lirc.hold_scheduler.HoldScheduler.close
+
+    Ensure closing the scheduler stops holds with and
+    without a duration, and no more keys can be held.
+    """
+    scheduler = HoldScheduler(client)
+    timed = scheduler.hold("tv", "KEY_VOLUMEUP", 60)
+    untimed = scheduler.hold("amp", "KEY_VOLUMEDOWN")
+    assert untimed.remaining is None
+
+    scheduler.close()  # SUT
+
+    assert not timed.active and not untimed.active
+    assert sorted(client.send_stop.call_args_list) == [
+        mock.call("amp", "KEY_VOLUMEDOWN"),
+        mock.call("tv", "KEY_VOLUMEUP"),
+    ]
+    with pytest.raises(ValueError):
+        scheduler.hold("tv", "KEY_POWER", 1)
+
+
+def test_that_open_schedulers_are_closed_at_exit(client):
+    """
+    lirc.hold_scheduler.HoldScheduler.__init__
+
+    Ensure a scheduler that is still open when the interpreter exits
+    is closed then, and one that was already closed is left alone.
+    """
+    scheduler = HoldScheduler(client)  # SUT
+    hold = scheduler.hold("tv", "KEY_VOLUMEUP")
+    closed = HoldScheduler(client)  # SUT
+    closed.close()
+
+    with mock.patch.object(closed, "close") as close_again:
+        _close_open_schedulers()
+
+    assert not hold.active
+    client.send_stop.assert_called_once_with("tv", "KEY_VOLUMEUP")
+    close_again.assert_not_called()
+
+
+def test_that_a_dropped_scheduler_is_garbage_collected(client):
+    """
+    lirc.hold_scheduler.HoldScheduler.__init__
+
+    Ensure being closed at exit does not keep a scheduler alive
+    once nothing else refers to it.
+    """
+    scheduler = weakref.ref(HoldScheduler(client))  # SUT
+    gc.collect()
+
+    assert scheduler() is None
+
+
+def test_that_holding_a_key_already_held_raises(scheduler):
+    """
+    lirc.hold_scheduler.HoldScheduler.hold
+
+    Ensure the same key can't be held twice at once.
+    """
+    scheduler.hold("tv", "KEY_VOLUMEUP")
+
+    with pytest.raises(ValueError):
+        scheduler.hold("tv", "KEY_VOLUMEUP", 1)  # SUT
+
+
+def test_that_a_failed_start_is_not_tracked(client, scheduler):
+    """
+    lirc.hold_scheduler.HoldScheduler.hold
+
+    Ensure a key lircd failed to start is raised and
+    never stopped.
+    """
+    client.send_start.side_effect = LircdCommandFailureError("already repeating")
+
+    with pytest.raises(LircdCommandFailureError):
+        scheduler.hold("tv", "KEY_VOLUMEUP", 0.01)  # SUT
+
+    assert scheduler.holds == []
+    time.sleep(0.03)
+    client.send_stop.assert_not_called()
+
+
+def test_that_a_failed_stop_is_kept_on_the_hold(client, scheduler):
+    """
+    lirc.hold_scheduler.HoldScheduler.hold
+
+    Ensure a failure to stop a key is kept on its hold and
+    the timer keeps running for the other holds.
+    """
+    client.send_stop.side_effect = [LircdCommandFailureError("failed"), None]
+    first = scheduler.hold("tv", "KEY_VOLUMEUP", 0.01)
+    second = scheduler.hold("amp", "KEY_VOLUMEUP", 0.03)
+
+    assert first.wait(1) and second.wait(1)  # SUT
+    assert isinstance(first.error, LircdCommandFailureError)
+    assert second.error is None
+
+
+def test_that_holds_work_against_lircd():
+    """
+    lirc.hold_scheduler.HoldScheduler.hold
+
+    Ensure a hold starts and stops repeating a key on lircd.
+    """
+    with FakeLircd({"tv": ["KEY_VOLUMEUP"]}) as lircd:
+        client = lircd.client()
+        with HoldScheduler(client) as scheduler:
+            hold = scheduler.hold("tv", "KEY_VOLUMEUP", 0.03)  # SUT
+            assert lircd.repeating == ("tv", "KEY_VOLUMEUP")
+            assert hold.wait(1)
+
+        assert lircd.repeating is None
+        client.close()
@@ -0,0 +1,173 @@
+import sys
+from array import array
+
+import pytest
+
+from lirc import ClientPool
+from lirc.exceptions import LircdInvalidReplyPacketError
+from lirc.key_table import KeyTable
+from lirc.testing import FakeLircd
+
+KEYS = [
+    "0000000000000001 KEY_POWER",
+    "00000000000010ef KEY_MUTE",
+    "ffffffffffffffff KEY_MAX",
+]
+MUTE_CODE = 0x10EF
+
+
+def test_that_a_reply_is_parsed_into_codes_and_names():
+    """
+    lirc.key_table.KeyTable.from_reply
+
+    Ensure every line of a LIST reply becomes a key with
+    its parsed code, in the order they were listed.
+    """
+    table = KeyTable.from_reply("tv", KEYS)  # SUT
+
+    assert table.remote == "tv"
+    assert len(table) == len(KEYS)
+    assert list(table) == ["KEY_POWER", "KEY_MUTE", "KEY_MAX"]
+    assert table.codes == array("Q", [1, MUTE_CODE, 2**64 - 1])
+    assert list(table.items())[1] == ("KEY_MUTE", MUTE_CODE)
+    assert table.to_reply() == KEYS
+
+
+def test_that_a_single_line_reply_is_parsed():
+    """
+    lirc.key_table.KeyTable.from_reply
+
+    Ensure a reply with one line, which the client returns as a
+    string rather than a list, is a table with one key.
+    """
+    table = KeyTable.from_reply("tv", KEYS[0])  # SUT
+
+    assert table.names == ("KEY_POWER",)
+
+
+@pytest.mark.parametrize(
+    "line", ["KEY_POWER", "zz KEY_POWER", "1 KEY_POWER extra", "1" * 17 + " KEY_UP"]
+)
+def test_that_invalid_lines_raise(line):
+    """
+    lirc.key_table.KeyTable.from_reply
+
+    Ensure a line that is not a 64 bit code and a key name raises.
+    """
+    with pytest.raises(LircdInvalidReplyPacketError, match="`tv`"):
+        KeyTable.from_reply("tv", [KEYS[0], line])  # SUT
+
+
+def test_that_codes_and_names_are_looked_up_both_ways():
+    """
+    lirc.key_table.KeyTable.code_of
+    lirc.key_table.KeyTable.name_of
+
+    Ensure a key's code is found by its name and its name by its
+    code, and that unknown ones raise a KeyError.
+    """
+    table = KeyTable.from_reply("tv", KEYS)
+
+    assert table.code_of("KEY_MUTE") == MUTE_CODE  # SUT
+    assert table.name_of(2**64 - 1) == "KEY_MAX"  # SUT
+    assert "KEY_POWER" in table
+    assert "KEY_UP" not in table
+    with pytest.raises(KeyError):
+        table.code_of("KEY_UP")  # SUT
+    with pytest.raises(KeyError):
+        table.name_of(2)  # SUT
+
+
+def test_that_many_keys_are_all_found():
+    """
+    lirc.key_table.KeyTable.code_of
+    lirc.key_table.KeyTable.name_of
+
+    Ensure lookups find every key of a large remote, including
+    codes that only differ in their high bits.
+    """
+    codes = [index << 40 for index in range(5000)]
+    table = KeyTable("tv", [f"KEY_{index}" for index in range(5000)], codes)
+
+    for index, code in enumerate(codes):
+        assert table.code_of(f"KEY_{index}") == code  # SUT
+        assert table.name_of(code) == f"KEY_{index}"  # SUT
+
+
+def test_that_the_first_of_duplicate_keys_is_found():
+    """
+    lirc.key_table.KeyTable.__init__
+
+    Ensure a name or code listed twice finds the first key with
+    it, while every key is still kept.
+    """
+    names = ["KEY_A", "KEY_B", "KEY_A"]
+
+    table = KeyTable("tv", names, [1, 1, 2])  # SUT
+
+    assert list(table) == names
+    assert table.code_of("KEY_A") == 1
+    assert table.name_of(1) == "KEY_A"
+    assert table.name_of(2) == "KEY_A"
+
+
+def test_that_key_names_are_shared_between_tables():
+    """
+    lirc.key_table.KeyTable.__init__
+
+    Ensure the same key name on different remotes is one string,
+    and that a table takes less memory than the lines of its reply.
+    """
+    lines = [f"{index:016x} KEY_{index}" for index in range(1000)]
+
+    tv = KeyTable.from_reply("tv", lines)  # SUT
+    amp = KeyTable.from_reply("amp", lines)  # SUT
+
+    assert all(a is b for a, b in zip(tv.names, amp.names))
+    size_of_lines = sys.getsizeof(lines) + sum(map(sys.getsizeof, lines))
+    assert sys.getsizeof(tv) < size_of_lines / 2
+
+
+def test_that_mismatched_codes_raise():
+    """
+    lirc.key_table.KeyTable.__init__
+
+    Ensure a table can't be made with more names than codes.
+    """
+    with pytest.raises(ValueError):
+        KeyTable("tv", ["KEY_A", "KEY_B"], [1])  # SUT
+
+
+def test_that_a_client_lists_a_key_table():
+    """
+    lirc.Client.key_table
+
+    Ensure the keys of a remote on lircd are listed as a table.
+    """
+    with FakeLircd({"tv": ["KEY_POWER", "KEY_MUTE"]}) as lircd:
+        client = lircd.client()
+
+        table = client.key_table("tv")  # SUT
+
+        assert table == KeyTable("tv", ["KEY_POWER", "KEY_MUTE"], [1, 2])
+        client.close()
+
+
+def test_that_a_client_pool_lists_a_key_table():
+    """
+    lirc.ClientPool.key_table
+
+    Ensure a pool lists a table on one of its connections, and that
+    the keys listed by a pipeline of the pool parse into the same table.
+    """
+    with FakeLircd({"tv": ["KEY_POWER", "KEY_MUTE"]}) as lircd:
+        with ClientPool(connection_factory=lircd.connection) as pool:
+            table = pool.key_table("tv")  # SUT
+
+            with pool.pipeline() as pipe:
+                pipe.list_remote_keys("tv")
+                (reply,) = pipe.execute()
+
+        assert table == KeyTable("tv", ["KEY_POWER", "KEY_MUTE"], [1, 2])
+        assert KeyTable.from_reply("tv", reply) == table
+        assert not hasattr(pipe, "key_table")
@@ -1,5 +1,5 @@
 import socket
-from collections import deque
+import time
 from unittest.mock import patch
 
 import pytest
@@ -133,51 +133,85 @@ def test_that_send_raises_a_type_error_for_parameters_that_are_not_strings(
     assert "data parameter to send() must be a string" in str(error)
 
 
-@pytest.mark.parametrize(
-    "buffer_payload, expected_item",
-    [("BEGIN\nSIGHUP\nEND\n".split("\n"), "BEGIN"), ([""], "")],
-)
-def test_that_readline_uses_buffer_if_items_are_present_in_it(
-    mock_connection, buffer_payload, expected_item
+def test_that_readline_uses_buffer_if_lines_are_present_in_it(
+    mock_connection, socket_payload
 ):
     """
     lirc.connection.lircd_connection.LircdConnection.readline
 
-    Ensure that readline uses the buffer if there are items in it.
+    Ensure that readline hands out the lines already in the
+    buffer before reading from the socket again.
     """
-    mock_connection._buffer.extend(buffer_payload)
+    socket_payload(b"BEGIN\nSIGHUP\nEND\n")
 
-    line = mock_connection.readline()  # SUT
+    lines = [mock_connection.readline() for _ in range(3)]  # SUT
 
-    assert line == expected_item
+    assert lines == ["BEGIN", "SIGHUP", "END"]
+    assert mock_connection._socket.recv_into.call_count == 1
 
 
 @pytest.mark.parametrize(
-    "socket_payload, expected_return, expected_buffer",
+    "chunks, expected_lines",
     [
-        (b"BEGIN\nTEST\nEND\n", "BEGIN", deque(["TEST", "END"])),
-        (b"BEGIN\nTEST\nEND", "BEGIN", deque(["TEST", "END"])),
-        (b"", "", deque()),
+        ((b"BEGIN\nTEST\nEND\n",), ["BEGIN", "TEST", "END"]),
+        ((b"BEG", b"IN\nTE", b"ST\n", b"END\n"), ["BEGIN", "TEST", "END"]),
+        ((b"BEGIN\n", b"\n", b"END\n"), ["BEGIN", "", "END"]),
+        ((b"BEGIN\nTEST\nEND", b""), ["BEGIN", "TEST", "END"]),
     ],
 )
-def test_that_readline_retrieves_data_from_socket_and_adds_to_buffer(
-    mock_connection, socket_payload, expected_return, expected_buffer
+def test_that_readline_keeps_lines_split_across_reads_together(
+    mock_connection, socket_payload, chunks, expected_lines
+):
+    """
+    lirc.connection.lircd_connection.LircdConnection.readline
+
+    Ensure that a line split across multiple reads from the socket is
+    returned as one line, and that once lircd closes the connection
+    the partial line left over is returned.
+    """
+    socket_payload(*chunks)
+
+    lines = [mock_connection.readline() for _ in expected_lines]  # SUT
+
+    assert lines == expected_lines
+
+
+def test_that_readline_does_not_grow_the_buffer_unbounded(
+    mock_connection, socket_payload
 ):
     """
     lirc.connection.lircd_connection.LircdConnection.readline
 
-    Ensure that when we call readline(), it adds to the buffer if we
-    retrieved more than a single line.
+    Ensure lines that have been read are dropped from the buffer
+    once more data has to be read from the socket.
     """
-    mock_connection._socket.recv.return_value = socket_payload
+    socket_payload(b"0000000000000001 KEY_POWER\n0000000000000002 KEY_M", b"UTE\n")
 
-    line = mock_connection.readline()  # SUT
+    for _ in range(2):
+        mock_connection.readline()  # SUT
 
-    assert line == expected_return
-    assert mock_connection._buffer == expected_buffer
+    assert bytes(mock_connection._buffer) == b"0000000000000002 KEY_MUTE\n"
 
 
-@patch("socket.socket.recv")
+def test_that_readline_raises_lircd_socket_error_once_closed(
+    mock_connection, socket_payload
+):
+    """
+    lirc.connection.lircd_connection.LircdConnection.readline
+
+    Ensure that a LircdSocketError is raised from readline() once
+    lircd has closed the connection and the buffer is empty.
+    """
+    socket_payload(b"END", b"")
+    mock_connection.readline()
+
+    with pytest.raises(LircdSocketError) as error:
+        mock_connection.readline()  # SUT
+
+    assert "lircd closed the connection" in str(error)
+
+
+@patch("socket.socket.recv_into")
 def test_that_readline_raises_timeout_error(patched_recv):
     """
     lirc.connection.lircd_connection.LircdConnection.readline
@@ -194,7 +228,51 @@ def test_that_readline_raises_timeout_error(patched_recv):
     assert "could not find any data on the socket" in str(error)
 
 
-@patch("socket.socket.recv")
+def test_that_readline_stops_waiting_at_the_deadline():
+    """
+    lirc.connection.lircd_connection.LircdConnection.readline
+
+    Ensure that readline() only waits until the deadline, even
+    when it is much shorter than the socket timeout, and that
+    the socket timeout is set back afterwards.
+    """
+    ours, theirs = socket.socketpair()
+    socket_timeout = 5.0
+    connection = LircdConnection(socket=ours, timeout=socket_timeout)
+    theirs.sendall(b"BEGIN\nVERS")
+    connection.readline()
+    start = time.monotonic()
+
+    with pytest.raises(TimeoutError) as error:
+        connection.readline(deadline=time.monotonic() + 0.05)  # SUT
+
+    assert time.monotonic() - start < 1
+    assert "deadline passed" in str(error)
+    assert ours.gettimeout() == socket_timeout
+    ours.close()
+    theirs.close()
+
+
+def test_that_readline_returns_buffered_lines_past_the_deadline(
+    mock_connection, socket_payload
+):
+    """
+    lirc.connection.lircd_connection.LircdConnection.readline
+
+    Ensure that lines that were already received are handed out
+    even if the deadline has passed, but nothing more is read.
+    """
+    socket_payload(b"BEGIN\nVERSION\n")
+    mock_connection.readline()
+
+    line = mock_connection.readline(deadline=time.monotonic() - 1)  # SUT
+
+    assert line == "VERSION"
+    with pytest.raises(TimeoutError):
+        mock_connection.readline(deadline=time.monotonic() - 1)  # SUT
+
+
+@patch("socket.socket.recv_into")
 def test_that_readline_raises_lircd_socket_error(patched_recv):
     """
     lirc.connection.lircd_connection.LircdConnection.readline
@@ -209,3 +287,34 @@ def test_that_readline_raises_lircd_socket_error(patched_recv):
         connection.readline()  # SUT
 
     assert "An error occurred while reading from the lircd socket" in str(error)
+
+
+def test_that_is_alive_detects_a_closed_connection():
+    """
+    lirc.connection.lircd_connection.LircdConnection.is_alive
+
+    Ensure is_alive is True while the other end is open, even
+    with data waiting to be read, and False once it is closed.
+    """
+    ours, theirs = socket.socketpair()
+    connection = LircdConnection(socket=ours)
+    theirs.sendall(b"0000000000f40bf0 00 KEY_VOLUMEUP tv\n")
+
+    assert connection.is_alive()  # SUT
+    assert connection.readline() == "0000000000f40bf0 00 KEY_VOLUMEUP tv"
+
+    theirs.close()
+
+    assert not connection.is_alive()  # SUT
+    ours.close()
+
+
+def test_that_send_bytes_sends_the_data_as_is(mock_connection):
+    """
+    lirc.connection.lircd_connection.LircdConnection.send_bytes
+
+    Ensure already encoded data is written without being changed.
+    """
+    mock_connection.send_bytes(b"SEND_ONCE REMOTE KEY 0\n")  # SUT
+
+    mock_connection._socket.sendall.assert_called_with(b"SEND_ONCE REMOTE KEY 0\n")
@@ -0,0 +1,165 @@
+import socket
+
+import pytest
+
+from lirc import Client
+from lirc.exceptions import LircdCommandFailureError
+from lirc.metrics import Histogram, Metrics
+
+
+def test_that_histogram_buckets_are_cumulative():
+    """
+    lirc.metrics.Histogram.observe
+
+    Ensure values are counted into the first bucket whose upper
+    bound they are at most, and that the counts add up.
+    """
+    histogram = Histogram([0.1, 1.0])
+    values = (0.05, 0.1, 0.5, 2.0)
+
+    for value in values:
+        histogram.observe(value)  # SUT
+
+    assert histogram.cumulative_buckets() == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+    assert histogram.count == len(values)
+    assert histogram.sum == pytest.approx(2.65)
+
+
+def test_that_commands_are_recorded_by_type(mock_connection, socket_payload):
+    """
+    lirc.Client._send_command
+
+    Ensure each command's latency, bytes, reply lines and outcome
+    are recorded under the type of the command.
+    """
+    metrics = Metrics()
+    client = Client(mock_connection, metrics=metrics)
+    socket_payload(
+        b"BEGIN\nSEND_ONCE tv KEY_POWER 0\nSUCCESS\nEND\n",
+        b"BEGIN\nSEND_ONCE tv KEY_UP 0\nERROR\nDATA\n1\nunknown key\nEND\n",
+        b"BEGIN\nLIST\nSUCCESS\nDATA\n1\ntv\nEND\n",
+    )
+
+    client.send_once("tv", "KEY_POWER")  # SUT
+    with pytest.raises(LircdCommandFailureError):
+        client.send_once("tv", "KEY_UP")  # SUT
+    client.list_remotes()  # SUT
+
+    snapshot = metrics.snapshot()
+    send_once = snapshot["commands"]["SEND_ONCE"]
+    assert send_once["outcomes"] == {
+        "success": 1,
+        "failure": 1,
+        "timeout": 0,
+        "error": 0,
+    }
+    assert send_once["duration"]["count"] == sum(send_once["outcomes"].values())
+    assert send_once["first_line"]["count"] == sum(send_once["outcomes"].values())
+    assert send_once["bytes_sent"] == len(
+        "SEND_ONCE tv KEY_POWER 0\nSEND_ONCE tv KEY_UP 0\n"
+    )
+    assert send_once["reply_lines"] == 4 + 7
+    assert snapshot["commands"]["LIST"]["bytes_received"] == len(
+        b"BEGIN\nLIST\nSUCCESS\nDATA\n1\ntv\nEND\n"
+    )
+    assert snapshot["bytes_sent"] == send_once["bytes_sent"] + len("LIST\n")
+
+
+def test_that_bytes_are_counted_in_utf_8(mock_connection, socket_payload):
+    """
+    lirc.metrics.Measurement.line
+
+    Ensure the bytes of a command and its reply are counted as they
+    are on the socket, rather than as characters.
+    """
+    metrics = Metrics()
+    client = Client(mock_connection, metrics=metrics)
+    reply = "BEGIN\nLIST télé\nSUCCESS\nDATA\n1\n0000000000000001 KEY_ÉTÉ\nEND\n"
+    socket_payload(reply.encode())
+
+    client.list_remote_keys("télé")  # SUT
+
+    stats = metrics.snapshot()["commands"]["LIST"]
+    assert stats["bytes_sent"] == len("LIST télé\n".encode())
+    assert stats["bytes_received"] == len(reply.encode())
+
+
+def test_that_timeouts_are_counted(mock_connection, socket_payload):
+    """
+    lirc.Client._send_command
+
+    Ensure a command whose reply timed out is counted without
+    adding to the latency histograms.
+    """
+    metrics = Metrics()
+    client = Client(mock_connection, metrics=metrics)
+    socket_payload(socket.timeout)
+
+    with pytest.raises(TimeoutError):
+        client.version()  # SUT
+
+    version = metrics.snapshot()["commands"]["VERSION"]
+    assert version["outcomes"]["timeout"] == 1
+    assert version["duration"]["count"] == 0
+
+
+def test_that_pipelined_and_prepared_commands_are_recorded(
+    mock_connection, socket_payload
+):
+    """
+    lirc.Client._execute_pipeline
+    lirc.Client._send_encoded
+
+    Ensure every command of a pipeline and prepared commands
+    are each recorded.
+    """
+    metrics = Metrics()
+    client = Client(mock_connection, metrics=metrics)
+    socket_payload(
+        b"BEGIN\nSEND_ONCE tv KEY_1 0\nSUCCESS\nEND\n"
+        b"BEGIN\nSEND_ONCE tv KEY_2 0\nSUCCESS\nEND\n",
+        b"BEGIN\nSEND_ONCE tv KEY_3 0\nSUCCESS\nEND\n",
+    )
+
+    with client.pipeline() as pipe:
+        pipe.send_once("tv", "KEY_1")
+        pipe.send_once("tv", "KEY_2")
+        pipe.execute()  # SUT
+    client.prepare("tv", "KEY_3")()  # SUT
+
+    outcomes = metrics.snapshot()["commands"]["SEND_ONCE"]["outcomes"]
+    assert outcomes == {"success": 3, "failure": 0, "timeout": 0, "error": 0}
+
+
+def test_that_metrics_are_exported_for_prometheus(mock_connection, socket_payload):
+    """
+    lirc.metrics.Metrics.to_prometheus
+
+    Ensure the histograms and counters are in the text format.
+    """
+    metrics = Metrics(buckets=[0.5])
+    client = Client(mock_connection, metrics=metrics)
+    socket_payload(b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\nEND\n")
+    client.version()
+
+    text = metrics.to_prometheus()  # SUT
+
+    assert "# TYPE lirc_command_duration_seconds histogram\n" in text
+    bucket = 'lirc_command_duration_seconds_bucket{command="VERSION",le="%s"} 1\n'
+    assert bucket % "0.5" in text
+    assert bucket % "+Inf" in text
+    assert 'lirc_command_duration_seconds_count{command="VERSION"} 1\n' in text
+    assert 'lirc_commands_total{command="VERSION",outcome="success"} 1\n' in text
+    assert 'lirc_reply_lines_total{command="VERSION"} 7\n' in text
+    assert text.endswith("\n")
+
+
+def test_that_nothing_is_recorded_without_metrics(mock_client_and_connection):
+    """
+    lirc.Client.metrics
+
+    Ensure metrics are off unless they are passed in.
+    """
+    client, _ = mock_client_and_connection
+
+    assert client.metrics is None  # SUT
@@ -0,0 +1,129 @@
+import pytest
+
+from lirc.exceptions import LircdCommandFailureError
+
+
+def test_that_pipeline_sends_all_commands_in_one_write(
+    mock_client_and_connection, socket_payload
+):
+    """
+    lirc.Pipeline.execute
+
+    Ensure the queued commands are written to the socket
+    in a single call and their replies are returned in order.
+    """
+    client, connection = mock_client_and_connection
+    socket_payload(
+        b"BEGIN\nSEND_ONCE tv KEY_3 0\nSUCCESS\nEND\n"
+        b"BEGIN\nLIST\nSUCCESS\nDATA\n2\ntv\nreceiver\nEND\n"
+    )
+
+    with client.pipeline() as pipe:
+        pipe.send_once("tv", "KEY_3")
+        pipe.list_remotes()
+        results = pipe.execute()  # SUT
+
+    connection._socket.sendall.assert_called_once_with(
+        b"SEND_ONCE tv KEY_3 0\nLIST\n"
+    )
+    assert results == [[], ["tv", "receiver"]]
+
+
+def test_that_pipeline_is_emptied_after_execute(
+    mock_client_and_connection, socket_payload
+):
+    """
+    lirc.Pipeline.execute
+
+    Ensure the pipeline can be reused after executing it.
+    """
+    client, connection = mock_client_and_connection
+    socket_payload(b"BEGIN\nVERSION\nSUCCESS\nEND\n")
+    pipe = client.pipeline()
+    pipe.version()
+
+    pipe.execute()  # SUT
+
+    assert len(pipe) == 0
+    assert pipe.execute() == []
+
+
+def test_that_pipeline_raises_first_failure_after_reading_all_replies(
+    mock_client_and_connection,
+    socket_payload,
+):
+    """
+    lirc.Pipeline.execute
+
+    Ensure a failed command raises a LircdCommandFailureError
+    only once every reply has been read off the socket.
+    """
+    client, connection = mock_client_and_connection
+    socket_payload(
+        b"BEGIN\nSEND_ONCE tv KEY_3 0\nERROR\nDATA\n1\nunknown remote\nEND\n"
+        b"BEGIN\nSEND_ONCE tv KEY_7 0\nSUCCESS\nEND\n"
+    )
+    pipe = client.pipeline()
+    pipe.send_once("tv", "KEY_3")
+    pipe.send_once("tv", "KEY_7")
+
+    with pytest.raises(LircdCommandFailureError) as error:
+        pipe.execute()  # SUT
+
+    assert "SEND_ONCE tv KEY_3 0" in str(error)
+    assert connection._buffer_start == len(connection._buffer)
+
+
+def test_that_pipeline_can_return_failures_as_results(
+    mock_client_and_connection, socket_payload
+):
+    """
+    lirc.Pipeline.execute
+
+    Ensure failures are returned in place of their result
+    when raise_on_error is False.
+    """
+    client, connection = mock_client_and_connection
+    socket_payload(
+        b"BEGIN\nSEND_ONCE tv KEY_3 0\nERROR\nEND\n"
+        b"BEGIN\nSEND_ONCE tv KEY_7 0\nSUCCESS\nEND\n"
+    )
+    pipe = client.pipeline()
+    pipe.send_once("tv", "KEY_3")
+    pipe.send_once("tv", "KEY_7")
+
+    results = pipe.execute(raise_on_error=False)  # SUT
+
+    assert isinstance(results[0], LircdCommandFailureError)
+    assert results[1] == []
+
+
+def test_that_pipeline_tracks_send_start_for_send_stop(mock_client):
+    """
+    lirc.Pipeline.send_stop
+
+    Ensure send_stop with no arguments uses the remote and
+    key of the last send_start queued in the pipeline.
+    """
+    pipe = mock_client.pipeline()
+    pipe.send_start("tv", "KEY_VOLUMEUP")
+
+    pipe.send_stop()  # SUT
+
+    assert pipe.commands == ["SEND_START tv KEY_VOLUMEUP", "SEND_STOP tv KEY_VOLUMEUP"]
+
+
+@pytest.mark.parametrize(
+    "method", ["prepare", "key_table", "events", "subscribe", "pipeline"]
+)
+def test_that_pipeline_only_has_methods_that_queue_commands(mock_client, method):
+    """
+    lirc.Pipeline
+
+    Ensure the client methods that need a connection of their own
+    or a reply straight away are not on a pipeline.
+    """
+    pipe = mock_client.pipeline()  # SUT
+
+    assert hasattr(mock_client, method)
+    assert not hasattr(pipe, method)
@@ -0,0 +1,71 @@
+from unittest import mock
+
+import pytest
+
+from lirc.exceptions import LircdCommandFailureError
+
+
+def test_that_prepared_command_sends_the_encoded_command(
+    mock_client_and_connection, socket_payload
+):
+    """
+    lirc.Client.prepare
+
+    Ensure the prepared SEND_ONCE command is written as is,
+    every time the handle is called.
+    """
+    client, connection = mock_client_and_connection
+    socket_payload(b"BEGIN\nSEND_ONCE tv KEY_VOLUMEUP 2\nSUCCESS\nEND\n")
+    volume_up = client.prepare("tv", "KEY_VOLUMEUP", repeat_count=2)
+
+    for _ in range(3):
+        volume_up()  # SUT
+
+    assert volume_up.data == b"SEND_ONCE tv KEY_VOLUMEUP 2\n"
+    connection._socket.sendall.assert_has_calls(
+        [mock.call(b"SEND_ONCE tv KEY_VOLUMEUP 2\n")] * 3
+    )
+
+
+def test_that_prepared_command_reuses_its_parser(mock_client, socket_payload):
+    """
+    lirc.prepared_command.PreparedCommand.__call__
+
+    Ensure the same reply parser is reset and reused to parse the
+    reply of every call rather than creating a new one.
+    """
+    socket_payload(b"BEGIN\nSEND_ONCE tv KEY_MUTE 0\nSUCCESS\nEND\n")
+    mute = mock_client.prepare("tv", "KEY_MUTE")
+    parser = mute._parser
+
+    with mock.patch(
+        "lirc.connection.demultiplexer.ReplyPacketParser"
+    ) as patched_parser:
+        mute()  # SUT
+        mute()  # SUT
+
+    patched_parser.assert_not_called()
+    assert mute._parser is parser
+    assert parser.is_finished
+
+
+def test_that_prepared_command_raises_on_failure(mock_client, socket_payload):
+    """
+    lirc.prepared_command.PreparedCommand.__call__
+
+    Ensure a failed reply raises a LircdCommandFailureError, and
+    that the reused parser does not carry the failure over.
+    """
+    socket_payload(
+        b"BEGIN\nSEND_ONCE tv KEY_MUTE 0\nERROR\nDATA\n1\nbusy\nEND\n",
+        b"BEGIN\nSEND_ONCE tv KEY_MUTE 0\nSUCCESS\nEND\n",
+    )
+    mute = mock_client.prepare("tv", "KEY_MUTE")
+
+    with pytest.raises(LircdCommandFailureError) as error:
+        mute()  # SUT
+
+    assert "`SEND_ONCE tv KEY_MUTE 0` command sent to lircd failed: busy" in str(
+        error
+    )
+    assert mute() == []
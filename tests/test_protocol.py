@@ -0,0 +1,227 @@
+import selectors
+import socket
+import time
+
+import pytest
+
+from lirc import LircdConnection
+from lirc.button_event_parser import ButtonEvent
+from lirc.exceptions import (
+    LircdCommandFailureError,
+    LircdInvalidReplyPacketError,
+    LircdSocketError,
+)
+from lirc.protocol import LircdProtocol, NonBlockingConnection, Reply
+from lirc.testing import FakeLircd
+
+VERSION_REPLY = b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\nEND\n"
+VOLUME_UP = b"0000000000f40bf0 00 KEY_VOLUMEUP tv\n"
+
+
+@pytest.fixture
+def protocol():
+    return LircdProtocol()
+
+
+def test_that_commands_are_encoded_and_wait_on_replies(protocol):
+    """
+    lirc.protocol.LircdProtocol.send_command
+
+    Ensure a command is turned into the line to write to lircd
+    and waits on its reply.
+    """
+    data = protocol.send_command(" SEND_ONCE  tv KEY_POWER 0\n")  # SUT
+
+    assert data == b"SEND_ONCE tv KEY_POWER 0\n"
+    assert protocol.pending == ["SEND_ONCE tv KEY_POWER 0"]
+
+
+def test_that_replies_and_broadcasts_are_returned_in_order(protocol):
+    """
+    lirc.protocol.LircdProtocol.receive_data
+
+    Ensure replies, button events and SIGHUP packets are returned
+    in the order they were received, however the bytes are split.
+    """
+    protocol.send_command("VERSION")
+    protocol.send_command("LIST")
+    data = (
+        VOLUME_UP
+        + VERSION_REPLY
+        + b"BEGIN\nSIGHUP\nEND\n"
+        + b"BEGIN\nLIST\nSUCCESS\nDATA\n2\ntv\namp\nEND\n"
+    )
+
+    events = []
+    for index in range(len(data)):
+        events += protocol.receive_data(data[index : index + 1])  # SUT
+
+    assert events[0] == ButtonEvent(0xF40BF0, 0, "KEY_VOLUMEUP", "tv")
+    assert events[1] == Reply("VERSION", True, ["0.10.1"])
+    assert events[2].is_sighup
+    assert events[3] == Reply("LIST", True, ["tv", "amp"])
+    assert protocol.pending == []
+    assert protocol.buffered == 0
+
+
+def test_that_invalid_replies_fail_their_command_only(protocol):
+    """
+    lirc.protocol.LircdProtocol.receive_data
+
+    Ensure a reply that is not in the reply packet format fails
+    the command it belongs to, and the reply after it is read.
+    """
+    protocol.send_command("VERSION")
+    protocol.send_command("VERSION")
+
+    events = protocol.receive_data(
+        b"BEGIN\nVERSION\nMAYBE\nEND\n" + VERSION_REPLY
+    )  # SUT
+
+    invalid, valid = events
+    assert isinstance(invalid.error, LircdInvalidReplyPacketError)
+    with pytest.raises(LircdInvalidReplyPacketError):
+        invalid.result()
+    assert valid.result() == "0.10.1"
+
+
+def test_that_invalid_replies_fail_the_command_they_echo(protocol):
+    """
+    lirc.protocol.LircdProtocol.receive_data
+
+    Ensure a reply that is not in the reply packet format only fails
+    the command it echoes, and that none of its lines are taken for
+    button events, however the bytes are split.
+    """
+    protocol.send_command("VERSION")
+    data = (
+        b"BEGIN\nDRV_OPTION a b\nSUCCESS\nDATA\nx\n"
+        + VOLUME_UP
+        + b"END\n"
+        + VERSION_REPLY
+    )
+
+    events = []
+    for index in range(len(data)):
+        events += protocol.receive_data(data[index : index + 1])  # SUT
+
+    assert events == [Reply("VERSION", True, ["0.10.1"])]
+    assert protocol.pending == []
+
+
+def test_that_replies_to_abandoned_commands_are_thrown_away(protocol):
+    """
+    lirc.protocol.LircdProtocol.abandon
+
+    Ensure the late replies to commands that were given up on
+    are not returned, and the commands after them still are.
+    """
+    protocol.send_command("VERSION")
+
+    abandoned = protocol.abandon()  # SUT
+    protocol.send_command("VERSION")
+
+    assert abandoned == ["VERSION"]
+    assert protocol.pending == ["VERSION"]
+    events = protocol.receive_data(
+        VERSION_REPLY + VERSION_REPLY.replace(b"0.10.1", b"0.10.2")
+    )
+    assert events == [Reply("VERSION", True, ["0.10.2"])]
+
+
+def test_that_commands_lircd_skipped_are_failed(protocol):
+    """
+    lirc.protocol.LircdProtocol.receive_data
+
+    Ensure commands sent before the one a reply echoes are failed,
+    since lircd replies in order, and unknown replies are ignored.
+    """
+    protocol.send_command("LIST")
+    protocol.send_command("VERSION")
+
+    events = protocol.receive_data(
+        b"BEGIN\nDRV_OPTION a b\nSUCCESS\nEND\n" + VERSION_REPLY
+    )  # SUT
+
+    assert [event.command for event in events] == ["LIST", "VERSION"]
+    assert isinstance(events[0].error, LircdInvalidReplyPacketError)
+    assert events[1].result() == "0.10.1"
+
+
+def test_that_failed_replies_raise_from_result():
+    """
+    lirc.protocol.Reply.result
+
+    Ensure the result of a failed command raises like the
+    client's commands do.
+    """
+    reply = Reply("SEND_ONCE tv KEY_UP 0", False, ['unknown remote: "tv"'])
+
+    with pytest.raises(LircdCommandFailureError) as error:
+        reply.result()  # SUT
+
+    assert 'failed: unknown remote: "tv"' in str(error)
+
+
+def test_that_a_selector_drives_many_connections_without_blocking():
+    """
+    lirc.protocol.NonBlockingConnection
+
+    Ensure connections registered with a selector send their
+    commands and receive the replies and button presses.
+    """
+    latency, count, wait = 0.1, 3, 5
+    with FakeLircd({"tv": ["KEY_POWER"]}, latency=latency) as lircd:
+        connections = [
+            NonBlockingConnection(lircd.connection()) for _ in range(count)
+        ]
+        selector = selectors.DefaultSelector()
+        for connection in connections:
+            connection.send_command("SEND_ONCE tv KEY_POWER 0")  # SUT
+            assert connection.wants_write
+            selector.register(connection, selectors.EVENT_READ | selectors.EVENT_WRITE)
+
+        replies = []
+        start = time.monotonic()
+        while len(replies) < count and time.monotonic() - start < wait:
+            for key, mask in selector.select(1):
+                connection = key.fileobj
+                if mask & selectors.EVENT_WRITE and connection.flush():  # SUT
+                    selector.modify(connection, selectors.EVENT_READ)
+                if mask & selectors.EVENT_READ:
+                    replies += connection.receive()  # SUT
+
+        assert replies == [Reply("SEND_ONCE tv KEY_POWER 0", True, [])] * count
+        # Sent one after the other, the replies would take 0.3 seconds.
+        assert time.monotonic() - start < latency * (count - 0.5)
+
+        lircd.press("tv", "KEY_POWER")
+        events = []
+        while not events and time.monotonic() - start < wait:
+            selector.select(1)
+            events = connections[0].receive()
+        assert events == [ButtonEvent(0, 0, "KEY_POWER", "tv")]
+
+        selector.close()
+        for connection in connections:
+            connection.close()
+
+
+def test_that_a_closed_connection_raises():
+    """
+    lirc.protocol.NonBlockingConnection.receive
+
+    Ensure reading with nothing waiting on the socket returns no
+    events, and lircd closing the connection raises a LircdSocketError.
+    """
+    ours, theirs = socket.socketpair()
+    lircd_connection = LircdConnection(socket=ours)
+    lircd_connection.connect = lambda: None
+    connection = NonBlockingConnection(lircd_connection)
+
+    assert connection.receive() == []  # SUT
+
+    theirs.close()
+    with pytest.raises(LircdSocketError):
+        connection.receive()  # SUT
+    connection.close()
@@ -204,3 +204,153 @@ def test_command_state_raises_exception_on_empty_line(line):
 
     with pytest.raises(LircdInvalidReplyPacketError):
         parser._command(line)
+
+
+def test_feed_bytes_parses_every_complete_packet():
+    """
+    lirc.reply_packet_parser.ReplyPacketParser.feed_bytes
+
+    Ensure every complete packet in the buffer is returned, along
+    with how many bytes they took up, and a partial packet at the
+    end of the buffer is left alone.
+    """
+    complete = (
+        b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\nEND\n"
+        b"BEGIN\nSIGHUP\nEND\n"
+        b"BEGIN\nSEND_ONCE remote key_power 0\nERROR\nEND\n"
+    )
+    partial = b"BEGIN\nLIST remote\nSUCCESS\nDATA\n2\n0000000000000001 KEY_POWER\n"
+
+    packets, consumed = ReplyPacketParser.feed_bytes(complete + partial)  # SUT
+
+    assert consumed == len(complete)
+    assert [packet.command for packet in packets] == [
+        "VERSION",
+        "SIGHUP",
+        "SEND_ONCE remote key_power 0",
+    ]
+    assert [packet.success for packet in packets] == [True, False, False]
+    assert [packet.is_sighup for packet in packets] == [False, True, False]
+    assert packets[0].data == ["0.10.1"]
+
+
+def test_feed_bytes_leaves_data_undecoded_until_accessed():
+    """
+    lirc.reply_packet_parser.ReplyPacket.data
+
+    Ensure the data lines are kept as raw bytes and decoded
+    into the same lines feed() would give on access.
+    """
+    packet = (
+        b"BEGIN\nLIST remote\nSUCCESS\nDATA\n2\n"
+        b"0000000000000001 KEY_POWER\n0000000000000002 KEY_MUTE\nEND\n"
+    )
+
+    (reply,), _ = ReplyPacketParser.feed_bytes(bytearray(packet))  # SUT
+
+    assert reply.raw_data == (
+        b"0000000000000001 KEY_POWER\n0000000000000002 KEY_MUTE\n"
+    )
+    assert reply.data == ["0000000000000001 KEY_POWER", "0000000000000002 KEY_MUTE"]
+
+
+@pytest.mark.parametrize(
+    "buffer",
+    [
+        b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\n",
+        b"BEGIN\nVERSION\nSUCCESS\nDATA\n",
+        b"BEGIN\nSIGHUP\n",
+        b"BEGI",
+        b"",
+    ],
+)
+def test_feed_bytes_consumes_nothing_for_partial_packets(buffer):
+    """
+    lirc.reply_packet_parser.ReplyPacketParser.feed_bytes
+
+    Ensure that a packet which has not been fully received
+    yet is not returned or consumed.
+    """
+    packets, consumed = ReplyPacketParser.feed_bytes(buffer)  # SUT
+
+    assert packets == []
+    assert consumed == 0
+
+
+@pytest.mark.parametrize(
+    "buffer",
+    [
+        b"NOTBEGIN\n",
+        b"BEGIN\nSIGHUP\ninvalid-expected-end\n",
+        b"BEGIN\nVERSION\nnot-SUCCESS-or-ERROR\nEND\n",
+        b"BEGIN\nVERSION\nSUCCESS\nnot-DATA-or-END\n",
+        b"BEGIN\nVERSION\nSUCCESS\nDATA\nnot-a-number\n",
+        b"BEGIN\nVERSION\nSUCCESS\nDATA\n1\n0.10.1\ninvalid-expected-end\n",
+    ],
+)
+def test_feed_bytes_raises_error_on_invalid_packets(buffer):
+    """
+    lirc.reply_packet_parser.ReplyPacketParser.feed_bytes
+
+    Ensure that invalid reply packets raise an error.
+    """
+    with pytest.raises(LircdInvalidReplyPacketError):
+        ReplyPacketParser.feed_bytes(buffer)  # SUT
+
+
+def test_feed_bytes_keeps_the_packets_before_an_invalid_one():
+    """
+    lirc.reply_packet_parser.ReplyPacketParser.feed_bytes
+
+    Ensure the packets parsed before an invalid one, and the bytes
+    they took up, are on the error raised for it.
+    """
+    valid = b"BEGIN\nSIGHUP\nEND\nBEGIN\nVERSION\nSUCCESS\nEND\n"
+
+    with pytest.raises(LircdInvalidReplyPacketError) as error:
+        ReplyPacketParser.feed_bytes(valid + b"BEGIN\nLIST\nNOPE\nEND\n")  # SUT
+
+    assert [packet.command for packet in error.value.packets] == ["SIGHUP", "VERSION"]
+    assert error.value.consumed == len(valid)
+
+
+def test_reset_allows_parser_to_be_reused():
+    """
+    lirc.reply_packet_parser.ReplyPacketParser.reset
+
+    Ensure a parser that finished a packet can read another
+    one after being reset.
+    """
+    parser = ReplyPacketParser()
+    for line in ["BEGIN", "VERSION", "ERROR", "DATA", "1", "oops", "END"]:
+        parser.feed(line)
+
+    parser.reset()  # SUT
+
+    assert not parser.is_finished
+    assert parser.data == []
+    for line in ["BEGIN", "VERSION", "SUCCESS", "END"]:
+        parser.feed(line)
+    assert parser.success
+
+
+def test_feed_bytes_can_skip_broadcasts_between_packets():
+    """
+    lirc.reply_packet_parser.ReplyPacketParser.feed_bytes
+
+    Ensure button event lines between packets are skipped over
+    when skip_broadcasts is set.
+    """
+    buffer = (
+        b"0000000000f40bf0 00 KEY_VOLUMEUP tv\n"
+        b"BEGIN\nVERSION\nSUCCESS\nEND\n"
+        b"0000000000f40bf0 01 KEY_VOLUMEUP tv\n"
+        b"BEGIN\nVERS"
+    )
+
+    packets, consumed = ReplyPacketParser.feed_bytes(
+        buffer, skip_broadcasts=True
+    )  # SUT
+
+    assert [packet.command for packet in packets] == ["VERSION"]
+    assert buffer[consumed:] == b"BEGIN\nVERS"
@@ -0,0 +1,166 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from lirc import Client
+from lirc.exceptions import LircdCommandFailureError
+from lirc.router import RemoteRouter
+from lirc.testing import FakeLircd
+
+
+def mock_daemon(remotes, delay=0.0):
+    """Create a mock client for a daemon with some remotes whose
+    commands each take a while.
+    """
+    client = mock.MagicMock(spec=Client)
+    # Like the client, a single remote is returned as a string.
+    client.list_remotes.return_value = remotes[0] if len(remotes) == 1 else remotes
+    client.send_once.side_effect = lambda *args: time.sleep(delay)
+    return client
+
+
+def test_that_remotes_are_indexed_by_daemon():
+    """
+    lirc.router.RemoteRouter.__init__
+
+    Ensure every daemon's remotes are routed to its client.
+    """
+    living_room = mock_daemon(["tv", "soundbar"])
+    bedroom = mock_daemon(["projector"])
+
+    with RemoteRouter([living_room, bedroom]) as router:  # SUT
+        assert router.remotes == ["tv", "soundbar", "projector"]
+        assert router.client_for("soundbar") is living_room
+        assert router.client_for("projector") is bedroom
+
+
+def test_that_a_remote_on_two_daemons_is_an_error():
+    """
+    lirc.router.RemoteRouter.__init__
+
+    Ensure a remote that can't be routed to one daemon is an
+    error, and that the clients are closed.
+    """
+    clients = [mock_daemon(["tv"]), mock_daemon(["tv"])]
+
+    with pytest.raises(ValueError, match="tv"):
+        RemoteRouter(clients)  # SUT
+
+    for client in clients:
+        client.close.assert_called_once()
+
+
+def test_that_commands_are_sent_with_the_right_client():
+    """
+    lirc.router.RemoteRouter.send_once
+    lirc.router.RemoteRouter.send_start
+    lirc.router.RemoteRouter.send_stop
+
+    Ensure each command is sent by the daemon with the remote.
+    """
+    living_room = mock_daemon(["tv"])
+    bedroom = mock_daemon(["projector"])
+
+    with RemoteRouter([living_room, bedroom]) as router:
+        router.send_once("tv", "KEY_POWER", 2).result()  # SUT
+        router.send_start("projector", "KEY_UP").result()  # SUT
+        router.send_stop("projector", "KEY_UP").result()  # SUT
+
+    living_room.send_once.assert_called_once_with("tv", "KEY_POWER", 2)
+    bedroom.send_start.assert_called_once_with("projector", "KEY_UP")
+    bedroom.send_stop.assert_called_once_with("projector", "KEY_UP")
+
+
+def test_that_an_unknown_remote_is_an_error():
+    """
+    lirc.router.RemoteRouter.send_once
+
+    Ensure a remote no daemon has is an error straight away.
+    """
+    with RemoteRouter([mock_daemon(["tv"])]) as router:
+        with pytest.raises(ValueError, match="radio"):
+            router.send_once("radio", "KEY_POWER")  # SUT
+
+
+def test_that_a_slow_daemon_does_not_hold_up_the_others():
+    """
+    lirc.router.RemoteRouter.send_once
+
+    Ensure commands for a fast daemon finish while a slow daemon
+    is still working through its queue, and that each daemon's
+    commands run in order.
+    """
+    released = threading.Event()
+    slow = mock_daemon(["tv"])
+    slow.send_once.side_effect = lambda *args: released.wait(5)
+    fast = mock_daemon(["projector"])
+
+    with RemoteRouter([slow, fast]) as router:
+        stuck = [router.send_once("tv", f"KEY_{n}") for n in range(3)]
+        sent = [router.send_once("projector", f"KEY_{n}") for n in range(3)]
+
+        for future in sent:
+            future.result(timeout=1)  # SUT
+        assert not any(future.done() for future in stuck)
+        released.set()
+
+    assert [call.args[1] for call in slow.send_once.call_args_list] == [
+        "KEY_0",
+        "KEY_1",
+        "KEY_2",
+    ]
+
+
+def test_that_failures_are_raised_by_the_future():
+    """
+    lirc.router.RemoteRouter.send_once
+
+    Ensure a failed command is raised by its future, and that
+    the daemon's worker keeps going afterwards.
+    """
+    client = mock_daemon(["tv"])
+    client.send_once.side_effect = [LircdCommandFailureError("failed"), None]
+
+    with RemoteRouter([client]) as router:
+        with pytest.raises(LircdCommandFailureError):
+            router.send_once("tv", "KEY_POWER").result()  # SUT
+        assert router.send_once("tv", "KEY_POWER").result() is None
+
+
+def test_that_refresh_picks_up_moved_remotes():
+    """
+    lirc.router.RemoteRouter.refresh
+
+    Ensure the index is rebuilt from the daemons' remotes.
+    """
+    living_room = mock_daemon(["tv"])
+    bedroom = mock_daemon([])
+
+    with RemoteRouter([living_room, bedroom]) as router:
+        living_room.list_remotes.return_value = []
+        bedroom.list_remotes.return_value = ["tv"]
+
+        router.refresh()  # SUT
+
+        assert router.client_for("tv") is bedroom
+
+
+def test_that_a_daemon_with_one_remote_is_routed():
+    """
+    lirc.router.RemoteRouter.refresh
+
+    Ensure a daemon whose LIST reply has a single line is routed
+    to by the whole name of its remote.
+    """
+    with FakeLircd({"tv": ["KEY_POWER"]}) as living_room, FakeLircd(
+        {"projector": ["KEY_POWER"], "screen": ["KEY_UP"]}
+    ) as bedroom:
+        with RemoteRouter([living_room.client(), bedroom.client()]) as router:
+            router.refresh()  # SUT
+
+            assert router.remotes == ["tv", "projector", "screen"]
+            router.send_once("tv", "KEY_POWER").result(5)
+
+        assert living_room.commands[-1] == "SEND_ONCE tv KEY_POWER 0"
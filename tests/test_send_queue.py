@@ -0,0 +1,98 @@
+import pytest
+
+from lirc.commands import transmitter_mask
+from lirc.exceptions import LircdCommandFailureError
+from lirc.send_queue import SendQueue
+from lirc.testing import FakeLircd, Fault
+
+
+@pytest.fixture
+def lircd():
+    with FakeLircd({"tv": ["KEY_POWER", "KEY_MUTE"]}) as lircd:
+        yield lircd
+
+
+@pytest.fixture
+def client(lircd):
+    client = lircd.client()
+    yield client
+    client.close()
+
+
+def test_that_sends_are_grouped_by_transmitters(lircd, client):
+    """
+    lirc.send_queue.SendQueue.flush
+
+    Ensure the keys for the same transmitters are sent together
+    in the order they were queued, changing transmitters once
+    for each group.
+    """
+    with SendQueue(client) as sends:
+        sends.send_once("tv", "KEY_POWER", [1])
+        sends.send_once("tv", "KEY_POWER", [2])
+        sends.send_once("tv", "KEY_MUTE", [1], repeat_count=2)
+        sends.send_once("tv", "KEY_MUTE", 2)
+
+        results = sends.flush()  # SUT
+
+        assert len(sends) == 0
+    assert results == [None] * 4
+    assert lircd.commands == [
+        "SET_TRANSMITTERS 1",
+        "SEND_ONCE tv KEY_POWER 0",
+        "SEND_ONCE tv KEY_MUTE 2",
+        "SET_TRANSMITTERS 2",
+        "SEND_ONCE tv KEY_POWER 0",
+        "SEND_ONCE tv KEY_MUTE 0",
+    ]
+    assert lircd.transmitter_mask == transmitter_mask([2])
+
+
+def test_that_the_transmitters_already_set_go_first(lircd, client):
+    """
+    lirc.send_queue.SendQueue.flush
+
+    Ensure the keys for the transmitters the client already set
+    are sent first without setting them again, and the client
+    knows which transmitters were set last.
+    """
+    client.set_transmitters([3])
+    sends = SendQueue(client)
+    sends.send_once("tv", "KEY_POWER", [1])
+    sends.send_once("tv", "KEY_MUTE", [3])
+
+    sends.flush()  # SUT
+    client.set_transmitters([1])
+
+    assert lircd.commands == [
+        "SET_TRANSMITTERS 4",
+        "SEND_ONCE tv KEY_MUTE 0",
+        "SET_TRANSMITTERS 1",
+        "SEND_ONCE tv KEY_POWER 0",
+    ]
+
+
+def test_that_failures_are_returned_for_their_keys(lircd, client):
+    """
+    lirc.send_queue.SendQueue.flush
+
+    Ensure a key that failed, or whose transmitters failed to be
+    set, has the failure in its place, and that the first failure
+    is raised unless asked not to.
+    """
+    lircd.inject(Fault.ERROR, "SET_TRANSMITTERS")
+    lircd.inject(Fault.ERROR, "SEND_ONCE")
+    sends = SendQueue(client)
+    for transmitters in ([1], [2], [1], [2]):
+        sends.send_once("tv", "KEY_POWER", transmitters)
+
+    results = sends.flush(raise_on_error=False)  # SUT
+
+    assert "SEND_ONCE" in str(results[0])
+    assert "SET_TRANSMITTERS 1" in str(results[2])
+    assert results[1] is None and results[3] is None
+
+    lircd.inject(Fault.ERROR, "SEND_ONCE")
+    sends.send_once("tv", "KEY_POWER", [2])
+    with pytest.raises(LircdCommandFailureError):
+        sends.flush()  # SUT
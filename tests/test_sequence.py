@@ -0,0 +1,189 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from lirc import Client
+from lirc.exceptions import LircdCommandFailureError
+from lirc.sequence import (
+    Delay,
+    SendOnce,
+    SendStart,
+    SendStop,
+    Sequence,
+    SetTransmitters,
+)
+
+
+@pytest.fixture
+def client():
+    return mock.Mock(spec=Client)
+
+
+def test_that_steps_run_in_order_with_the_client(client):
+    """
+    lirc.sequence.Sequence.run
+
+    Ensure each step calls the matching client method.
+    """
+    sequence = Sequence(
+        client,
+        [
+            SetTransmitters([1, 2]),
+            SendOnce("tv", "KEY_POWER"),
+            SendStart("tv", "KEY_VOLUMEUP"),
+            SendStop(),
+        ],
+    )
+
+    timings = sequence.run()  # SUT
+
+    assert client.mock_calls == [
+        mock.call.set_transmitters([1, 2]),
+        mock.call.send_once("tv", "KEY_POWER", 0),
+        mock.call.send_start("tv", "KEY_VOLUMEUP"),
+        mock.call.send_stop("", ""),
+    ]
+    assert [timing.index for timing in timings] == [0, 1, 2, 3]
+
+
+def test_that_plan_offsets_are_the_sum_of_the_delays_before_each_step(client):
+    """
+    lirc.sequence.Sequence.plan
+
+    Ensure each step is planned after all the delays before it.
+    """
+    sequence = Sequence(
+        client,
+        [
+            SendOnce("tv", "KEY_POWER"),
+            Delay(1.5),
+            SendOnce("tv", "KEY_INPUT"),
+            Delay(0.2),
+            SendOnce("tv", "KEY_3"),
+            SendOnce("tv", "KEY_7"),
+        ],
+    )
+
+    plan = sequence.plan()  # SUT
+
+    assert [offset for offset, _ in plan] == pytest.approx([0, 1.5, 1.7, 1.7])
+    assert sequence.duration == pytest.approx(1.7)
+
+
+def test_that_command_latency_does_not_add_up(client):
+    """
+    lirc.sequence.Sequence.run
+
+    Ensure slow commands do not push back the steps after
+    them, as long as they are quicker than the delays.
+    """
+    latency, max_drift = 0.02, 0.015
+    client.send_once.side_effect = lambda *args: time.sleep(latency)
+    steps = []
+    for _ in range(5):
+        steps += [SendOnce("tv", "KEY_VOLUMEUP"), Delay(0.03)]
+
+    timings = Sequence(client, steps).run()  # SUT
+
+    assert [timing.planned for timing in timings] == pytest.approx(
+        [0, 0.03, 0.06, 0.09, 0.12]
+    )
+    assert all(timing.latency >= latency for timing in timings)
+    assert all(0 <= timing.drift < max_drift for timing in timings)
+
+
+def test_that_cancel_stops_the_sequence_and_held_keys(client):
+    """
+    lirc.sequence.Sequence.cancel
+
+    Ensure cancelling a running sequence skips the steps left
+    and stops the keys that are still being held.
+    """
+    sequence = Sequence(
+        client,
+        [SendStart("tv", "KEY_VOLUMEUP"), Delay(10), SendStop()],
+    )
+    threading.Timer(0.02, sequence.cancel).start()
+
+    timings = sequence.run()  # SUT
+
+    assert sequence.cancelled
+    assert len(timings) == 1
+    assert client.mock_calls == [
+        mock.call.send_start("tv", "KEY_VOLUMEUP"),
+        mock.call.send_stop("tv", "KEY_VOLUMEUP"),
+    ]
+
+
+def test_that_failed_steps_stop_held_keys(client):
+    """
+    lirc.sequence.Sequence.run
+
+    Ensure a failing step stops the sequence and the keys
+    that are being held, and the failure is raised.
+    """
+    client.send_once.side_effect = LircdCommandFailureError("failed")
+    sequence = Sequence(
+        client, [SendStart("tv", "KEY_VOLUMEUP"), SendOnce("tv", "KEY_POWER")]
+    )
+
+    with pytest.raises(LircdCommandFailureError):
+        sequence.run()  # SUT
+
+    client.send_stop.assert_called_once_with("tv", "KEY_VOLUMEUP")
+
+
+def test_that_a_failed_stop_does_not_hide_the_failed_step(client):
+    """
+    lirc.sequence.Sequence.run
+
+    Ensure the failure of a step is raised even when stopping the
+    keys held afterwards fails too, with that failure chained to it.
+    """
+    client.send_once.side_effect = LircdCommandFailureError("step failed")
+    client.send_stop.side_effect = LircdCommandFailureError("stop failed")
+    sequence = Sequence(
+        client, [SendStart("tv", "KEY_VOLUMEUP"), SendOnce("tv", "KEY_POWER")]
+    )
+
+    with pytest.raises(LircdCommandFailureError, match="step failed") as error:
+        sequence.run()  # SUT
+
+    assert str(error.value.__context__) == "stop failed"
+
+
+def test_that_a_cancelled_sequence_runs_again(client):
+    """
+    lirc.sequence.Sequence.run
+
+    Ensure a sequence that was cancelled runs all of its steps the
+    next time it is run.
+    """
+    sequence = Sequence(client, [Delay(0.05), SendOnce("tv", "KEY_POWER")])
+    threading.Timer(0.01, sequence.cancel).start()
+    assert sequence.run() == []
+    assert sequence.cancelled
+
+    timings = sequence.run()  # SUT
+
+    assert len(timings) == 1
+    assert not sequence.cancelled
+    client.send_once.assert_called_once_with("tv", "KEY_POWER", 0)
+
+
+def test_that_compensating_latency_sends_steps_early(client):
+    """
+    lirc.sequence.Sequence.run
+
+    Ensure steps are sent early by the average latency so far
+    when latency compensation is on.
+    """
+    latency = 0.05
+    client.send_once.side_effect = lambda *args: time.sleep(latency)
+    steps = [SendOnce("tv", "KEY_3"), Delay(0.1), SendOnce("tv", "KEY_7")]
+
+    timings = Sequence(client, steps, compensate_latency=True).run()  # SUT
+
+    assert timings[1].drift < -latency / 2
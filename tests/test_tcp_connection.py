@@ -0,0 +1,244 @@
+import socket
+import threading
+from unittest import mock
+
+import pytest
+
+from lirc import Client, TcpConnection
+from lirc.connection.tcp_connection import Backoff
+from lirc.exceptions import LircdConnectionError
+
+KEEPALIVE_IDLE = 45
+
+
+class FakeTcpLircd:
+    """A TCP server that replies SUCCESS to every command and
+    records them, and that can drop all of its connections as
+    if lircd restarted.
+    """
+
+    def __init__(self):
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.address = self.listener.getsockname()
+        self.commands = []
+        self.connections = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn.makefile("rb") as lines:
+            try:
+                for line in lines:
+                    command = line.strip()
+                    self.commands.append(command.decode())
+                    conn.sendall(b"BEGIN\n%s\nSUCCESS\nEND\n" % command)
+            except OSError:
+                return
+
+    def restart(self):
+        for conn in self.connections:
+            conn.shutdown(socket.SHUT_RDWR)
+            conn.close()
+        self.connections.clear()
+        self.commands.clear()
+
+    def close(self):
+        self.restart()
+        self.listener.close()
+
+
+@pytest.fixture
+def lircd():
+    server = FakeTcpLircd()
+    yield server
+    server.close()
+
+
+def test_that_socket_options_are_set(lircd):
+    """
+    lirc.connection.tcp_connection.TcpConnection.connect
+
+    Ensure Nagle's algorithm is turned off and keepalives are on.
+    """
+    connection = TcpConnection(lircd.address, keepalive_idle=KEEPALIVE_IDLE)
+
+    connection.connect()  # SUT
+
+    sock = connection.socket
+    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+    assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        idle = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE)
+        assert idle == KEEPALIVE_IDLE
+    connection.close()
+
+
+def test_that_keepalives_can_be_turned_off(lircd):
+    """
+    lirc.connection.tcp_connection.TcpConnection.connect
+
+    Ensure keepalives are not turned on when the idle time is 0.
+    """
+    connection = TcpConnection(lircd.address, keepalive_idle=0)
+
+    connection.connect()  # SUT
+
+    assert not connection.socket.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+    connection.close()
+
+
+def test_that_an_ipv6_address_connects():
+    """
+    lirc.connection.tcp_connection.TcpConnection.connect
+
+    Ensure lircd listening on an IPv6 address can be connected to.
+    """
+    try:
+        listener = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        listener.bind(("::1", 0))
+    except OSError:
+        pytest.skip("IPv6 is not available")
+    listener.listen()
+    connection = TcpConnection(listener.getsockname()[:2])
+
+    connection.connect()  # SUT
+
+    assert connection.socket.family == socket.AF_INET6
+    connection.close()
+    listener.close()
+
+
+def test_that_reconnect_backs_off_exponentially():
+    """
+    lirc.connection.tcp_connection.TcpConnection.reconnect
+
+    Ensure the wait between attempts doubles up to the limit and
+    that an error is raised once every attempt failed.
+    """
+    unused = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    unused.bind(("127.0.0.1", 0))
+    address = unused.getsockname()
+    unused.close()
+    connection = TcpConnection(
+        address, backoff=Backoff(attempts=5, delay=0.1, max_delay=0.3)
+    )
+
+    with mock.patch("lirc.connection.tcp_connection.time.sleep") as sleep:
+        with pytest.raises(LircdConnectionError, match="after 5 attempts"):
+            connection.reconnect()  # SUT
+
+    assert [call.args[0] for call in sleep.call_args_list] == [0.1, 0.2, 0.3, 0.3]
+
+
+def test_that_the_client_reconnects_after_lircd_restarts(lircd):
+    """
+    lirc.client.Client.send_once
+
+    Ensure a command sent after lircd restarted reconnects, sets
+    the transmitters and repeating key again, and is then sent.
+    """
+    connection = TcpConnection(lircd.address)
+    client = Client(connection)
+    client.set_transmitters([1, 2])
+    client.send_start("tv", "KEY_VOLUMEUP")
+    lircd.restart()
+
+    client.send_once("tv", "KEY_POWER")  # SUT
+
+    assert connection.reconnects == 1
+    assert lircd.commands == [
+        "SET_TRANSMITTERS 3",
+        "SEND_START tv KEY_VOLUMEUP",
+        "SEND_ONCE tv KEY_POWER 0",
+    ]
+    client.close()
+
+
+def test_that_a_stopped_key_is_not_started_again(lircd):
+    """
+    lirc.client.Client.send_once
+
+    Ensure only state lircd still had is set after reconnecting.
+    """
+    connection = TcpConnection(lircd.address)
+    client = Client(connection)
+    client.send_start("tv", "KEY_VOLUMEUP")
+    client.send_stop()
+    lircd.restart()
+
+    client.version()  # SUT
+
+    assert lircd.commands == ["VERSION"]
+    client.close()
+
+
+def test_that_keys_still_repeating_are_started_again(lircd):
+    """
+    lirc.client.Client.send_once
+
+    Ensure stopping one of several repeating keys only stops that
+    key from being started again after reconnecting.
+    """
+    connection = TcpConnection(lircd.address)
+    client = Client(connection)
+    client.send_start("tv", "KEY_VOLUMEUP")
+    client.send_start("amp", "KEY_VOLUMEDOWN")
+    client.send_stop("tv", "KEY_VOLUMEUP")
+    lircd.restart()
+
+    client.version()  # SUT
+
+    assert lircd.commands == ["SEND_START amp KEY_VOLUMEDOWN", "VERSION"]
+    client.close()
+
+
+def test_that_keys_started_in_a_pipeline_are_started_again(lircd):
+    """
+    lirc.client.Client.pipeline
+
+    Ensure keys a pipeline started repeating are started again after
+    reconnecting, unless a later pipeline stopped them.
+    """
+    client = Client(TcpConnection(lircd.address))
+    with client.pipeline() as pipe:
+        pipe.send_start("tv", "KEY_VOLUMEUP")
+        pipe.send_start("amp", "KEY_VOLUMEDOWN")
+        pipe.execute()  # SUT
+    with client.pipeline() as pipe:
+        pipe.send_stop("tv", "KEY_VOLUMEUP")
+        pipe.execute()  # SUT
+    lircd.restart()
+
+    client.version()
+
+    assert lircd.commands == ["SEND_START amp KEY_VOLUMEDOWN", "VERSION"]
+    client.close()
+
+
+def test_that_pipelines_are_sent_again_after_reconnecting(lircd):
+    """
+    lirc.client.Client.pipeline
+
+    Ensure a pipeline executed after lircd restarted is sent again
+    on the new connection.
+    """
+    client = Client(TcpConnection(lircd.address))
+    lircd.restart()
+
+    with client.pipeline() as pipe:
+        pipe.send_once("tv", "KEY_1")
+        pipe.send_once("tv", "KEY_2")
+        assert pipe.execute() == [[], []]  # SUT
+
+    assert lircd.commands == ["SEND_ONCE tv KEY_1 0", "SEND_ONCE tv KEY_2 0"]
+    client.close()
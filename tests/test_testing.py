@@ -0,0 +1,176 @@
+import threading
+
+import pytest
+
+from lirc import Client, ClientPool
+from lirc.button_event_parser import ButtonEvent
+from lirc.commands import transmitter_mask
+from lirc.exceptions import LircdCommandFailureError, LircdInvalidReplyPacketError
+from lirc.testing import FakeLircd, Fault
+
+REMOTES = {"tv": ["KEY_POWER", "KEY_UP"], "soundbar": ["KEY_MUTE"]}
+
+
+@pytest.fixture
+def lircd():
+    with FakeLircd(REMOTES) as server:
+        yield server
+
+
+def test_that_commands_are_replied_to_over_tcp(lircd):
+    """
+    lirc.testing.FakeLircd
+
+    Ensure a client gets the replies real lircd would send.
+    """
+    client = lircd.client()
+
+    assert client.list_remotes() == ["tv", "soundbar"]  # SUT
+    assert client.list_remote_keys("tv") == [  # SUT
+        "0000000000000001 KEY_POWER",
+        "0000000000000002 KEY_UP",
+    ]
+    assert client.version() == "0.10.1"  # SUT
+    client.send_once("tv", "KEY_POWER")  # SUT
+    client.set_transmitters([1, 3])  # SUT
+
+    assert lircd.transmitter_mask == transmitter_mask([1, 3])
+    assert lircd.commands[-2:] == ["SEND_ONCE tv KEY_POWER 0", "SET_TRANSMITTERS 5"]
+    client.close()
+
+
+def test_that_commands_are_replied_to_over_a_unix_socket(tmp_path):
+    """
+    lirc.testing.FakeLircd
+
+    Ensure the fake lircd can listen on a unix socket.
+    """
+    with FakeLircd(REMOTES, address=str(tmp_path / "lircd")) as lircd:
+        client = lircd.client()
+
+        assert client.list_remote_keys("soundbar") == "0000000000000001 KEY_MUTE"
+        client.close()
+
+
+def test_that_unknown_keys_and_stopping_nothing_fail(lircd):
+    """
+    lirc.testing.FakeLircd
+
+    Ensure commands lircd would refuse fail.
+    """
+    client = lircd.client()
+
+    with pytest.raises(LircdCommandFailureError, match="unknown remote"):
+        client.send_once("radio", "KEY_POWER")  # SUT
+    with pytest.raises(LircdCommandFailureError, match="unknown command"):
+        client.send_once("tv", "KEY_RED")  # SUT
+    with pytest.raises(LircdCommandFailureError, match="not repeating"):
+        client.send_stop("tv", "KEY_UP")  # SUT
+
+    client.send_start("tv", "KEY_UP")
+    assert lircd.repeating == ("tv", "KEY_UP")
+    client.send_stop()
+    assert lircd.repeating is None
+    client.close()
+
+
+def test_that_chunked_replies_and_broadcasts_are_read(lircd):
+    """
+    lirc.testing.FakeLircd.press
+
+    Ensure replies split into single bytes, with button presses
+    broadcast around them, are read correctly.
+    """
+    lircd.chunk_size = 1
+    client = lircd.client()
+    client.version()
+    lircd.press("tv", "KEY_UP", repeat=1)
+
+    assert client.list_remotes() == ["tv", "soundbar"]  # SUT
+    client.simulate("soundbar", "KEY_MUTE")  # SUT
+
+    events = client.events()
+    assert next(events) == ButtonEvent(0, 1, "KEY_UP", "tv")
+    assert next(events) == ButtonEvent(0, 0, "KEY_MUTE", "soundbar")
+    client.close()
+
+
+def test_that_a_sighup_before_a_reply_drops_the_catalog_cache(lircd):
+    """
+    lirc.testing.FakeLircd.sighup
+
+    Ensure a SIGHUP broadcast right before a reply is sorted out
+    and drops the client's catalog cache.
+    """
+    client = lircd.client(catalog_cache=True)
+    client.list_remotes()
+    lircd.sighup({"projector": ["KEY_POWER"]})
+    lircd.inject(Fault.SIGHUP, "VERSION")
+    sighups = 2
+
+    client.version()  # SUT
+
+    assert client.catalog_cache.invalidations == sighups
+    assert client.list_remotes() == "projector"
+    client.close()
+
+
+def test_that_injected_faults_are_used_up_in_order(lircd):
+    """
+    lirc.testing.FakeLircd.inject
+
+    Ensure each fault applies to the next matching command only.
+    """
+    client = Client(lircd.connection(timeout=0.2))
+    lircd.inject(Fault.ERROR, "SEND_ONCE")
+    lircd.inject(Fault.GARBAGE)
+
+    with pytest.raises(LircdCommandFailureError, match="injected failure"):
+        client.send_once("tv", "KEY_POWER")  # SUT
+    with pytest.raises(LircdInvalidReplyPacketError):
+        client.version()  # SUT
+    client.close()
+
+    client = Client(lircd.connection(timeout=0.2))
+    lircd.inject(Fault.HANG)
+    with pytest.raises(TimeoutError):
+        client.version()  # SUT
+    client.close()
+
+
+def test_that_a_dropped_connection_is_reconnected(lircd):
+    """
+    lirc.testing.FakeLircd.inject
+
+    Ensure a client reconnects after the fake lircd drops it.
+    """
+    client = lircd.client()
+    lircd.inject(Fault.DROP)
+
+    assert client.version() == "0.10.1"  # SUT
+
+    assert lircd.commands == ["VERSION", "VERSION"]
+    client.close()
+
+
+def test_that_many_clients_are_served_at_once(lircd):
+    """
+    lirc.testing.FakeLircd
+
+    Ensure concurrent clients are each served, even with latency.
+    """
+    lircd.latency = 0.05
+    pool = ClientPool(size=8, connection_factory=lircd.connection)
+
+    threads = [
+        threading.Thread(target=pool.send_once, args=("tv", "KEY_UP"))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert lircd.commands == ["SEND_ONCE tv KEY_UP 0"] * 8
+    assert lircd.clients == pool.idle_connections
+    pool.close()